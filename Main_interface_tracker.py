@@ -9,9 +9,12 @@ from interface_focus_tournoi_et_expresso  import show_tournament_details
 
 from fonction_cash_game import analyser_resultats_cash_game
 from fonction_tournament import analyser_resultats_générique
+from history_index import hand_index
 
-from poker_logic import  RANKS, Player, PokerScenario, parse_hand_string, parse_community_cards_string
-from poker_calculations import calculate_chip_ev
+from poker_logic import  RANKS, POSITIONS, Player, PokerScenario, build_scenario
+from poker_calculations import calculate_chip_ev, calculate_ev_profile, optimize_bet_size, shutdown_executors
+from poker_cache import equity_cache
+from poker_push_fold import solve_push_fold
 
 def setup_scenario_from_gui(gui_elements):
     """Parses all GUI inputs and returns a configured scenario and key player details."""
@@ -19,53 +22,25 @@ def setup_scenario_from_gui(gui_elements):
     stacks_str = gui_elements['stacks_entry'].get()
     stack_strings = [s.strip() for s in stacks_str.split(',') if s.strip()]
     n_players = len(stack_strings)
-    if n_players not in (2, 3):
+    if n_players not in POSITIONS:
         raise ValueError("Only 2 or 3 players supported.")
 
-    if n_players == 2:
-        positions = ['SB', 'BB']
-    else:
-        positions = ['BTN', 'SB', 'BB']
+    positions = list(POSITIONS[n_players])
     position_combobox['values'] = positions
     selected_pos = position_combobox.get()
     if selected_pos not in positions:
         position_combobox.set(positions[0])
         selected_pos = positions[0]
-    
-    hero_pos_index = positions.index(selected_pos)
-    player_stacks_raw = [float(s) for s in stack_strings]
-    hero_stack = player_stacks_raw[hero_pos_index]
-    opponent_stacks = [s for i, s in enumerate(player_stacks_raw) if i != hero_pos_index]
-    player_stacks = [hero_stack] + opponent_stacks
-    
-    player_names = [f"Player {i+1}" for i in range(n_players)]
-    player_name = player_names[0]
-    players = [Player(name, stack) for name, stack in zip(player_names, player_stacks)]
-    
+
     small_blind = float(gui_elements['sb_entry'].get() or '0')
     big_blind = float(gui_elements['bb_entry'].get() or '0')
     ante = float(gui_elements['ante_entry'].get() or '0')
-    
-    hole_cards_str = gui_elements['hole_cards_entry'].get().strip()
-    try:
-        player_hole_cards = parse_hand_string(hole_cards_str)
-    except ValueError as e:
-        print(f"Error parsing hole cards: {e}")
-        return None
-    players[0].hole_cards = player_hole_cards
-    
-    community_cards_str = gui_elements['community_cards_entry'].get().strip()
-    try: 
-        community_cards = parse_community_cards_string(community_cards_str)
-    except ValueError as e:
-        print(f"Error parsing community cards: {e}")
-        return None
-    if any(card in community_cards for card in player_hole_cards.cards):
-        raise ValueError("Overlap between hole cards and community cards.")
-    
-    scenario = PokerScenario(players, small_blind, big_blind, ante)
-    scenario.community_cards = community_cards
-    
+
+    # La construction du scénario ne dépend pas de Tk (voir batch_ev.py pour l'usage en ligne de commande)
+    scenario, player_name = build_scenario(stack_strings, selected_pos, small_blind, big_blind, ante,
+                                           gui_elements['hole_cards_entry'].get(),
+                                           gui_elements['community_cards_entry'].get())
+
     opponent_range_string = gui_elements['opponent_range_entry'].get().strip()
     
     return scenario, player_name, opponent_range_string, selected_pos, big_blind, small_blind
@@ -81,38 +56,29 @@ def find_optimal_bet_from_gui(gui_elements):
     try:
         scenario, player_name, opponent_range_string, selected_pos, big_blind, small_blind = setup_scenario_from_gui(gui_elements)
 
-        ev_fold = 0.0
-
         amount_to_call = big_blind - (small_blind if selected_pos == 'SB' else 0)
-        ev_call = calculate_chip_ev(scenario, player_name, opponent_range_string, 'call', amount_to_call)
-
         raise_multipliers = [2.5, 3.0, 3.5, 4.0] 
-        best_raise_ev = -float('inf')
-        optimal_raise_size = 0
-
         effective_stack = min(scenario.players[0].stack, scenario.players[1].stack)
-
-        for multiplier in raise_multipliers:
-            raise_amount = min(big_blind * multiplier, effective_stack)
-            min_raise_to = big_blind * 2
-            if raise_amount < min_raise_to:
-                continue
-
-            current_raise_ev = calculate_chip_ev(scenario, player_name, opponent_range_string, 'raise', raise_amount)
-            if current_raise_ev > best_raise_ev:
-                best_raise_ev = current_raise_ev
-                optimal_raise_size = raise_amount
+        min_raise_to = big_blind * 2
+        raise_sizes = [min(big_blind * multiplier, effective_stack) for multiplier in raise_multipliers]
+        raise_sizes = [raise_amount for raise_amount in raise_sizes if raise_amount >= min_raise_to]
+
+        if len(scenario.players) == 2 and effective_stack >= min_raise_to:
+            # Heads-up : taille de relance optimisée en continu, en tenant compte des folds adverses ;
+            # l'EV du call vient du même vecteur d'équités par combo
+            sizing = optimize_bet_size(scenario, player_name, opponent_range_string, min_raise_to, effective_stack,
+                                       call_amount=amount_to_call)
+            action, size, max_ev = sizing.best_action()
+        else:
+            # Une seule estimation d'équité pour le call et toutes les tailles de relance
+            profile = calculate_ev_profile(scenario, player_name, opponent_range_string, raise_sizes, amount_to_call)
+            action, size, max_ev = profile.best_action()
 
         best_action = "Fold"
-        max_ev = ev_fold
-
-        if ev_call > max_ev:
-            best_action = f"Call {amount_to_call:.2f}"
-            max_ev = ev_call
-        
-        if best_raise_ev > max_ev:
-            best_action = f"Raise to {optimal_raise_size:.2f}"
-            max_ev = best_raise_ev
+        if action == "call":
+            best_action = f"Call {size:.2f}"
+        elif action == "raise":
+            best_action = f"Raise to {size:.2f}"
 
         result_text = f"Optimal Action: {best_action} (EV: {max_ev:.2f})"
         ev_result_label.config(text=result_text, foreground="blue")
@@ -120,6 +86,37 @@ def find_optimal_bet_from_gui(gui_elements):
     except Exception as e:
         ev_result_label.config(text=f"Error: {e}", foreground="red")
 
+def show_push_fold_chart_from_gui(gui_elements):
+    """
+    Solves the 3-handed push/fold equilibrium of the stacks and blinds entered in the GUI
+    (stacks in BTN, SB, BB order) and shows the chart of the selected position.
+    """
+    ev_result_label = gui_elements['ev_result_label']
+    ev_result_label.config(text="Solving push/fold...", foreground="black")
+    ev_result_label.update_idletasks()
+
+    try:
+        stack_strings = [s.strip() for s in gui_elements['stacks_entry'].get().split(',') if s.strip()]
+        if len(stack_strings) != 3:
+            raise ValueError("Push/fold charts need 3 players (BTN, SB, BB).")
+        players = [Player(position, float(stack)) for position, stack in zip(['BTN', 'SB', 'BB'], stack_strings)]
+        small_blind = float(gui_elements['sb_entry'].get() or '0')
+        big_blind = float(gui_elements['bb_entry'].get() or '0')
+        ante = float(gui_elements['ante_entry'].get() or '0')
+        chart = solve_push_fold(PokerScenario(players, small_blind, big_blind, ante))
+
+        # Première décision de la position choisie
+        position = gui_elements['position_combobox'].get()
+        decision, label = {'BTN': ('btn_push', "BTN push"), 'SB': ('sb_push', "SB push"),
+                           'BB': ('bb_call_sb', "BB call vs SB push")}.get(position, ('btn_push', "BTN push"))
+        stacks = "/".join(f"{stack:g}" for stack in chart.stacks_bb)
+        title = f"{label} - {stacks} BB ({chart.range_percentage(decision):.1%} des mains)"
+        show_double_entry_table(RANKS, chart.table_values(decision), title=title, parent=tk._default_root)
+        ev_result_label.config(text=title, foreground="blue")
+
+    except Exception as e:
+        ev_result_label.config(text=f"Error: {e}", foreground="red")
+
 def run_analysis(analysis_function, widgets, graph_config):
     """
     Fonction générique pour lancer une analyse, traiter les résultats et mettre à jour l'UI.
@@ -167,7 +164,7 @@ def run_analysis(analysis_function, widgets, graph_config):
                 # Seulement filtrer si toutes les positions ne sont pas sélectionnées
                 position_filter = selected_positions
 
-        results = analysis_function(repertoire, user_name, date_filter, position_filter)
+        results = analysis_function(repertoire, user_name, date_filter, position_filter, index=hand_index)
     elif analysis_function == analyser_resultats_générique:
         # Pour les tournois et expresso, seul le filtre de date est applicable
         date_filter = None
@@ -484,6 +481,11 @@ def create_gui():
     root.geometry("900x800")
     root.protocol("WM_DELETE_WINDOW", root.quit)
 
+    # Les équités déjà calculées sont conservées d'une session à l'autre
+    equity_cache.open_disk_tier()
+    # Les mains déjà parsées aussi : seuls les fichiers nouveaux ou complétés sont relus
+    hand_index.open_disk_tier()
+
     # Demande le dossier d'historique une seule fois au lancement
     selected_history_directory = filedialog.askdirectory(title="Sélectionnez le dossier d'historique à analyser")
     if not selected_history_directory:
@@ -573,6 +575,10 @@ def create_gui():
     bet_size_entry.grid(row=0, column=3, sticky="ew", padx=(5, 0))
     bet_size_entry.insert(0, "50")
 
+    ttk.Label(action_frame, text="Payouts for $EV (e.g., 50, 30, 20 or leave empty):").grid(row=2, column=0, sticky="w", padx=10, pady=5)
+    payouts_entry = ttk.Entry(action_frame, width=40)
+    payouts_entry.grid(row=2, column=1, sticky="ew", padx=10, pady=5)
+
     output_frame = ttk.LabelFrame(ev_tab, text="Result")
     output_frame.grid(row=3, column=0, padx=15, pady=10, sticky="ew")
     output_frame.columnconfigure(1, weight=1)
@@ -585,6 +591,7 @@ def create_gui():
     buttons_frame.grid(row=4, column=0, padx=15, pady=15)
     buttons_frame.columnconfigure(0, weight=1)
     buttons_frame.columnconfigure(1, weight=1)
+    buttons_frame.columnconfigure(2, weight=1)
 
     calculate_button = ttk.Button(buttons_frame, text="Calculate EV for Given Size")
     calculate_button.grid(row=0, column=0, padx=5, sticky="ew")
@@ -592,6 +599,9 @@ def create_gui():
     optimize_button = ttk.Button(buttons_frame, text="Find Optimal Bet")
     optimize_button.grid(row=0, column=1, padx=5, sticky="ew")
 
+    push_fold_button = ttk.Button(buttons_frame, text="Push/Fold Chart")
+    push_fold_button.grid(row=0, column=2, padx=5, sticky="ew")
+
     gui_elements = {
         'stacks_entry': stacks_entry,
         'position_combobox': position_combobox,
@@ -603,11 +613,13 @@ def create_gui():
         'opponent_range_entry': opponent_range_entry,
         'action_combobox': action_combobox,
         'bet_size_entry': bet_size_entry,
+        'payouts_entry': payouts_entry,
         'ev_result_label': ev_result_label,
     }
 
     calculate_button.config(command=lambda: calculate_ev_from_gui(gui_elements))
     optimize_button.config(command=lambda: find_optimal_bet_from_gui(gui_elements))
+    push_fold_button.config(command=lambda: show_push_fold_chart_from_gui(gui_elements))
 
     create_analysis_tab(
         notebook,
@@ -659,14 +671,20 @@ def calculate_ev_from_gui(gui_elements):
         if player_action == 'raise' and bet_size <= 0:
             raise ValueError("Raise amount must be positive.")
 
+        # Avec une structure de gains, l'EV est convertie en argent via l'ICM
+        payouts = [float(p) for p in gui_elements['payouts_entry'].get().split(',') if p.strip()]
+
         calculated_ev = calculate_chip_ev(
             scenario=scenario,
             player_name=player_name,
             opponent_range_string=opponent_range_string,
             player_action=player_action,
-            bet_size=bet_size
+            bet_size=bet_size,
+            output="$EV" if payouts else "chips",
+            payouts=payouts
         )
-        ev_result_label.config(text=f"{calculated_ev:.2f} Chips", foreground="green")
+        unit = "$EV" if payouts else "Chips"
+        ev_result_label.config(text=f"{calculated_ev:.2f} {unit}", foreground="green")
 
     except Exception as e:
         ev_result_label.config(text=f"Error: {e}", foreground="red")
@@ -676,5 +694,6 @@ if __name__ == "__main__":
     try:
         main_window.mainloop()
     finally:
+        shutdown_executors()
         sys.exit(0)
     ev_result_label.grid(row=0, column=1, sticky="ew", padx=10, pady=5) # Sticky ew
@@ -0,0 +1,156 @@
+"""
+Évalue en lot des spots d'EV lus dans un fichier CSV ou JSONL, sans interface graphique.
+
+Chaque ligne décrit un spot : stacks (dans l'ordre des sièges, voir poker_logic.POSITIONS),
+position, small_blind, big_blind, ante, hole_cards, board, range, action (fold / call /
+raise), size et, en option, payouts (l'EV est alors en $EV via l'ICM) et id. Les spots sont
+répartis par paquets entre plusieurs processus et les résultats sont écrits en JSONL, dans
+l'ordre des lignes, au fil de l'eau. Le fichier de sortie sert de point de reprise : avec
+--resume, les lignes déjà écrites sont sautées.
+
+Usage:
+    python batch_ev.py SPOTS.csv --output resultats.jsonl [--workers N] [--chunksize N] [--resume]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+
+from poker_logic import POSITIONS, build_scenario
+from poker_calculations import calculate_chip_ev, shutdown_executors
+from fonction_cash_game import ordered_pool_map
+
+def _split_list(value):
+    """A list from a JSON list or a string such as '1000, 1000' or '50;30;20'."""
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [item.strip() for item in str(value).replace(';', ',').split(',') if item.strip()]
+
+def scenario_from_row(row):
+    """Builds (scenario, hero name) from one input row (dict of CSV strings or JSON values)."""
+    stacks = _split_list(row['stacks'])
+    position = row.get('position') or POSITIONS.get(len(stacks), ('',))[0]
+    return build_scenario(stacks, position, float(row['small_blind']), float(row['big_blind']),
+                          float(row.get('ante') or 0), row.get('hole_cards') or '', row.get('board') or '')
+
+def evaluate_spot(row):
+    """
+    Evaluates one spot with calculate_chip_ev. Returns a result dict: {'ev', 'unit'} or
+    {'error'} (une ligne invalide n'interrompt pas le lot).
+    """
+    result = {'id': row['id']} if row.get('id') not in (None, '') else {}
+    try:
+        scenario, player_name = scenario_from_row(row)
+        payouts = [float(p) for p in _split_list(row.get('payouts') or [])]
+        output = "$EV" if payouts else "chips"
+        action = str(row.get('action') or '').strip().lower()
+        if action not in ('fold', 'call', 'raise'):
+            raise ValueError(f"Invalid action: {row.get('action')!r}")
+        ev = calculate_chip_ev(scenario, player_name, str(row.get('range') or ''), action,
+                               float(row.get('size') or 0), output=output, payouts=payouts or None)
+        result.update(ev=float(ev), unit=output)
+    except (ValueError, KeyError, TypeError) as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def _evaluate_chunk(rows):
+    return [evaluate_spot(row) for row in rows]
+
+def read_spots(path, file_format=None):
+    """Streams the spots of a CSV (header row) or JSONL file as dicts, one at a time."""
+    file_format = file_format or ('jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'csv')
+    with open(path, newline='', encoding='utf-8') as spot_file:
+        if file_format == 'csv':
+            yield from csv.DictReader(spot_file)
+        elif file_format == 'jsonl':
+            for line in spot_file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unknown spot file format: {file_format}")
+
+def iter_results(rows, workers=None, chunksize=16):
+    """
+    Evaluates rows in a process pool (workers=1 : dans le processus courant) and yields the
+    results in input order. Les lignes sont envoyées par paquets de chunksize via
+    ordered_pool_map, avec un nombre borné de paquets en attente : l'entrée est lue au fur
+    et à mesure.
+    """
+    rows = iter(rows)
+    if workers == 1:
+        for row in rows:
+            yield evaluate_spot(row)
+        return
+    chunks = iter(lambda: list(islice(rows, chunksize)), [])
+    for results in ordered_pool_map(_evaluate_chunk, chunks, workers):
+        yield from results
+
+def completed_rows(output_path):
+    """
+    Number of complete result lines in output_path (the checkpoint). Une dernière ligne
+    incomplète (arrêt pendant l'écriture) est retirée du fichier.
+    """
+    if not os.path.exists(output_path):
+        return 0
+    count, valid_size = 0, 0
+    with open(output_path, 'rb') as output_file:
+        for line in output_file:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            count += 1
+            valid_size += len(line)
+    if valid_size != os.path.getsize(output_path):
+        with open(output_path, 'r+b') as output_file:
+            output_file.truncate(valid_size)
+    return count
+
+def run_batch(input_path, output_path=None, workers=None, chunksize=16, resume=False, file_format=None):
+    """
+    Evaluates every spot of input_path and writes one JSON result per line to output_path
+    (stdout if None), in input order. resume : reprend après les lignes déjà écrites.
+    Returns the number of results written by this run.
+    """
+    skip = 0
+    if resume:
+        if output_path is None:
+            raise ValueError("Resuming needs an output file.")
+        skip = completed_rows(output_path)
+    rows = islice(read_spots(input_path, file_format), skip, None)
+    output_file = sys.stdout if output_path is None else open(output_path, 'a' if resume else 'w', encoding='utf-8')
+    written = 0
+    try:
+        for index, result in enumerate(iter_results(rows, workers, chunksize), start=skip):
+            output_file.write(json.dumps({'index': index, **result}) + '\n')
+            # Chaque ligne écrite est un point de reprise
+            output_file.flush()
+            written += 1
+    finally:
+        if output_path is not None:
+            output_file.close()
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Évalue en lot des spots d'EV (CSV ou JSONL) sans interface graphique.")
+    parser.add_argument('input', help="Fichier de spots (.csv avec en-tête, ou .jsonl)")
+    parser.add_argument('--output', '-o', default=None, help="Fichier JSONL de résultats (défaut : sortie standard)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None, help="Format d'entrée (défaut : d'après l'extension)")
+    parser.add_argument('--workers', '-w', type=int, default=None, help="Nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument('--chunksize', '-c', type=int, default=16, help="Spots par paquet envoyé à un processus")
+    parser.add_argument('--resume', action='store_true', help="Reprend après les résultats déjà présents dans --output")
+    args = parser.parse_args()
+    try:
+        written = run_batch(args.input, args.output, args.workers, args.chunksize, args.resume, args.format)
+    finally:
+        shutdown_executors()
+    if args.output is not None:
+        print(f"{written} spots évalués, résultats dans {args.output}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
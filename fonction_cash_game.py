@@ -1,5 +1,7 @@
 import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from poker_logic import RANKS
 
 # --- Constants for Hand History Parsing ---
@@ -10,6 +12,7 @@ MARKER_TURN = "*** TURN ***"
 MARKER_RIVER = "*** RIVER ***"
 MARKER_SHOWDOWN = "*** SHOW DOWN ***"
 MARKER_SUMMARY = "*** SUMMARY ***"
+MARKER_HAND = "Winamax Poker -"
 
 # --- Pre-compiled Regular Expressions for Efficiency ---
 RE_TABLE = re.compile(r"Table: '(.+?)'")
@@ -21,6 +24,33 @@ RE_BUTTON = re.compile(r'Seat #(\d+) is the button')
 RE_SEAT = re.compile(r'Seat (\d+): ([^(]+) \(')
 RE_DATE = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})')
 
+# --- Analyse parallèle ---
+# Les gros fichiers sont découpés en plages d'octets de cette taille (alignées sur les mains)
+PARALLEL_CHUNK_BYTES = 16 * 1024 * 1024
+# Tâches en attente par processus : borne la mémoire des résultats pas encore consommés
+PENDING_TASKS_PER_WORKER = 4
+
+# Positions par nombre de sièges, en partant du bouton dans le sens horaire
+SEAT_POSITIONS = {
+    2: ["BTN", "BB"],  # En heads-up, BTN est aussi SB
+    3: ["BTN", "SB", "BB"],
+    4: ["BTN", "SB", "BB", "CO"],
+    5: ["BTN", "SB", "BB", "UTG", "CO"],
+    6: ["BTN", "SB", "BB", "UTG", "MP", "CO"],
+    9: ["BTN", "SB", "BB", "UTG", "UTG+1", "MP", "MP+1", "CO", "HJ"],
+}
+
+def _seat_position(button_seat, hero_seat, seat_count):
+    """Position du héros à partir des sièges du bouton et du héros."""
+    if button_seat is None or hero_seat is None:
+        return "Unknown"
+    if seat_count not in SEAT_POSITIONS:
+        return f"Seat{hero_seat}"  # Fallback pour tables non standards
+    # Distance du héros par rapport au bouton (dans le sens horaire)
+    position_offset = (hero_seat - button_seat) % seat_count
+    positions = SEAT_POSITIONS[seat_count]
+    return positions[position_offset] if position_offset < len(positions) else "Unknown"
+
 def get_hero_position(hand_text, user_name):
     """
     Détermine la position du héros relative au bouton.
@@ -46,30 +76,7 @@ def get_hero_position(hand_text, user_name):
             if player_name == user_name:
                 hero_seat = seat_num
     
-    if button_seat is None or hero_seat is None:
-        return "Unknown"
-    
-    # Calculer la position relative
-    # Distance du héros par rapport au bouton (dans le sens horaire)
-    position_offset = (hero_seat - button_seat) % seat_count
-    
-    # Déterminer la position selon le nombre de sièges
-    if seat_count == 2:
-        positions = ["BTN", "BB"]  # En heads-up, BTN est aussi SB
-    elif seat_count == 3:
-        positions = ["BTN", "SB", "BB"]
-    elif seat_count == 4:
-        positions = ["BTN", "SB", "BB", "CO"]
-    elif seat_count == 5:
-        positions = ["BTN", "SB", "BB", "UTG", "CO"]
-    elif seat_count == 6:
-        positions = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
-    elif seat_count == 9:
-        positions = ["BTN", "SB", "BB", "UTG", "UTG+1", "MP", "MP+1", "CO", "HJ"]
-    else:
-        return f"Seat{hero_seat}"  # Fallback pour tables non standards
-    
-    return positions[position_offset] if position_offset < len(positions) else "Unknown"
+    return _seat_position(button_seat, hero_seat, seat_count)
 
 def normalize_hand(hand_str):
     """
@@ -109,17 +116,21 @@ def process_hand(hand_text, user_name):
     """
     Traite une seule main de poker et retourne un dictionnaire avec les détails de la main,
     y compris la main de départ du joueur, les cartes communautaires, la position et la date.
+
+    Les lignes sont lues une seule fois par une machine à états (street en cours, sièges,
+    fold du héros) : les lignes où le héros n'apparaît pas ne passent que par quelques tests
+    de sous-chaînes bon marché.
     """
     hand_lines = hand_text.strip().split('\n')
     bet_amount, won_amount = 0.0, 0.0
     is_summary = False
     hero_hand = "N/A"
-    table_name = "N/A"
+    table_name = None
     community_cards = ""
-    is_showdown = MARKER_SHOWDOWN in hand_text
+    is_showdown = False
     rake = 0.0
     normalized_hand = None
-    position = get_hero_position(hand_text, user_name)
+    dealt_position = None
     date_str = None
 
     if hand_lines:
@@ -127,177 +138,148 @@ def process_hand(hand_text, user_name):
         if date_match:
             date_str = date_match.group(1)
 
+    # Sièges (position relative au bouton)
+    button_seat = None
+    hero_seat = None
+    seat_count = 0
+
     vpip = False
     pfr = False
-    three_bet = False
-    preflop_actions = []
-    preflop = True
     aggression_actions = 0
 
     blinds_posted = set()
     actions_seen = set()
 
-    # --- NEW: cbet tracking ---
-    preflop_hero_raised = False
+    # État de la main : street du flop en cours, section préflop (jusqu'au marqueur du flop),
+    # premier relanceur préflop (None, "hero" ou "other"), fold du héros
     on_flop = False
+    flop_reached = False
+    preflop_section = True
+    first_raiser = None
+    hero_folded = False
+    saw_flop = False
     cbet = False
-    cbet_opportunity = False
+    dealt_prefix = f"{MARKER_DEALT_TO}{user_name}"
 
     for line in hand_lines:
-        match_table = RE_TABLE.search(line)
-        if match_table:
-            table_name = match_table.group(1)
-            break
+        if "Seat " in line:
+            button_match = RE_BUTTON.search(line)
+            if button_match:
+                button_seat = int(button_match.group(1))
+            seat_match = RE_SEAT.search(line)
+            if seat_match:
+                seat_num = int(seat_match.group(1))
+                seat_count = max(seat_count, seat_num)
+                if seat_match.group(2).strip() == user_name:
+                    hero_seat = seat_num
+        if table_name is None and "Table: '" in line:
+            match_table = RE_TABLE.search(line)
+            if match_table:
+                table_name = match_table.group(1)
+        if "***" in line:
+            is_showdown = is_showdown or MARKER_SHOWDOWN in line
+            if MARKER_FLOP in line:
+                if not flop_reached:
+                    # Le héros a vu le flop s'il n'a pas foldé avant ce marqueur
+                    flop_reached = True
+                    saw_flop = not hero_folded
+                if line.startswith(MARKER_FLOP):
+                    preflop_section = False
+                on_flop = True
+                match_board = RE_BOARD.search(line)
+                if match_board:
+                    community_cards = match_board.group(1).replace(" ", "")
+                continue
+            # Extraire les cartes communautaires (turn, river)
+            if MARKER_TURN in line or MARKER_RIVER in line:
+                match_board = RE_BOARD.search(line)
+                if match_board:
+                    community_cards = match_board.group(1).replace(" ", "")
+                on_flop = False
+            if MARKER_SUMMARY in line:
+                is_summary = True
+
+        if is_summary and "Rake" in line:
+            match_rake = RE_RAKE.search(line)
+            if match_rake:
+                rake = float(match_rake.group(1))
+
+        if user_name not in line:
+            # 3-bet : une relance adverse avant la première relance du héros
+            if preflop_section and first_raiser is None and 'raises' in line and 'posts' not in line:
+                first_raiser = "other"
+            continue
+
+        # --- Lignes du héros ---
+        is_post = 'posts' in line
+        if not is_post:
+            if 'folds' in line:
+                hero_folded = True
+            if preflop_section and first_raiser is None and 'raises' in line:
+                first_raiser = "hero"
 
-    for line in hand_lines:
         # Extraire la main du joueur
-        if line.startswith(f"{MARKER_DEALT_TO}{user_name}"):
+        if line.startswith(dealt_prefix):
             match_hand = RE_HAND.search(line)
             if match_hand:
                 hero_hand = match_hand.group(1).replace(" ", "")
                 normalized_hand = normalize_hand(hero_hand)
-                # --- Détection de la position ---
                 # Exemple Winamax : "Dealt to PogShellCie [As Kd] (BTN)"
                 pos_match = re.search(r"\((\w+)\)", line)
                 if pos_match:
-                    position = pos_match.group(1)
-        
-        # Detect start of flop street
-        if MARKER_FLOP in line:
-            on_flop = True
-            match_board = RE_BOARD.search(line)
-            if match_board:
-                community_cards = match_board.group(1).replace(" ", "")
-            # continue processing following lines on flop
-            continue
-                
-        # Extraire les cartes communautaires (turn, river)
-        if MARKER_TURN in line or MARKER_RIVER in line:
-            match_board = RE_BOARD.search(line)
-            if match_board:
-                community_cards = match_board.group(1).replace(" ", "")
-            # if turn/river, we are no longer on flop for cbet detection
-            if MARKER_TURN in line or MARKER_RIVER in line:
-                on_flop = False
-
-        if MARKER_SUMMARY in line:
-            is_summary = True
-        
-        if is_summary and "Rake" in line:
-            match_rake = RE_RAKE.search(line)
-            if match_rake:
-                rake = float(match_rake.group(1))
+                    dealt_position = pos_match.group(1)
 
         # --- Correction du double comptage des blinds ---
-        if user_name in line:
+        if not is_summary and is_post:
             # Comptage unique des blinds postées
-            if not is_summary and "posts" in line:
-                if "small blind" in line and "SB" not in blinds_posted:
-                    amounts = RE_AMOUNT.findall(line)
-                    if amounts:
-                        bet_amount += float(amounts[-1])
-                        blinds_posted.add("SB")
-                elif "big blind" in line and "BB" not in blinds_posted:
-                    amounts = RE_AMOUNT.findall(line)
-                    if amounts:
-                        bet_amount += float(amounts[-1])
-                        blinds_posted.add("BB")
-                elif "ante" in line and "ANTE" not in blinds_posted:
-                    amounts = RE_AMOUNT.findall(line)
-                    if amounts:
-                        bet_amount += float(amounts[-1])
-                        blinds_posted.add("ANTE")
-                continue  # Ne pas compter cette ligne dans les autres actions
-
+            if "small blind" in line and "SB" not in blinds_posted:
+                amounts = RE_AMOUNT.findall(line)
+                if amounts:
+                    bet_amount += float(amounts[-1])
+                    blinds_posted.add("SB")
+            elif "big blind" in line and "BB" not in blinds_posted:
+                amounts = RE_AMOUNT.findall(line)
+                if amounts:
+                    bet_amount += float(amounts[-1])
+                    blinds_posted.add("BB")
+            elif "ante" in line and "ANTE" not in blinds_posted:
+                amounts = RE_AMOUNT.findall(line)
+                if amounts:
+                    bet_amount += float(amounts[-1])
+                    blinds_posted.add("ANTE")
+            continue  # Ne pas compter cette ligne dans les autres actions
+
+        raises = 'raises' in line
+        calls = 'calls' in line
+        bets = 'bets' in line
+        if raises or calls or bets:
             # Comptage unique des autres actions (call, raise, bet)
-            if not is_summary and any(word in line for word in ["calls", "raises", "bets"]):
-                # On identifie l'action et la street pour éviter de compter plusieurs fois la même action
-                action_key = (line.strip(),)
+            if not is_summary:
+                action_key = line.strip()
                 if action_key not in actions_seen:
                     amounts = RE_AMOUNT.findall(line)
                     if amounts:
                         bet_amount += float(amounts[-1])
                         actions_seen.add(action_key)
-            # Aggression Factor: compter les raises et bets du héros
-            if user_name in line and ('raises' in line or 'bets' in line or 'calls' in line) and 'posts' not in line:
+            if not is_post:
+                # Aggression Factor, VPIP et PFR (sur toutes les lignes d'action du héros)
                 aggression_actions += 1
-
-            # Summary winnings
-            if is_summary and "won" in line:
-                try:
-                    match = RE_AMOUNT.search(line)
-                    if match:
-                        won_amount = float(match.group(1))
-                except (ValueError, IndexError):
-                    pass
-
-        # Detect preflop actions for VPIP/PFR/3bet and mark if hero raised preflop
-        if preflop:
-            if line.startswith('*** FLOP ***'):
-                preflop = False
-            elif user_name in line:
-                if any(word in line for word in ['calls', 'raises', 'bets']):
-                    if 'posts' not in line:
-                        vpip = True
-                if 'raises' in line and 'posts' not in line:
+                vpip = True
+                if raises:
                     pfr = True
-                    preflop_actions.append('raise')
-                    preflop_hero_raised = True
-                elif 'calls' in line and 'posts' not in line:
-                    preflop_actions.append('call')
-                elif 'bets' in line and 'posts' not in line:
-                    preflop_actions.append('bet')
-                    pass
-
-        if on_flop and user_name in line and 'bets' in line:
-            if preflop_hero_raised:
-                cbet = True
-
-    # Detect 3-bet: If hero raises and there was already a raise before
-    # (i.e., hero's first preflop action is a raise and there was a previous raise)
-    # We'll check if there is more than one 'raise' in preflop actions
-    if preflop_actions.count('raise') >= 1:
-        # If hero's first preflop action is a raise and there was a previous raise
-        # (i.e., hero's raise is not the first raise in the hand)
-        # We'll check if there is a raise before hero's raise
-        # For simplicity, if hero's first action is a raise and it's not the first raise in the hand
-        # We'll look for 'raises' in preflop lines before hero's first raise
-        hero_acted = False
-        for line in hand_lines:
-            if line.startswith('*** FLOP ***'):
-                break
-            if user_name in line and 'raises' in line and 'posts' not in line:
-                hero_acted = True
-                break
-            if 'raises' in line and user_name not in line and 'posts' not in line and not hero_acted:
-                three_bet = True
-                break
 
-    saw_flop = False
-    went_to_showdown = False
+        # Summary winnings
+        if is_summary and "won" in line:
+            match = RE_AMOUNT.search(line)
+            if match:
+                won_amount = float(match.group(1))
 
-    # Detect if hero saw the flop
-    for line in hand_lines:
-        if MARKER_FLOP in line:
-            # If hero did not fold before this line, he saw the flop
-            # Check if there is a fold line for hero before this
-            folded = any(
-                user_name in l and 'folds' in l and 'posts' not in l
-                for l in hand_lines[:hand_lines.index(line)]
-            )
-            if not folded:
-                saw_flop = True
-            break
-
-    # Detect if hero went to showdown
-    if MARKER_SHOWDOWN in hand_text:
-        # If hero did not fold before showdown, he went to showdown
-        folded = any(
-            user_name in l and 'folds' in l and 'posts' not in l
-            for l in hand_lines
-        )
-        if not folded:
-            went_to_showdown = True
+        if on_flop and bets and pfr:
+            cbet = True
+
+    position = dealt_position or _seat_position(button_seat, hero_seat, seat_count)
+    three_bet = pfr and first_raiser == "other"
+    went_to_showdown = is_showdown and not hero_folded
 
     net = won_amount - bet_amount
     net_non_showdown, net_showdown = 0, 0
@@ -310,7 +292,7 @@ def process_hand(hand_text, user_name):
 
     return {
         "hand": hero_hand,
-        "table": table_name,
+        "table": table_name or "N/A",
         "bet_amount": bet_amount,
         "gains": won_amount,
         "net": net,
@@ -325,13 +307,144 @@ def process_hand(hand_text, user_name):
         "position": position,
         "date": date_str,
         "cbet": cbet,
-        "cbet_opportunity": preflop_hero_raised,
+        "cbet_opportunity": pfr,
         "aggression_actions": aggression_actions,  # Ajouté pour Aggression Factor
         "saw_flop": saw_flop,
         "went_to_showdown": went_to_showdown,
     }
 
-def analyser_resultats_cash_game(repertoire, user_name, date_filter=None, position_filter=None):
+# Champs renvoyés par process_hand, dans l'ordre (enregistrements compacts des workers)
+HAND_FIELDS = (
+    "hand", "table", "bet_amount", "gains", "net", "community_cards", "net_non_showdown",
+    "net_showdown", "rake", "vpip", "pfr", "three_bet", "normalized_hand", "position", "date",
+    "cbet", "cbet_opportunity", "aggression_actions", "saw_flop", "went_to_showdown",
+)
+
+def iter_hands(path, marker=MARKER_HAND):
+    """
+    Lit un fichier d'historique de façon paresseuse et renvoie le texte de chaque main, du
+    marqueur de début de main jusqu'au suivant (équivalent à content.split(marker), le
+    marqueur étant remis en tête de chaque main ; le texte précédant la première main est
+    ignoré).
+
+    Le fichier est lu ligne à ligne (lecture bufferisée) : seule la main en cours est gardée
+    en mémoire, quelle que soit la taille du fichier.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        hand_parts = None
+        for line in file:
+            if marker not in line:
+                if hand_parts is not None:
+                    hand_parts.append(line)
+                continue
+            pieces = line.split(marker)
+            if hand_parts is not None:
+                hand_parts.append(pieces[0])
+                yield ''.join(hand_parts)
+            for piece in pieces[1:-1]:
+                yield marker + piece
+            hand_parts = [marker, pieces[-1]]
+        if hand_parts is not None:
+            yield ''.join(hand_parts)
+
+def iter_hand_range(path, start, end, marker=MARKER_HAND, block_size=1024 * 1024, with_offsets=False):
+    """
+    Comme iter_hands, mais seulement pour les mains dont le marqueur commence dans la plage
+    d'octets [start, end) du fichier : la dernière main est lue au-delà de end jusqu'au
+    marqueur suivant. Des plages contiguës couvrent donc chaque main exactement une fois.
+    with_offsets : renvoie des couples (position du marqueur dans le fichier, texte).
+    """
+    marker_bytes = marker.encode('utf-8')
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = b''
+        data_offset = start  # position dans le fichier de data[0]
+        hand_start = None
+        search_from = 0
+        while True:
+            index = data.find(marker_bytes, search_from)
+            if index == -1:
+                block = file.read(block_size)
+                if not block:
+                    if hand_start is not None:
+                        hand = _decode_hand(data[hand_start:])
+                        yield (data_offset + hand_start, hand) if with_offsets else hand
+                    return
+                # Ne garder que la main en cours (ou de quoi retrouver un marqueur coupé)
+                keep = hand_start if hand_start is not None else max(0, len(data) - len(marker_bytes) + 1)
+                search_from = max(search_from, len(data) - len(marker_bytes) + 1) - keep
+                if hand_start is not None:
+                    hand_start = 0
+                data_offset += keep
+                data = data[keep:] + block
+                continue
+            if hand_start is not None:
+                hand = _decode_hand(data[hand_start:index])
+                yield (data_offset + hand_start, hand) if with_offsets else hand
+            if data_offset + index >= end:
+                return
+            hand_start = index
+            search_from = index + len(marker_bytes)
+
+def _decode_hand(hand_bytes):
+    # Mêmes fins de ligne qu'un fichier ouvert en mode texte (newlines universels)
+    return hand_bytes.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+def file_byte_ranges(path, chunk_bytes=None):
+    """Plages d'octets [start, end) découpant un fichier pour iter_hand_range."""
+    chunk_bytes = chunk_bytes or PARALLEL_CHUNK_BYTES
+    size = os.path.getsize(path)
+    return [(start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes)]
+
+def ordered_pool_map(function, tasks, workers=None):
+    """
+    Applique function à chaque tâche dans un ProcessPoolExecutor et renvoie les résultats
+    dans l'ordre des tâches. Le nombre de tâches en attente est borné : les tâches sont
+    lues au fur et à mesure que les résultats sont consommés (contre-pression).
+    """
+    tasks = iter(tasks)
+    max_pending = PENDING_TASKS_PER_WORKER * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < max_pending:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                pending.append(executor.submit(function, task))
+            if not pending:
+                return
+            yield pending.popleft().result()
+
+def _keep_hand(hand_details, date_filter, position_filter):
+    """Applique les filtres de date et de position à une main traitée."""
+    if date_filter:
+        hand_date = hand_details.get("date")
+        if not hand_date:
+            return False
+        hand_date_only = hand_date.split(' ')[0]
+        if date_filter[0] is not None and hand_date_only < date_filter[0]:
+            return False
+        if date_filter[1] is not None and hand_date_only > date_filter[1]:
+            return False
+    if position_filter:
+        if hand_details.get("position") not in position_filter:
+            return False
+    return True
+
+def _parse_hand_range(task):
+    """Worker : mains filtrées d'une plage de fichier, en tuples de valeurs (HAND_FIELDS)."""
+    file_path, start, end, user_name, date_filter, position_filter = task
+    records = []
+    for hand_text in iter_hand_range(file_path, start, end):
+        if "HandId" not in hand_text:
+            continue
+        hand_details = process_hand(hand_text, user_name)
+        if _keep_hand(hand_details, date_filter, position_filter):
+            records.append(tuple(hand_details[field] for field in HAND_FIELDS))
+    return records
+
+def analyser_resultats_cash_game(repertoire, user_name, date_filter=None, position_filter=None, workers=1, index=None):
     """
     Analyse les fichiers de cash game et retourne les détails de chaque main.
     
@@ -340,6 +453,11 @@ def analyser_resultats_cash_game(repertoire, user_name, date_filter=None, positi
         user_name: Nom du joueur à analyser
         date_filter: Tuple (date_debut, date_fin) au format 'YYYY-MM-DD' ou None pour pas de filtre
         position_filter: Liste des positions à inclure (ex: ['BTN', 'CO']) ou None pour toutes
+        workers: Nombre de processus pour le parsing (1 : séquentiel, None : tous les cœurs) ;
+                 le résultat est identique au parsing séquentiel
+        index: HandIndex (history_index) gardant les mains déjà parsées, ou None ; avec un
+               index, le parsing est incrémental (et séquentiel), et avec sa base SQLite
+               l'analyse est faite par des requêtes (voir HandIndex.cash_game_results)
     """
     if not os.path.isdir(repertoire):
         raise FileNotFoundError(f"Le répertoire '{repertoire}' n'existe pas.")
@@ -361,34 +479,38 @@ def analyser_resultats_cash_game(repertoire, user_name, date_filter=None, positi
     hand_type_results = {}
     hand_type_counts = {}
 
-    for file_path in hand_history_files:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            file_content = file.read()
-        hand_list = file_content.split('Winamax Poker -')
-        for hand_text in hand_list:
-            if not hand_text.strip() or "HandId" not in hand_text:
-                continue
-            full_hand_text = 'Winamax Poker -' + hand_text
-            hand_details = process_hand(full_hand_text, user_name)
-            
-            # Application des filtres
-            if date_filter:
-                hand_date = hand_details.get("date")
-                if hand_date:
-                    hand_date_only = hand_date.split(' ')[0]
-                    if date_filter[0] is not None and hand_date_only < date_filter[0]:
-                        continue
-                    if date_filter[1] is not None and hand_date_only > date_filter[1]:
-                        continue
-                else:
+    if index is not None and index.path is not None:
+        # Base de mains SQLite : l'index est mis à jour (fichiers nouveaux ou complétés
+        # seulement), puis filtres et agrégats sont des requêtes SQL indexées
+        for file_path in hand_history_files:
+            index.refresh(file_path, user_name)
+        index.prune(repertoire, user_name, hand_history_files)
+        return index.cash_game_results(repertoire, user_name, date_filter, position_filter)
+    if index is not None:
+        # Index incrémental en mémoire (history_index.HandIndex) : seuls les fichiers
+        # nouveaux ou complétés depuis la dernière analyse sont parsés
+        for file_path in hand_history_files:
+            for record in index.hand_records(file_path, user_name):
+                hand_details = dict(zip(HAND_FIELDS, record))
+                if _keep_hand(hand_details, date_filter, position_filter):
+                    all_hands_details.append(hand_details)
+        index.prune(repertoire, user_name, hand_history_files)
+    elif workers == 1:
+        for file_path in hand_history_files:
+            for hand_text in iter_hands(file_path):
+                if "HandId" not in hand_text:
                     continue
-            
-            if position_filter:
-                hand_position = hand_details.get("position")
-                if hand_position not in position_filter:
-                    continue
-            
-            all_hands_details.append(hand_details)
+                hand_details = process_hand(hand_text, user_name)
+                if _keep_hand(hand_details, date_filter, position_filter):
+                    all_hands_details.append(hand_details)
+    else:
+        # Même ordre que le chemin séquentiel : les résultats sont consommés dans l'ordre
+        # des tâches (fichiers triés, puis plages croissantes de chaque fichier)
+        tasks = ((file_path, start, end, user_name, date_filter, position_filter)
+                 for file_path in hand_history_files
+                 for start, end in file_byte_ranges(file_path))
+        for records in ordered_pool_map(_parse_hand_range, tasks, workers):
+            all_hands_details.extend(dict(zip(HAND_FIELDS, record)) for record in records)
 
     def hand_sort_key(hand):
         return hand.get("date") or "9999-99-99 99:99:99"
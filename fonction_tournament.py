@@ -1,6 +1,7 @@
 import re
 import os
 import logging
+from fonction_cash_game import iter_hands, ordered_pool_map
 
 logging.basicConfig(level=logging.INFO)
 
@@ -93,10 +94,9 @@ def extraire_details_tournoi_expresso(fichier_path):
                 details["position_finale"] = ligne.replace("You finished", "").strip()
 
         fichier_path_detail = fichier_path.replace("_summary","")
-        with open(fichier_path_detail, 'r', encoding='utf-8') as file:
-            contenu_detail = file.read()
-        # Extraire les mains
-        mains = extraire_mains_tournoi_expresso(contenu_detail, details["hero_username"])
+        # Extraire les mains (lues une à une dans le fichier détaillé)
+        mains = extraire_mains_tournoi_expresso(iter_hands(fichier_path_detail, marker="Winamax Poker"),
+                                                details["hero_username"])
         details["mains"] = mains
         details["nombre_mains"] = len(mains)
         
@@ -110,7 +110,7 @@ def extraire_mains_tournoi_expresso(contenu_texte, hero_username="PogShellCie"):
     Extrait les détails des mains d'un tournoi.
     
     Args:
-        contenu_texte: Contenu du fichier de tournoi
+        contenu_texte: Contenu du fichier de tournoi, ou mains déjà découpées (iter_hands)
         hero_username: Nom d'utilisateur du héros
         
     Returns:
@@ -118,10 +118,13 @@ def extraire_mains_tournoi_expresso(contenu_texte, hero_username="PogShellCie"):
     """
     mains = []
     
-    # Diviser par "*** HAND" ou début de main
-    parties = re.split(r'(?=Winamax Poker)', contenu_texte)
+    # Diviser par "*** HAND" ou début de main (la partie 0 est le texte avant la première main)
+    if isinstance(contenu_texte, str):
+        parties = enumerate(re.split(r'(?=Winamax Poker)', contenu_texte))
+    else:
+        parties = enumerate(contenu_texte, start=1)
     
-    for i, partie in enumerate(parties):
+    for i, partie in parties:
         if not partie.strip() or "HandId:" not in partie:
             continue
             
@@ -213,10 +216,16 @@ def extraire_mains_tournoi_expresso(contenu_texte, hero_username="PogShellCie"):
     
     return mains
 
+def _lire_resume(chemin_complet):
+    """Worker : buy-in et gains d'un fichier de résumé."""
+    with open(chemin_complet, 'r', encoding='utf-8') as f:
+        return traiter_resume(f.read())
+
 def analyser_resultats_générique(repertoire, 
                                  date_filter=None,
                                  file_filter=lambda f:True,
-                                 count_key="nombre_tournois"):
+                                 count_key="nombre_tournois",
+                                 workers=1):
     """
     Analyse les fichiers de résumé Expresso et retourne les données structurées,
     y compris les résultats cumulés pour le graphique.
@@ -224,6 +233,8 @@ def analyser_resultats_générique(repertoire,
     Args:
         repertoire: Chemin vers le répertoire contenant les fichiers
         date_filter: Tuple (date_debut, date_fin) au format 'YYYY-MM-DD' ou None pour pas de filtre
+        workers: Nombre de processus pour lire les résumés (1 : séquentiel, None : tous les
+                 cœurs) ; les résultats sont cumulés dans l'ordre des fichiers
     """
     if not os.path.isdir(repertoire):
         raise FileNotFoundError(f"Le répertoire '{repertoire}' n'existe pas.")
@@ -242,6 +253,7 @@ def analyser_resultats_générique(repertoire,
         and file_filter(f)
         and "Super Freeroll Stade" not in f
     ]
+    fichiers_retenus = []
     for nom_fichier in sorted(fichiers_a_traiter):
         # Extraction de la date depuis le nom du fichier (utilitaire)
         file_date = extraire_date_fichier(nom_fichier)
@@ -255,13 +267,15 @@ def analyser_resultats_générique(repertoire,
         elif date_filter and not file_date:
             # Si un filtre de date est demandé mais pas de date trouvée, ignorer
             continue
-        
-        chemin_complet = os.path.join(repertoire, nom_fichier)
-        with open(chemin_complet, 'r', encoding='utf-8') as f:
-            contenu = f.read()
-        
-        buy_in, gains = traiter_resume(contenu)
-        
+        fichiers_retenus.append((nom_fichier, file_date))
+
+    chemins = [os.path.join(repertoire, nom_fichier) for nom_fichier, _ in fichiers_retenus]
+    if workers == 1:
+        resumes = map(_lire_resume, chemins)
+    else:
+        resumes = ordered_pool_map(_lire_resume, chemins, workers)
+
+    for (buy_in, gains), (nom_fichier, file_date) in zip(resumes, fichiers_retenus):
         # Inclure si une ligne buy-in a été trouvée (même si le montant est 0.0)
         if buy_in is not None:
             resultat_net = gains - buy_in
@@ -0,0 +1,26 @@
+"""
+Génère les tables de l'évaluateur de mains (poker_evaluator.EVALUATOR_TABLES_PATH).
+
+poker_evaluator les écrit de lui-même au premier usage si le fichier manque ; ce script
+permet de les (re)générer à l'avance, par exemple lors de l'installation.
+
+Usage:
+    python generate_evaluator_tables.py [--output FICHIER]
+"""
+
+import argparse
+import os
+import time
+
+from poker_evaluator import EVALUATOR_TABLES_PATH, write_evaluator_tables
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère les tables de consultation de l'évaluateur de mains.")
+    parser.add_argument('--output', '-o', default=EVALUATOR_TABLES_PATH, help="Fichier binaire de sortie")
+    args = parser.parse_args()
+    start = time.time()
+    write_evaluator_tables(args.output)
+    print(f"Tables écrites dans {args.output} ({os.path.getsize(args.output)} octets, {time.time() - start:.1f}s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Génère la table d'équité préflop (poker_preflop.PREFLOP_TABLE_PATH).
+
+Chaque matchup combo contre combo est ramené à sa forme canonique par permutation des
+couleurs, puis seuls les matchups canoniques sont calculés (l'équité du matchup miroir
+vaut 1 - équité), répartis sur plusieurs processus.
+
+Usage:
+    python generate_preflop_table.py [--workers N] [--samples N] [--output FICHIER]
+
+Sans --samples, l'équité de chaque matchup est exacte (énumération des 1 712 304 boards).
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from poker_logic import COMBOS, Hand, card_from_id
+from poker_calculations import calculate_equity_fast
+from poker_preflop import (PREFLOP_TABLE_PATH, PREFLOP_TABLE_SHAPE, EQUITY_SCALE, MISSING_EQUITY,
+                           canonical_matchup_keys)
+
+def _matchup_equity(hero_combo, villain_combo, samples, seed):
+    """Equity of one combo against another, exact when samples is None."""
+    hero_hand = Hand(*(card_from_id(card_id) for card_id in COMBOS[hero_combo]))
+    villain_hand = Hand(*(card_from_id(card_id) for card_id in COMBOS[villain_combo]))
+    if samples is None:
+        return calculate_equity_fast(hero_hand, {villain_hand}, [], mode="exact", cache=None)
+    return calculate_equity_fast(hero_hand, {villain_hand}, [], num_simulations=samples,
+                                 mode="monte_carlo", seed=seed, cache=None)
+
+def generate_preflop_table(path=PREFLOP_TABLE_PATH, workers=None, samples=None, seed=None, verbose=True):
+    """Computes every canonical preflop matchup and writes the 1326 x 1326 uint16 table to path."""
+    keys = canonical_matchup_keys()
+    classes = np.unique(keys[keys >= 0])
+    hero_combos, villain_combos = np.divmod(classes, len(COMBOS))
+    # Le miroir (villain, hero) d'un matchup canonique a lui aussi une clé canonique
+    mirrors = keys[villain_combos, hero_combos]
+    to_compute = classes <= mirrors
+    if verbose:
+        print(f"{len(classes)} matchups canoniques, {to_compute.sum()} à calculer")
+
+    seeds = np.random.SeedSequence(seed).spawn(int(to_compute.sum()))
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_matchup_equity, hero_combos[to_compute].tolist(), villain_combos[to_compute].tolist(),
+                               [samples] * len(seeds), seeds, chunksize=32)
+        computed = np.empty(len(seeds))
+        for index, equity in enumerate(results):
+            computed[index] = equity
+            if verbose and (index + 1) % 10000 == 0:
+                print(f"  {index + 1}/{len(seeds)} matchups ({time.time() - start:.0f}s)")
+
+    equities = np.empty(len(classes))
+    equities[to_compute] = computed
+    mirror_positions = np.searchsorted(classes, mirrors[~to_compute])
+    equities[~to_compute] = 1.0 - equities[mirror_positions]
+
+    table = np.full(PREFLOP_TABLE_SHAPE, MISSING_EQUITY, dtype=np.uint16)
+    valid = keys >= 0
+    table[valid] = np.rint(equities[np.searchsorted(classes, keys[valid])] * EQUITY_SCALE).astype(np.uint16)
+    table.tofile(path)
+    if verbose:
+        print(f"Table écrite dans {path} ({os.path.getsize(path)} octets)")
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère la table d'équité préflop combo contre combo.")
+    parser.add_argument('--output', '-o', default=PREFLOP_TABLE_PATH, help="Fichier binaire de sortie")
+    parser.add_argument('--workers', '-w', type=int, default=None, help="Nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument('--samples', '-s', type=int, default=None,
+                        help="Simulations Monte-Carlo par matchup (défaut : énumération exacte)")
+    parser.add_argument('--seed', type=int, default=None, help="Graine maîtresse en mode Monte-Carlo")
+    args = parser.parse_args()
+    generate_preflop_table(args.output, args.workers, args.samples, args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+# --- Index persistant des fichiers d'historique déjà analysés ---
+#
+# Winamax ajoute les mains à la fin des mêmes fichiers journaliers : pour chaque fichier (et
+# chaque pseudo analysé), l'index garde la taille, le mtime, la position du début de la
+# dernière main et les enregistrements des mains déjà parsées. À l'analyse suivante, un
+# fichier inchangé est relu depuis l'index, un fichier qui a grandi n'est parsé qu'à partir
+# de sa dernière main (qui pouvait être incomplète), et tout autre changement (fichier
+# raccourci, réécrit, un octet modifié avant la dernière main) entraîne un nouveau parsing
+# complet : l'empreinte couvre tout le contenu qui précède la dernière main. Pour un fichier
+# qui a grandi, le début n'est lu qu'une fois : l'empreinte vérifiée est prolongée avec les
+# seuls octets nouvellement parsés.
+#
+# Comme le cache d'équité, l'index vit en mémoire et peut être adossé à une base SQLite
+# (mode WAL). La base est alors la base de mains : une colonne par champ de process_hand,
+# des index sur la date, la position, la main normalisée et la table, et l'analyse Cash
+# Game devient une suite de requêtes (filtres et agrégats en SQL, voir cash_game_results).
+
+import hashlib
+import os
+import sqlite3
+from itertools import accumulate
+from fonction_cash_game import HAND_FIELDS, iter_hand_range, process_hand
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".poker_tracker_hand_index.sqlite")
+
+# À incrémenter quand process_hand ou le schéma changent : la base est alors reconstruite
+INDEX_VERSION = 2
+# Taille des blocs lus pour calculer l'empreinte du début du fichier
+FINGERPRINT_BLOCK_BYTES = 1 << 20
+
+# Colonnes de la table hands, alignées sur HAND_FIELDS ("table" est un mot réservé SQL)
+HAND_COLUMNS = tuple("table_name" if field == "table" else field for field in HAND_FIELDS)
+BOOLEAN_FIELDS = {"vpip", "pfr", "three_bet", "cbet", "cbet_opportunity", "saw_flop", "went_to_showdown"}
+_BOOLEAN_POSITIONS = [i for i, field in enumerate(HAND_FIELDS) if field in BOOLEAN_FIELDS]
+_DATE_POSITION = HAND_FIELDS.index("date")
+# Même clé de tri que analyser_resultats_cash_game (mains sans date en dernier, puis ordre des fichiers)
+_HAND_ORDER = "COALESCE(date, '9999-99-99 99:99:99'), path, start"
+
+def extend_fingerprint(digest, file_path, start, stop):
+    """
+    Feeds the bytes [start, stop) of file_path to a hashlib digest, by blocks, and returns it:
+    l'empreinte des octets précédant offset est extend_fingerprint(hashlib.sha1(), path, 0, offset).
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            block = file.read(min(FINGERPRINT_BLOCK_BYTES, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+def _cumulative(values):
+    """Cumuls successifs à partir de 0.0, comme les courbes de analyser_resultats_cash_game."""
+    return list(accumulate(values, initial=0.0))[1:]
+
+def _record_from_row(row):
+    """Enregistrement (HAND_FIELDS) d'une ligne de la table hands : SQLite rend les booléens en entiers."""
+    record = list(row)
+    for position in _BOOLEAN_POSITIONS:
+        record[position] = bool(record[position])
+    return tuple(record)
+
+class FileEntry:
+    """Etat indexé d'un fichier : taille, mtime, début de la dernière main, mains parsées."""
+    def __init__(self, size, mtime_ns, offset, fingerprint, hands=None):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.offset = offset
+        self.fingerprint = fingerprint
+        # Couples (position du marqueur, enregistrement dans l'ordre de HAND_FIELDS) ; None
+        # quand les mains sont dans la base SQLite
+        self.hands = hands
+
+class HandIndex:
+    """
+    Per-file index of parsed hand records with an optional SQLite tier (the hand database).
+    Les compteurs reused / extended / parsed (fichiers relus, complétés, parsés en entier)
+    sont exposés par stats().
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = {}
+        self._connection = None
+        self.reused = 0
+        self.extended = 0
+        self.parsed = 0
+
+    def _db(self):
+        if self.path is None:
+            return None
+        if self._connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+                # Base d'une autre version : elle est reconstruite au fil des analyses
+                with connection:
+                    connection.execute("DROP TABLE IF EXISTS files")
+                    connection.execute("DROP TABLE IF EXISTS hands")
+                    connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS files (path TEXT NOT NULL, user_name TEXT NOT NULL, "
+                    "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, offset INTEGER NOT NULL, "
+                    "fingerprint TEXT NOT NULL, PRIMARY KEY (path, user_name))")
+                # Colonnes des mains sans type : les valeurs gardent le type Python (int ou float)
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS hands (path TEXT NOT NULL, user_name TEXT NOT NULL, "
+                    "directory TEXT NOT NULL, start INTEGER NOT NULL, day TEXT, "
+                    f"{', '.join(HAND_COLUMNS)}, PRIMARY KEY (path, user_name, start))")
+                # Index des filtres et regroupements (le filtre de date porte sur day)
+                for name, columns in (("date", "day, date"), ("position", "position"),
+                                      ("normalized_hand", "normalized_hand"), ("table", "table_name")):
+                    connection.execute(f"CREATE INDEX IF NOT EXISTS hands_{name} ON hands (user_name, directory, {columns})")
+            self._connection = connection
+        return self._connection
+
+    def open_disk_tier(self, path=DEFAULT_INDEX_PATH):
+        """Attaches (or replaces) the persistent SQLite tier."""
+        self.close()
+        self._entries.clear()
+        self.path = path
+
+    def _load(self, key):
+        db = self._db()
+        if db is None:
+            return None
+        row = db.execute("SELECT size, mtime_ns, offset, fingerprint FROM files WHERE path = ? AND user_name = ?",
+                         key).fetchone()
+        return None if row is None else FileEntry(*row)
+
+    def _store(self, key, entry, first_new_start, new_hands):
+        db = self._db()
+        if db is None:
+            return
+        directory = os.path.dirname(key[0])
+        # day : la date sans l'heure, comparée aux bornes du filtre de date
+        rows = [key + (directory, start, record[_DATE_POSITION].split(' ')[0] if record[_DATE_POSITION] else None) + record
+                for start, record in new_hands]
+        with db:
+            db.execute("INSERT OR REPLACE INTO files (path, user_name, size, mtime_ns, offset, fingerprint) "
+                       "VALUES (?, ?, ?, ?, ?, ?)",
+                       key + (entry.size, entry.mtime_ns, entry.offset, entry.fingerprint))
+            db.execute("DELETE FROM hands WHERE path = ? AND user_name = ? AND start >= ?", key + (first_new_start,))
+            db.executemany(f"INSERT INTO hands (path, user_name, directory, start, day, {', '.join(HAND_COLUMNS)}) "
+                           f"VALUES ({', '.join('?' * (5 + len(HAND_COLUMNS)))})", rows)
+
+    def refresh(self, file_path, user_name):
+        """Brings the entry of file_path up to date, parsing only what changed. Returns the entry."""
+        key = (os.path.abspath(file_path), user_name)
+        stat = os.stat(file_path)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            self.reused += 1
+            self._entries[key] = entry
+            return entry
+
+        prefix_digest = None
+        if entry is not None and stat.st_size > entry.size:
+            prefix_digest = extend_fingerprint(hashlib.sha1(), file_path, 0, entry.offset)
+        if prefix_digest is not None and prefix_digest.hexdigest() == entry.fingerprint:
+            # Fichier complété : on reprend à la dernière main connue, avec l'empreinte vérifiée
+            start, digest = entry.offset, prefix_digest
+            self.extended += 1
+        else:
+            start, digest = 0, hashlib.sha1()
+            self.parsed += 1
+
+        offset = start
+        new_hands = []
+        for hand_start, hand_text in iter_hand_range(file_path, start, stat.st_size, with_offsets=True):
+            offset = hand_start
+            if "HandId" not in hand_text:
+                continue
+            hand_details = process_hand(hand_text, user_name)
+            new_hands.append((hand_start, tuple(hand_details[field] for field in HAND_FIELDS)))
+        hands = None
+        if self.path is None:
+            kept = [hand for hand in entry.hands if hand[0] < start] if start else []
+            hands = kept + new_hands
+        fingerprint = extend_fingerprint(digest, file_path, start, offset).hexdigest()
+        entry = FileEntry(stat.st_size, stat.st_mtime_ns, offset, fingerprint, hands)
+        self._entries[key] = entry
+        self._store(key, entry, start, new_hands)
+        return entry
+
+    def hand_records(self, file_path, user_name):
+        """
+        Records (tuples in HAND_FIELDS order) of every hand of file_path for user_name, in
+        file order, parsing only what changed since the last call.
+        """
+        entry = self.refresh(file_path, user_name)
+        if entry.hands is not None:
+            return [record for _, record in entry.hands]
+        rows = self._db().execute(f"SELECT {', '.join(HAND_COLUMNS)} FROM hands WHERE path = ? AND user_name = ? ORDER BY start",
+                                  (os.path.abspath(file_path), user_name))
+        return [_record_from_row(row) for row in rows]
+
+    def prune(self, directory, user_name, keep_paths):
+        """Forgets the files of directory analysed for user_name that are not in keep_paths."""
+        keep = {os.path.abspath(path) for path in keep_paths}
+        directory = os.path.abspath(directory)
+        for key in [key for key in self._entries if key[1] == user_name and key[0] not in keep
+                    and os.path.dirname(key[0]) == directory]:
+            del self._entries[key]
+        db = self._db()
+        if db is None:
+            return
+        stale = [(path, user_name) for (path,) in db.execute("SELECT path FROM files WHERE user_name = ?", (user_name,))
+                 if path not in keep and os.path.dirname(path) == directory]
+        if stale:
+            with db:
+                db.executemany("DELETE FROM files WHERE path = ? AND user_name = ?", stale)
+                db.executemany("DELETE FROM hands WHERE path = ? AND user_name = ?", stale)
+
+    def _hand_filter(self, directory, user_name, date_filter, position_filter):
+        """Clause WHERE (et paramètres) des filtres de analyser_resultats_cash_game."""
+        clauses = ["user_name = ?", "directory = ?"]
+        parameters = [user_name, os.path.abspath(directory)]
+        if date_filter:
+            clauses.append("day IS NOT NULL")
+            if date_filter[0] is not None:
+                clauses.append("day >= ?")
+                parameters.append(date_filter[0])
+            if date_filter[1] is not None:
+                clauses.append("day <= ?")
+                parameters.append(date_filter[1])
+        if position_filter:
+            clauses.append(f"position IN ({', '.join('?' * len(position_filter))})")
+            parameters.extend(position_filter)
+        return " AND ".join(clauses), parameters
+
+    def cash_game_results(self, directory, user_name, date_filter=None, position_filter=None):
+        """
+        Results of analyser_resultats_cash_game computed from the hand database: the filters
+        are WHERE clauses and the totals, counts and per-hand-type results are SQL aggregates.
+        Call refresh() on the files of directory first.
+        """
+        db = self._db()
+        where, parameters = self._hand_filter(directory, user_name, date_filter, position_filter)
+
+        details = [dict(zip(HAND_FIELDS, _record_from_row(row))) for row in db.execute(
+            f"SELECT {', '.join(HAND_COLUMNS)} FROM hands WHERE {where} ORDER BY {_HAND_ORDER}", parameters)]
+        (total_hands, net_result, total_mise, total_gains, total_rake, vpip_count, pfr_count, three_bet_count,
+         cbet_opp_count, cbet_count, aggression_total, flop_seen_count, went_to_showdown_count) = db.execute(
+            "SELECT COUNT(*), TOTAL(net), TOTAL(bet_amount), TOTAL(gains), TOTAL(rake), "
+            "COUNT(*) FILTER (WHERE vpip), COUNT(*) FILTER (WHERE pfr), COUNT(*) FILTER (WHERE three_bet), "
+            "COUNT(*) FILTER (WHERE cbet_opportunity), COUNT(*) FILTER (WHERE cbet_opportunity AND cbet), "
+            "COALESCE(SUM(aggression_actions), 0), COUNT(*) FILTER (WHERE saw_flop), "
+            f"COUNT(*) FILTER (WHERE saw_flop AND went_to_showdown) FROM hands WHERE {where}", parameters).fetchone()
+        hand_type_results, hand_type_counts = {}, {}
+        for normalized_hand, net, count in db.execute(
+                f"SELECT normalized_hand, TOTAL(net), COUNT(*) FROM hands WHERE {where} "
+                "AND normalized_hand IS NOT NULL AND normalized_hand != '' GROUP BY normalized_hand", parameters):
+            hand_type_results[normalized_hand] = net
+            hand_type_counts[normalized_hand] = count
+
+        return {
+            "details": details,
+            "resultat_net_total": net_result,
+            "total_hands": total_hands,
+            "cumulative_results": _cumulative(hand["net"] for hand in details),
+            "cumulative_non_showdown_results": _cumulative(hand["net_non_showdown"] for hand in details),
+            "cumulative_showdown_results": _cumulative(hand["net_showdown"] for hand in details),
+            "total_mise": total_mise,
+            "total_gains": total_gains,
+            "total_rake": total_rake,
+            "vpip_pct": (vpip_count / total_hands * 100) if total_hands else 0,
+            "pfr_pct": (pfr_count / total_hands * 100) if total_hands else 0,
+            "three_bet_pct": (three_bet_count / total_hands * 100) if total_hands else 0,
+            "cbet_pct": (cbet_count / cbet_opp_count * 100) if cbet_opp_count else 0,
+            "hand_type_results": hand_type_results,
+            "hand_type_counts": hand_type_counts,
+            "aggression_factor": (aggression_total / total_hands) if total_hands else 0,
+            "wtsd_pct": (went_to_showdown_count / flop_seen_count * 100) if flop_seen_count else 0,
+        }
+
+    def stats(self):
+        """Returns the index counters as a dict."""
+        return {
+            "files": len(self._entries),
+            "reused": self.reused,
+            "extended": self.extended,
+            "parsed": self.parsed,
+        }
+
+    def clear(self):
+        """Empties the in-memory tier and resets the counters (the disk tier is kept)."""
+        self._entries.clear()
+        self.reused = self.extended = self.parsed = 0
+
+    def close(self):
+        """Closes the SQLite connection, if any."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+# Index partagé par l'interface (mémoire seule tant qu'aucune base n'est ouverte)
+hand_index = HandIndex()
@@ -0,0 +1,140 @@
+# --- Cache des résultats d'équité ---
+#
+# Un spot (main du héros, board, range adverse) est ramené à une forme canonique par
+# permutation des couleurs : AsKd sur Th9d2c et AhKc sur Ts9c2d partagent la même clé.
+# Les résultats sont gardés dans un LRU en mémoire, adossé à une base SQLite optionnelle
+# qui survit aux redémarrages.
+
+import hashlib
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+import numpy as np
+from poker_logic import combo_index
+from poker_preflop import CARD_PERMUTATIONS, COMBO_PERMUTATIONS
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".poker_tracker_equity_cache.sqlite")
+
+def canonical_spot(hero_ids, board_ids, combo_ids, weights=None):
+    """
+    Returns the canonical (hero combo, board, range) of a spot under the 24 suit permutations:
+    the lexicographically smallest image, with the board and the range sorted.
+    weights : poids des combos (alignés sur combo_ids, sans doublons), qui suivent leur combo.
+    """
+    hero_combo = combo_index(*hero_ids)
+    board_ids = np.asarray(board_ids, dtype=np.int64)
+    if weights is None:
+        combo_ids = np.unique(np.asarray(combo_ids, dtype=np.int64))
+    else:
+        combo_ids = np.asarray(combo_ids, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+    best = None
+    for perm_index, card_permutation in enumerate(CARD_PERMUTATIONS):
+        permuted_combos = COMBO_PERMUTATIONS[perm_index, combo_ids]
+        order = np.argsort(permuted_combos)
+        range_bytes = permuted_combos[order].tobytes()
+        if weights is not None:
+            range_bytes += weights[order].tobytes()
+        candidate = (
+            int(COMBO_PERMUTATIONS[perm_index, hero_combo]),
+            tuple(sorted(card_permutation[board_ids].tolist())),
+            range_bytes,
+        )
+        if best is None or candidate < best:
+            best = candidate
+    return best
+
+def equity_cache_key(hero_ids, board_ids, combo_ids, *parameters, weights=None):
+    """Hashes the canonical spot (and combo weights) and the computation parameters into a compact cache key."""
+    hero_combo, board, range_bytes = canonical_spot(hero_ids, board_ids, combo_ids, weights)
+    digest = hashlib.sha1(range_bytes)
+    digest.update(repr((hero_combo, board) + parameters).encode())
+    return digest.hexdigest()
+
+class EquityCache:
+    """
+    Bounded LRU of equity results with an optional SQLite tier.
+    Les compteurs hits / misses / evictions (et disk_hits pour la base) sont exposés par stats().
+    """
+    def __init__(self, maxsize=4096, path=None):
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Cache size must be a positive integer.")
+        self.maxsize = maxsize
+        self.path = path
+        self._entries = OrderedDict()
+        self._connection = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _db(self):
+        if self.path is None:
+            return None
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS equity (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        return self._connection
+
+    def open_disk_tier(self, path=DEFAULT_CACHE_PATH):
+        """Attaches (or replaces) the persistent SQLite tier."""
+        self.close()
+        self.path = path
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        db = self._db()
+        if db is not None:
+            row = db.execute("SELECT value FROM equity WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Stores a value in memory and, when configured, on disk (values must be JSON-serializable)."""
+        self._remember(key, value)
+        db = self._db()
+        if db is not None:
+            with db:
+                db.execute("INSERT OR REPLACE INTO equity (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Returns the cache counters as a dict."""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        """Empties the in-memory tier and resets the counters (the disk tier is kept)."""
+        self._entries.clear()
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def close(self):
+        """Closes the SQLite connection, if any."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+# Cache partagé par calculate_equity_fast (mémoire seule tant qu'aucune base n'est ouverte)
+equity_cache = EquityCache()
@@ -1,173 +1,842 @@
-from poker_logic import create_deck, Card, Hand, RANKS, SUITS
-import random
-from deuces import Card as DeucesCard, Evaluator
+import atexit
+from math import comb, sqrt
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from poker_evaluator import evaluate_hands, sample_cards
+from poker_preflop import load_preflop_table, preflop_range_equity
+from poker_cache import equity_cache, equity_cache_key
+from poker_combos import NUM_COMBOS, COMBO_CARDS, combos_conflict
+from poker_range import Range, range_combos, parse_range
+from poker_multiway import calculate_multiway_equity
+from poker_icm import calculate_icm
 
+# Nombre maximal de mains évaluées par appel vectorisé (borne la mémoire)
+BATCH_SIZE = 65536
+# Nombre de paires (combo, runout) par tranche de travail distribuable à un worker
+CHUNK_SIZE = 16384
 
-evaluator = Evaluator() # Créez une instance de l'évaluateur une seule fois
+# --- Énumération exhaustive des runouts (système combinatoire, ordre colex) ---
+
+# COMBINATIONS[n, k] = C(n, k), pour dérouler les rangs colex de façon vectorisée
+COMBINATIONS = np.array([[comb(n, k) for k in range(6)] for n in range(53)], dtype=np.int64)
+
+def rank_combination(indices):
+    """Returns the colex rank of a strictly increasing tuple of indices."""
+    return sum(comb(index, position + 1) for position, index in enumerate(indices))
+
+def unrank_combination(rank, k):
+    """Inverse of rank_combination: returns the k sorted indices of the given colex rank."""
+    indices = [0] * k
+    for position in range(k, 0, -1):
+        index = position - 1
+        while comb(index + 1, position) <= rank:
+            index += 1
+        indices[position - 1] = index
+        rank -= comb(index, position)
+    return indices
+
+def unrank_combinations(ranks, n, k):
+    """Vectorized unrank_combination: one row of k sorted indices (< n) per colex rank."""
+    ranks = np.asarray(ranks, dtype=np.int64)
+    indices = np.empty((ranks.size, k), dtype=np.int64)
+    for position in range(k, 0, -1):
+        column = COMBINATIONS[:n, position]
+        indices[:, position - 1] = np.searchsorted(column, ranks, side='right') - 1
+        ranks = ranks - column[indices[:, position - 1]]
+    return indices
+
+def combination_array(n, k, start, stop):
+    """
+    Returns the k-subsets of range(n) whose colex rank lies in [start, stop), one per row.
+    Chaque tranche [start, stop) est indépendante, ce qui permet de découper le travail.
+    """
+    stop = min(stop, comb(n, k))
+    return unrank_combinations(np.arange(start, max(start, stop)), n, k)
+
+# --- Stratégies d'échantillonnage des runouts ---
+#
+# "random" tire chaque runout indépendamment. Les autres placent les runouts sur l'espace
+# des rangs colex [0, C(n, k)) : l'ordre colex regroupe les runouts par leur plus haute
+# carte (la turn au flop), si bien qu'un quadrillage régulier de cet espace stratifie
+# les boards. Chaque plan est répété SAMPLING_REPLICATES fois avec un aléa indépendant ;
+# la dispersion entre répétitions donne l'erreur standard.
+SAMPLING_STRATEGIES = ("random", "stratified", "systematic", "quasi_random")
+SAMPLING_REPLICATES = 8
+GOLDEN_RATIO_CONJUGATE = (sqrt(5) - 1) / 2
+
+def design_ranks(rows, sampling, rows_per_replicate, offsets, total_runouts, rng):
+    """
+    Colex ranks of the runouts of rows under a sampling design; the replicate of row r is
+    r // rows_per_replicate, whose random offset in [0, 1) is offsets[replicate].
+    "stratified" : un rang uniforme dans chacune des rows_per_replicate strates égales ;
+    "systematic" : les mêmes strates, avec un décalage commun à la répétition ;
+    "quasi_random" : suite de Kronecker (nombre d'or) décalée, à faible discrépance.
+    """
+    replicates, positions = np.divmod(rows, rows_per_replicate)
+    if sampling == "stratified":
+        fractions = (positions + rng.random(len(rows))) / rows_per_replicate
+    elif sampling == "systematic":
+        fractions = (positions + offsets[replicates]) / rows_per_replicate
+    elif sampling == "quasi_random":
+        fractions = (offsets[replicates] + positions * GOLDEN_RATIO_CONJUGATE) % 1.0
+    else:
+        raise ValueError(f"Unknown sampling strategy: {sampling}")
+    return np.minimum((fractions * total_runouts).astype(np.int64), total_runouts - 1)
+
+# Score des combos morts (qui touchent le runout) : jamais battu ni égalé par une vraie main
+DEAD_SCORE = np.iinfo(np.int32).max
+
+def _score_combos_on_runouts(combo_cards, board_ids, runouts, invalid_score):
+    """
+    Scores M combos on every runout (shape R x k); combo_cards has shape M x 2 (the same combos
+    for every runout) or R x M x 2. Returns an R x M array where combos sharing a card with
+    the runout are not evaluated and get invalid_score.
+    """
+    rows = runouts.shape[0]
+    combo_cards = np.broadcast_to(combo_cards, (rows,) + combo_cards.shape[-2:])
+    num_combos = combo_cards.shape[1]
+    board = np.concatenate([np.broadcast_to(board_ids, (rows, len(board_ids))), runouts], axis=1)
+    hands = np.concatenate([combo_cards,
+                            np.broadcast_to(board[:, None, :], (rows, num_combos, board.shape[1]))], axis=2)
+    dead = (combo_cards[:, :, :, None] == runouts[:, None, None, :]).any(axis=(2, 3))
+    scores = np.full((rows, num_combos), invalid_score, dtype=np.int32)
+    scores[~dead] = evaluate_hands(hands[~dead])
+    return scores
+
+def _equity_chunk(hero_ids, board_ids, deck, combos, combo_weights, row_start, row_stop, mode, seed, design=None):
+    """
+    Scores the hero on the runouts [row_start, row_stop) of an equity job: un runout par ligne
+    (rang colex r parmi les cartes de `deck` en mode exact, tiré au hasard sinon, ou placé
+    par design = (sampling, rows_per_replicate, offsets), voir design_ranks). La main du
+    héros n'est évaluée qu'une fois par runout et comparée d'un bloc à tous les combos
+    adverses, ceux qui entrent en conflit avec le runout étant masqués.
+    combo_weights : poids des combos (moyenne 1) ou None ; chaque paire compte pour le poids
+    de son combo, et les compteurs deviennent alors des flottants.
+    Returns (wins, ties, pairs, runouts, moments) where pairs counts the (combo, runout) pairs
+    scored and moments holds the per-runout sums needed by _runout_stderr.
+    Fonction de niveau module pour pouvoir être exécutée dans un ProcessPoolExecutor.
+    """
+    num_cards_to_draw = 5 - len(board_ids)
+    rng = np.random.default_rng(seed)
+    runouts_per_batch = max(1, BATCH_SIZE // len(combos))
+    wins, ties, pairs = 0, 0, 0
+    moments = np.zeros(3)
+    for batch_start in range(row_start, row_stop, runouts_per_batch):
+        rows = np.arange(batch_start, min(batch_start + runouts_per_batch, row_stop))
+        if mode == "exact":
+            runouts = deck[unrank_combinations(rows, len(deck), num_cards_to_draw)]
+        elif design is not None:
+            sampling, rows_per_replicate, offsets = design
+            ranks = design_ranks(rows, sampling, rows_per_replicate, offsets, comb(len(deck), num_cards_to_draw), rng)
+            runouts = deck[unrank_combinations(ranks, len(deck), num_cards_to_draw)]
+        else:
+            runouts = sample_cards(rng, deck, np.zeros((len(rows), len(deck)), dtype=bool), num_cards_to_draw)
+        board = np.concatenate([np.broadcast_to(board_ids, (len(rows), len(board_ids))), runouts], axis=1)
+        hero_scores = evaluate_hands(np.concatenate([np.broadcast_to(hero_ids, (len(rows), 2)), board], axis=1))
+        opp_scores = _score_combos_on_runouts(combos, board_ids, runouts, DEAD_SCORE)
+        weights = 1 if combo_weights is None else combo_weights
+        runout_wins = ((hero_scores[:, None] > opp_scores) * weights).sum(axis=1)
+        runout_ties = ((hero_scores[:, None] == opp_scores) * weights).sum(axis=1)
+        runout_pairs = ((opp_scores != DEAD_SCORE) * weights).sum(axis=1)
+        runout_scores = runout_wins + 0.5 * runout_ties
+        wins += runout_wins.sum().item()
+        ties += runout_ties.sum().item()
+        pairs += runout_pairs.sum().item()
+        moments += [(runout_scores ** 2).sum(), (runout_scores * runout_pairs).sum(), (runout_pairs ** 2).sum()]
+    return wins, ties, pairs, row_stop - row_start, moments
+
+def _runout_stderr(wins, ties, pairs, runouts, moments):
+    """
+    Standard error of the equity when the (combo, runout) pairs are grouped by runout:
+    estimateur par quotient sum(score) / sum(paires), les runouts étant les tirages indépendants
+    (ou, pour les plans d'échantillonnage, les répétitions : runouts en compte alors le nombre).
+    """
+    if runouts < 2 or not pairs:
+        return float('inf')
+    equity = (wins + 0.5 * ties) / pairs
+    square_sum, cross_sum, pair_square_sum = moments
+    residuals = max(square_sum - 2 * equity * cross_sum + equity ** 2 * pair_square_sum, 0.0)
+    return sqrt(runouts / (runouts - 1) * residuals) / pairs
+
+def _cluster_moments(scores, pairs):
+    """Moments (sum s², sum s n, sum n²) of per-cluster scores s = wins + ties / 2 and pair counts n."""
+    scores = np.asarray(scores, dtype=np.float64)
+    pairs = np.asarray(pairs, dtype=np.float64)
+    return np.array([(scores ** 2).sum(), (scores * pairs).sum(), (pairs ** 2).sum()])
+
+_executors = {}
+
+def get_executor(workers):
+    """Returns a process pool of the given size, created once and reused between calls."""
+    if workers not in _executors:
+        _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _executors[workers]
+
+def shutdown_executors():
+    """Shuts down every pool created by get_executor (appelée aussi à la sortie du programme)."""
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown()
+
+atexit.register(shutdown_executors)
+
+def _map_equity_chunks(job, chunks, mode, seed, design, workers):
+    """
+    Results of _equity_chunk for each (row_start, row_stop) of chunks, in order; les tranches
+    sont réparties entre workers processus (get_executor) quand il y en a plusieurs. Chaque
+    tranche reçoit une graine dérivée de seed : le résultat ne dépend pas de workers.
+    """
+    seeds = seed.spawn(len(chunks))
+    if workers > 1 and len(chunks) > 1:
+        tasks = [job + chunk + (mode, chunk_seed, design) for chunk, chunk_seed in zip(chunks, seeds)]
+        return get_executor(workers).map(_equity_chunk, *zip(*tasks))
+    return (_equity_chunk(*job, *chunk, mode, chunk_seed, design) for chunk, chunk_seed in zip(chunks, seeds))
+
+class EquityResult:
+    """
+    Detailed result of an equity calculation: win / tie / loss counts over the evaluated
+    (combo, runout) samples, the equity, its standard error and the method used
+    ("exact", "monte_carlo", "preflop_table" ou "trivial" quand aucun combo n'est jouable).
+    stderr : erreur standard calculée par l'échantillonneur (paires groupées par runout) ;
+    à défaut, elle est déduite des compteurs comme pour des échantillons indépendants.
+    """
+    def __init__(self, wins=0, ties=0, losses=0, method="monte_carlo", equity=None, stderr=None):
+        self.wins = wins
+        self.ties = ties
+        self.losses = losses
+        self.method = method
+        self.samples = wins + ties + losses
+        if equity is None:
+            equity = (wins + 0.5 * ties) / self.samples if self.samples else 1.0
+        self.equity = equity
+        self._stderr = stderr
+
+    @property
+    def stderr(self):
+        """Standard error of the equity (0 for exact methods)."""
+        if self.method != "monte_carlo":
+            return 0.0
+        if self._stderr is not None:
+            return self._stderr
+        if self.samples < 2:
+            return float('inf')
+        mean_square = (self.wins + 0.25 * self.ties) / self.samples
+        variance = max(mean_square - self.equity ** 2, 0.0)
+        return sqrt(variance / (self.samples - 1))
+
+    @property
+    def effective_samples(self):
+        """
+        Number of independent (combo, runout) samples that would give the same standard
+        error: above samples when the sampling strategy reduces the variance.
+        """
+        stderr = self.stderr
+        if self.method != "monte_carlo" or stderr == 0:
+            return float(self.samples)
+        if stderr == float('inf'):
+            return 0.0
+        mean_square = (self.wins + 0.25 * self.ties) / self.samples
+        return max(mean_square - self.equity ** 2, 0.0) / stderr ** 2
+
+    def to_dict(self):
+        return {"wins": self.wins, "ties": self.ties, "losses": self.losses,
+                "method": self.method, "equity": self.equity, "stderr": self._stderr}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+    def __float__(self):
+        return float(self.equity)
+
+    def __repr__(self):
+        return (f"EquityResult(equity={self.equity:.4f}, stderr={self.stderr:.4f}, "
+                f"samples={self.samples}, effective_samples={self.effective_samples:.0f}, method='{self.method}')")
+
+def _prepare_equity_job(hero_hand, opponent_range, community_cards):
+    """
+    Converts a spot to integer arrays: (hero_ids, board_ids, deck, valid opponent combo ids,
+    their cards as an M x 2 array, their weights normalized to a mean of 1 or None when the
+    range is unweighted). Les combos en conflit avec les cartes connues sont écartés.
+    opponent_range : Range ou ensemble de Hand.
+    """
+    hero_ids = np.array(hero_hand.ids)
+    board_ids = np.array([c.id for c in community_cards], dtype=np.int64)
+    known_ids = set(hero_hand.ids) | set(board_ids.tolist())
+    deck = np.array([card_id for card_id in range(52) if card_id not in known_ids])
+    combo_ids, combo_weights = range_combos(opponent_range, known_ids)
+    if combo_weights is not None:
+        combo_weights = combo_weights / combo_weights.mean()
+    return hero_ids, board_ids, deck, combo_ids, COMBO_CARDS[combo_ids], combo_weights
+
+def iter_equity_estimates(hero_hand,
+                          opponent_range,
+                          community_cards,
+                          batch_size=2000,
+                          max_simulations=100000,
+                          seed=None,
+                          sampling="random",
+                          workers=1):
+    """
+    Generator of improving Monte Carlo estimates: yields a cumulative EquityResult
+    after each batch of batch_size runouts, until max_simulations runouts.
+    Chaque runout tiré est comparé à tous les combos adverses ; chaque lot est découpé en
+    tranches réparties entre workers processus, comme dans calculate_equity.
+    Avec un plan d'échantillonnage (sampling != "random"), chaque lot en est une répétition
+    complète ; l'erreur standard n'est connue qu'à partir du deuxième lot.
+    """
+    if sampling not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy: {sampling}")
+    hero_ids, board_ids, deck, _, combos, combo_weights = _prepare_equity_job(hero_hand, opponent_range,
+                                                                             community_cards)
+    if not len(combos):
+        yield EquityResult(method="trivial")
+        return
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    runouts_per_batch = max(1, batch_size)
+    max_runouts = max(1, max_simulations)
+    chunk_size = max(1, CHUNK_SIZE // len(combos))
+    job = (hero_ids, board_ids, deck, combos, combo_weights)
+    design = None
+    if sampling != "random":
+        # Un plan tronqué ne couvrirait qu'une partie des runouts : lots complets uniquement
+        num_batches = max(1, max_runouts // runouts_per_batch)
+        max_runouts = num_batches * runouts_per_batch
+        offsets = np.random.default_rng(seed.spawn(1)[0]).random(num_batches)
+        design = (sampling, runouts_per_batch, offsets)
+    wins, ties, pairs, runouts = 0, 0, 0, 0
+    moments = np.zeros(3)
+    while runouts < max_runouts:
+        batch_stop = min(runouts + runouts_per_batch, max_runouts)
+        chunks = [(start, min(start + chunk_size, batch_stop)) for start in range(runouts, batch_stop, chunk_size)]
+        batch_wins, batch_ties, batch_pairs = 0, 0, 0
+        for w, t, p, r, m in _map_equity_chunks(job, chunks, "monte_carlo", seed.spawn(1)[0], design, workers):
+            batch_wins += w
+            batch_ties += t
+            batch_pairs += p
+            runouts += r
+            if design is None:
+                moments += m
+        wins += batch_wins
+        ties += batch_ties
+        pairs += batch_pairs
+        if design is None:
+            stderr = _runout_stderr(wins, ties, pairs, runouts, moments)
+        else:
+            moments += _cluster_moments([batch_wins + 0.5 * batch_ties], [batch_pairs])
+            stderr = _runout_stderr(wins, ties, pairs, runouts // runouts_per_batch, moments)
+        yield EquityResult(wins, ties, pairs - wins - ties, stderr=stderr)
+
+def calculate_equity(hero_hand,
+                     opponent_range,
+                     community_cards,
+                     num_simulations=10000,
+                     mode="auto",
+                     workers=1,
+                     seed=None,
+                     cache=equity_cache,
+                     target_stderr=None,
+                     max_simulations=100000,
+                     sampling="random"):
+    """
+    Calculates equity with the vectorized NumPy evaluator (poker_evaluator) and returns
+    an EquityResult. Runouts are drawn (or enumerated) in batches and scored without a
+    Python-level loop.
+
+    num_simulations : nombre de runouts tirés en Monte-Carlo, chacun comparé à tous les
+    combos adverses.
+    mode : "monte_carlo" (échantillonnage aléatoire), "exact" (énumération de tous
+    les runouts) ou "auto" (exact dès que les runouts sont au plus num_simulations).
+    workers : nombre de processus entre lesquels les tranches de travail sont réparties
+    (y compris celles de chaque lot quand target_stderr est donné).
+    seed : graine maîtresse (int ou numpy SeedSequence) ; chaque tranche reçoit une graine
+    dérivée, si bien qu'un même seed donne le même résultat quel que soit le nombre de workers.
+    cache : EquityCache consulté avec la forme canonique du spot (None pour le désactiver).
+    target_stderr : si donné, le Monte-Carlo échantillonne par lots et s'arrête dès que
+    l'erreur standard passe sous cette cible (au plus max_simulations runouts) au lieu
+    d'utiliser le budget fixe num_simulations.
+    sampling : placement des runouts en Monte-Carlo, parmi SAMPLING_STRATEGIES ("random",
+    "stratified", "systematic" ou "quasi_random", voir design_ranks). Le gain se lit dans
+    EquityResult.effective_samples.
+
+    Préflop (sans cartes communes), en mode "auto", l'équité est lue dans la table
+    précalculée de poker_preflop lorsqu'elle a été générée.
+    """
+    if mode not in ("auto", "exact", "monte_carlo"):
+        raise ValueError(f"Invalid equity mode: {mode}")
+    if sampling not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy: {sampling}")
+    if not opponent_range: return EquityResult(method="trivial")
+
+    if mode == "auto" and not community_cards:
+        preflop_table = load_preflop_table()
+        if preflop_table is not None:
+            equity = preflop_range_equity(preflop_table, hero_hand.combo_id, *range_combos(opponent_range))
+            return EquityResult(method="preflop_table", equity=equity)
+
+    hero_ids, board_ids, deck, combo_ids, valid_opponent_combos, combo_weights = _prepare_equity_job(
+        hero_hand, opponent_range, community_cards)
+
+    if not len(valid_opponent_combos): return EquityResult(method="trivial")
+
+    if cache is not None:
+        cache_key = equity_cache_key(hero_hand.ids, board_ids, combo_ids,
+                                     mode, num_simulations, repr(seed), target_stderr, max_simulations, sampling,
+                                     weights=combo_weights)
+        cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            return EquityResult.from_dict(cached_result)
+
+    num_cards_to_draw = 5 - len(community_cards)
+    total_runouts = comb(len(deck), num_cards_to_draw)
+    if mode == "auto":
+        mode = "exact" if total_runouts <= num_simulations else "monte_carlo"
+
+    if mode == "monte_carlo" and target_stderr is not None:
+        for result in iter_equity_estimates(hero_hand, opponent_range, community_cards,
+                                            max_simulations=max_simulations, seed=seed, sampling=sampling,
+                                            workers=workers):
+            if result.stderr <= target_stderr:
+                break
+    else:
+        # Une ligne par runout, partagé par tous les combos ; num_simulations compte les runouts
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        design = None
+        if mode == "exact":
+            total_rows = total_runouts
+        else:
+            total_rows = max(1, num_simulations)
+            if sampling != "random":
+                rows_per_replicate = -(-total_rows // SAMPLING_REPLICATES)
+                total_rows = rows_per_replicate * SAMPLING_REPLICATES
+                offsets = np.random.default_rng(seed.spawn(1)[0]).random(SAMPLING_REPLICATES)
+                design = (sampling, rows_per_replicate, offsets)
+        chunk_size = max(1, CHUNK_SIZE // len(valid_opponent_combos))
+
+        # Avec un plan d'échantillonnage, aucune tranche ne chevauche deux répétitions
+        block_size = design[1] if design else total_rows
+        chunks = [(start, min(start + chunk_size, block_start + block_size))
+                  for block_start in range(0, total_rows, block_size)
+                  for start in range(block_start, block_start + block_size, chunk_size)]
+        job = (hero_ids, board_ids, deck, valid_opponent_combos, combo_weights)
+        results = _map_equity_chunks(job, chunks, mode, seed, design, workers)
+
+        wins, ties, pairs, runouts = 0, 0, 0, 0
+        moments = np.zeros(3)
+        replicate_scores = np.zeros(SAMPLING_REPLICATES)
+        replicate_pairs = np.zeros(SAMPLING_REPLICATES)
+        for (chunk_start, _), (w, t, p, r, m) in zip(chunks, results):
+            wins += w
+            ties += t
+            pairs += p
+            runouts += r
+            moments += m
+            if design is not None:
+                replicate_scores[chunk_start // block_size] += w + 0.5 * t
+                replicate_pairs[chunk_start // block_size] += p
+        if mode == "exact":
+            stderr = None
+        elif design is None:
+            stderr = _runout_stderr(wins, ties, pairs, runouts, moments)
+        else:
+            stderr = _runout_stderr(wins, ties, pairs, SAMPLING_REPLICATES,
+                                    _cluster_moments(replicate_scores, replicate_pairs))
+        result = EquityResult(wins, ties, pairs - wins - ties, method=mode, stderr=stderr)
+
+    if cache is not None:
+        cache.put(cache_key, result.to_dict())
+    return result
 
 def calculate_equity_fast(hero_hand, 
                           opponent_range, 
                           community_cards, 
-                          num_simulations=10000):
+                          num_simulations=10000,
+                          **options):
     """
-    Calculates equity using the ultra-fast 'deuces' library.
+    Returns the hero's equity as a float; see calculate_equity for the options
+    (mode, workers, seed, cache, target_stderr, max_simulations).
     """
-    if not opponent_range: return 1.0
+    return calculate_equity(hero_hand, opponent_range, community_cards, num_simulations, **options).equity
 
-    # Convertir les cartes communautaires au format deuces
-    deuces_community = [DeucesCard.new(c.rank + c.suit) for c in community_cards]
-    
-    # Convertir la main du héros au format deuces
-    deuces_hero_hand = [DeucesCard.new(c.rank + c.suit) for c in hero_hand.cards]
+# --- Matrice d'équité range contre range ---
 
-    deck = create_deck()
-    known_cards = set(hero_hand.cards) | set(community_cards)
-    deck -= known_cards
+# Nombre maximal de comparaisons (runout, combo A, combo B) par lot vectorisé
+MATRIX_BATCH_SIZE = 1 << 22
 
-    valid_opponent_range = {
-        opp_hand for opp_hand in opponent_range 
-        if not known_cards.intersection(set(opp_hand.cards))
-    }
+def calculate_range_equity_matrix(range_a,
+                                  range_b,
+                                  community_cards,
+                                  num_simulations=2000,
+                                  mode="auto",
+                                  seed=None):
+    """
+    Equity of every combo of range_a against every combo of range_b (Range or sets of Hand).
 
-    if not valid_opponent_range: return 1.0
+    Chaque runout (énuméré ou tiré) est partagé par toutes les paires de combos : les deux
+    ranges sont scorées une seule fois par runout puis comparées d'un bloc. Pour chaque paire,
+    seuls les runouts qui ne touchent aucune de ses cartes comptent.
+    Returns a 1326 x 1326 float array indexed by combo ids (A row, B column), NaN for pairs
+    outside the ranges or sharing a card. mode: "auto", "exact" or "monte_carlo"
+    (num_simulations runouts; auto enumerates when there are at most that many).
+    """
+    board_ids = np.array([c.id for c in community_cards], dtype=np.int64)
+    known_ids = set(board_ids.tolist())
+    deck = np.array([card_id for card_id in range(52) if card_id not in known_ids])
+    combos_a, _ = range_combos(range_a, known_ids)
+    combos_b, _ = range_combos(range_b, known_ids)
+    matrix = np.full((NUM_COMBOS, NUM_COMBOS), np.nan)
+    if not len(combos_a) or not len(combos_b):
+        return matrix
 
-    wins, ties, total_simulations = 0, 0, 0
-    num_cards_to_draw = 5 - len(community_cards)
-    sims_per_hand = max(1, num_simulations // len(valid_opponent_range))
-
-    for opp_hand in valid_opponent_range:
-        deuces_opp_hand = [DeucesCard.new(c.rank + c.suit) for c in opp_hand.cards]
-        matchup_deck = list(deck - set(opp_hand.cards))
-        
-        if len(matchup_deck) < num_cards_to_draw: continue
-
-        for _ in range(sims_per_hand):
-            total_simulations += 1
-            runout = random.sample(matchup_deck, num_cards_to_draw)
-            deuces_runout = [DeucesCard.new(c.rank + c.suit) for c in runout]
-            
-            board = deuces_community + deuces_runout
-            
-            # Évaluation ultra-rapide
-            hero_score = evaluator.evaluate(board, deuces_hero_hand)
-            opp_score = evaluator.evaluate(board, deuces_opp_hand)
-
-            if hero_score < opp_score: # Note : pour deuces, un score plus bas est meilleur
-                wins += 1
-            elif hero_score == opp_score:
-                ties += 1
-    
-    if total_simulations == 0: return 1.0
-    return (wins + 0.5 * ties) / total_simulations
+    num_cards_to_draw = 5 - len(board_ids)
+    total_runouts = comb(len(deck), num_cards_to_draw)
+    if mode == "auto":
+        mode = "exact" if total_runouts <= num_simulations else "monte_carlo"
+    if mode not in ("exact", "monte_carlo"):
+        raise ValueError(f"Unknown equity mode: {mode}")
+    num_runouts = total_runouts if mode == "exact" else num_simulations
+    rng = np.random.default_rng(seed)
+
+    wins = np.zeros((len(combos_a), len(combos_b)), dtype=np.int64)
+    ties = np.zeros_like(wins)
+    counts = np.zeros((len(combos_a), len(combos_b)))
+    batch_size = max(1, MATRIX_BATCH_SIZE // (len(combos_a) * len(combos_b)))
+    for start in range(0, num_runouts, batch_size):
+        stop = min(start + batch_size, num_runouts)
+        if mode == "exact":
+            runouts = deck[combination_array(len(deck), num_cards_to_draw, start, stop)]
+        else:
+            runouts = sample_cards(rng, deck, np.zeros((stop - start, len(deck)), dtype=bool), num_cards_to_draw)
+        # Combos morts : -1 côté A, score maximal côté B, donc ni victoire ni égalité
+        scores_a = _score_combos_on_runouts(COMBO_CARDS[combos_a], board_ids, runouts, -1)
+        scores_b = _score_combos_on_runouts(COMBO_CARDS[combos_b], board_ids, runouts, DEAD_SCORE)
+        wins += (scores_a[:, :, None] > scores_b[:, None, :]).sum(axis=0)
+        ties += (scores_a[:, :, None] == scores_b[:, None, :]).sum(axis=0)
+        counts += (scores_a >= 0).T.astype(np.float64) @ (scores_b != DEAD_SCORE).astype(np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        equities = (wins + 0.5 * ties) / counts
+    equities[combos_conflict(combos_a, combos_b)] = np.nan
+    matrix[np.ix_(combos_a, combos_b)] = equities
+    return matrix
+
+def aggregate_range_equity(matrix, weights_a=None, weights_b=None):
+    """
+    Equity of range A against range B as a weighted reduction of an equity matrix
+    (weights are 1326-vectors indexed by combo id such as Range.weights, 1 by default).
+    NaN pairs are ignored.
+    """
+    valid = ~np.isnan(matrix)
+    pair_weights = valid.astype(np.float64)
+    if weights_a is not None:
+        pair_weights *= np.asarray(weights_a, dtype=np.float64)[:, None]
+    if weights_b is not None:
+        pair_weights *= np.asarray(weights_b, dtype=np.float64)[None, :]
+    total = pair_weights.sum()
+    if total == 0:
+        raise ValueError("The two ranges have no compatible pair of combos.")
+    return float((np.where(valid, matrix, 0.0) * pair_weights).sum() / total)
 
 def parse_range_string(range_string):
     """
-    Parses a standard poker range string (e.g., "JJ+, AKs, 76s, T9o, QQ")
-    into a set of Hand objects.
-    """
-    hands = set()
-    # Normalize and split the input string
-    range_parts = [part.strip() for part in range_string.replace(' ', '').split(',') if part]
-
-    for part in range_parts:
-        if len(part) < 2:
-            continue
-
-        # Handle pairs (e.g., QQ, JJ+)
-        if part[0] == part[1]:
-            rank1 = part[0].upper()
-            if rank1 not in RANKS: continue
-
-            # Handle pair+ (e.g., JJ+)
-            if len(part) == 3 and part[2] == '+':
-                start_index = RANKS.index(rank1)
-                for r_idx in range(start_index, len(RANKS)):
-                    rank = RANKS[r_idx]
-                    # Add all 6 combinations for this pair
-                    for i, s1 in enumerate(SUITS):
-                        for j, s2 in enumerate(SUITS):
-                            if i < j:
-                                hands.add(Hand(Card(rank, s1), Card(rank, s2)))
-            # Handle specific pair (e.g., QQ)
-            elif len(part) == 2:
-                # Add all 6 combinations for this pair
-                for i, s1 in enumerate(SUITS):
-                    for j, s2 in enumerate(SUITS):
-                        if i < j:
-                            hands.add(Hand(Card(part[0], s1), Card(part[0], s2)))
-
-        # Handle non-pairs (e.g., AKs, T9o, QJs+)
-        elif len(part) >= 3:
-            rank1, rank2 = part[0].upper(), part[1].upper()
-            suit_info = part[2].lower()
-
-            if rank1 not in RANKS or rank2 not in RANKS: continue
-            
-            # Ensure rank1 is the higher rank for consistency
-            if RANKS.index(rank1) < RANKS.index(rank2):
-                rank1, rank2 = rank2, rank1
-
-            # Handle suited 's' or off-suit 'o'
-            if suit_info in ['s', 'o']:
-                is_suited = (suit_info == 's')
-                
-                # Handle plus notation for non-pairs (e.g., AJs+, KTs+)
-                if len(part) == 4 and part[3] == '+':
-                    start_rank2_idx = RANKS.index(rank2)
-                    for r2_idx in range(start_rank2_idx, RANKS.index(rank1)):
-                        current_rank2 = RANKS[r2_idx]
-                        if is_suited: # 4 suited combos
-                            for suit in SUITS:
-                                hands.add(Hand(Card(rank1, suit), Card(current_rank2, suit)))
-                        else: # 12 off-suit combos
-                            for s1 in SUITS:
-                                for s2 in SUITS:
-                                    if s1 != s2:
-                                        hands.add(Hand(Card(rank1, s1), Card(current_rank2, s2)))
-                # Handle specific hand (e.g., AKs, T9o)
-                else:
-                    if is_suited: # 4 suited combos
-                        for suit in SUITS:
-                            hands.add(Hand(Card(rank1, suit), Card(rank2, suit)))
-                    else: # 12 off-suit combos
-                        for s1 in SUITS:
-                            for s2 in SUITS:
-                                if s1 != s2:
-                                    hands.add(Hand(Card(rank1, s1), Card(rank2, s2)))
-    return hands
+    Parses a poker range string (e.g., "JJ+, AKs, 76s, T9o, QQ", see poker_range.parse_range
+    for the full syntax) into a set of Hand objects. Les poids éventuels sont ignorés.
+    """
+    return set(parse_range(range_string).hands())
+
+def _resolve_opponent_ranges(opponent_range_string, n_opponents):
+    """One Range per opponent from a range string / Range, or a list of them (one per opponent)."""
+    if isinstance(opponent_range_string, (str, Range)):
+        opponent_range_strings = [opponent_range_string] * n_opponents
+    else:
+        opponent_range_strings = list(opponent_range_string)
+        if len(opponent_range_strings) != n_opponents:
+            raise ValueError("Expected one range string per opponent.")
+    return [range_string if isinstance(range_string, Range) else parse_range(range_string)
+            for range_string in opponent_range_strings]
+
+def _hero_and_opponents(scenario, player_name):
+    hero = next((p for p in scenario.players if p.name == player_name), None)
+    if not hero or not hero.hole_cards:
+        raise ValueError("Hero or hero's hole cards not found.")
+
+    opponents = [p for p in scenario.players if p.name != player_name]
+    if not opponents:
+        raise ValueError("Opponent not found.")
+    return hero, opponents
+
+def _hero_equity(hero, opponents, opponent_range_string, community_cards):
+    """Equity of the hero against the opponents' ranges (multiway above two players)."""
+    opponent_ranges = _resolve_opponent_ranges(opponent_range_string, len(opponents))
+    if len(opponents) == 1:
+        return calculate_equity_fast(hero.hole_cards, opponent_ranges[0], community_cards)
+    return float(calculate_multiway_equity(hero.hole_cards, opponent_ranges, community_cards)[0])
+
+class EVProfile:
+    """
+    EV in chips of folding, calling and raising to each size of a grid, all derived from
+    a single equity computation (l'équité ne dépend pas de la taille de mise dans ce modèle).
+    """
+    def __init__(self, equity, pot, n_opponents, call_amount, raise_sizes):
+        self.equity = equity
+        self.call_amount = call_amount
+        self.raise_sizes = np.asarray(raise_sizes, dtype=np.float64).reshape(-1)
+        self.fold = 0.0
+        self.call = equity * pot - (1 - equity) * call_amount
+        # Raise : les adversaires paient tous la relance (voir calculate_chip_ev)
+        self.raises = equity * (pot + self.raise_sizes * n_opponents) - (1 - equity) * self.raise_sizes
+
+    def best_action(self):
+        """Returns (action, size, ev) of the highest-EV action: 'fold', 'call' or 'raise'."""
+        action, size, ev = "fold", 0.0, self.fold
+        if self.call > ev:
+            action, size, ev = "call", self.call_amount, self.call
+        if len(self.raises):
+            best = int(np.argmax(self.raises))
+            if self.raises[best] > ev:
+                action, size, ev = "raise", float(self.raise_sizes[best]), float(self.raises[best])
+        return action, size, ev
+
+    def to_dict(self):
+        return {"equity": self.equity, "fold": self.fold, "call": self.call,
+                "raise_sizes": self.raise_sizes.tolist(), "raises": self.raises.tolist()}
+
+    def __repr__(self):
+        return (f"EVProfile(equity={self.equity:.4f}, fold={self.fold:.2f}, call={self.call:.2f}, "
+                f"{len(self.raise_sizes)} raise sizes)")
+
+def calculate_ev_profile(scenario, player_name, opponent_range_string, raise_sizes, call_amount=0.0):
+    """
+    EV of fold, call (for call_amount) and raise for every size of raise_sizes, with the
+    opponents' ranges parsed once and the equity computed once. Même modèle que
+    calculate_chip_ev, dont chaque appel refait tout le calcul d'équité.
+    """
+    hero, opponents = _hero_and_opponents(scenario, player_name)
+    equity = _hero_equity(hero, opponents, opponent_range_string, scenario.community_cards)
+    return EVProfile(equity, scenario.pot, len(opponents), call_amount, raise_sizes)
+
+def hero_combo_equities(hero_hand, opponent_range, community_cards, num_simulations=2000, seed=None):
+    """
+    Equity of the hero against each live combo of a single opponent range (one row of
+    calculate_range_equity_matrix). Returns (combo_ids, weights, equities) as NumPy arrays.
+    """
+    dead_ids = set(hero_hand.ids) | {c.id for c in community_cards}
+    combo_ids, weights = range_combos(opponent_range, dead_ids)
+    if not len(combo_ids):
+        raise ValueError("The opponent range has no combo left once the known cards are removed.")
+    weights = np.ones(len(combo_ids)) if weights is None else weights
+    matrix = calculate_range_equity_matrix([hero_hand], Range.from_combo_ids(combo_ids), community_cards,
+                                           num_simulations=num_simulations, seed=seed)
+    return combo_ids, weights, matrix[hero_hand.combo_id, combo_ids]
+
+def pot_odds_response(size, pot):
+    """
+    Default response curve: the opponent continues with pot / (pot + size) of their range
+    (fréquence minimale de défense), so that a pure bluff of this size breaks even.
+    """
+    return pot / (pot + size)
+
+class FoldEquityModel:
+    """
+    EV of a heads-up raise when the opponent only continues with the top part of their range.
+
+    Le vilain trie ses combos par équité contre le héros et continue avec la fraction
+    response_curve(size, pot) de sa range (en poids), la dernière combo étant prise en partie :
+    l'EV est donc continue en la taille. Tout repose sur un seul vecteur d'équités par combo.
+    """
+    def __init__(self, equities, weights, pot, response_curve=None):
+        equities = np.asarray(equities, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        # Combos du vilain du plus fort au plus faible (équité du héros croissante)
+        order = np.argsort(equities, kind="stable")
+        fractions = np.cumsum(weights[order]) / weights.sum()
+        self._fractions = np.concatenate([[0.0], fractions])
+        self._equity_mass = np.concatenate([[0.0], np.cumsum(equities[order] * weights[order]) / weights.sum()])
+        self.pot = pot
+        self.response_curve = pot_odds_response if response_curve is None else response_curve
+
+    def continue_fraction(self, size):
+        """Fraction of the opponent's range (by weight) that continues against a raise of size."""
+        return float(np.clip(self.response_curve(size, self.pot), 0.0, 1.0))
+
+    def equity_when_called(self, fraction):
+        """Hero equity against the top fraction of the opponent's range."""
+        if fraction <= 0:
+            return 0.0
+        return float(np.interp(fraction, self._fractions, self._equity_mass)) / fraction
+
+    def ev(self, size):
+        """Chip EV of raising size: the pot when the opponent folds, else the called-raise EV."""
+        fraction = self.continue_fraction(size)
+        equity = self.equity_when_called(fraction)
+        called_ev = equity * (self.pot + size) - (1 - equity) * size
+        return (1 - fraction) * self.pot + fraction * called_ev
+
+class BetSizingResult:
+    """
+    Best raise size found by optimize_bet_size, with its EV and the opponent's response,
+    and the EV of calling call_amount with the same per-combo equities.
+    """
+    def __init__(self, size, ev, continue_fraction, equity_when_called, evaluations, call_amount=0.0, call_ev=0.0):
+        self.size = size
+        self.ev = ev
+        self.continue_fraction = continue_fraction
+        self.equity_when_called = equity_when_called
+        self.evaluations = evaluations
+        self.call_amount = call_amount
+        self.call_ev = call_ev
+
+    def best_action(self):
+        """Returns (action, size, ev) of the highest-EV action: 'fold', 'call' or 'raise'."""
+        action, size, ev = "fold", 0.0, 0.0
+        if self.call_ev > ev:
+            action, size, ev = "call", self.call_amount, self.call_ev
+        if self.ev > ev:
+            action, size, ev = "raise", self.size, self.ev
+        return action, size, ev
+
+    def to_dict(self):
+        return {"size": self.size, "ev": self.ev, "continue_fraction": self.continue_fraction,
+                "equity_when_called": self.equity_when_called, "evaluations": self.evaluations,
+                "call_amount": self.call_amount, "call_ev": self.call_ev}
+
+    def __repr__(self):
+        return (f"BetSizingResult(size={self.size:.2f}, ev={self.ev:.2f}, "
+                f"continue_fraction={self.continue_fraction:.3f}, evaluations={self.evaluations})")
+
+# Recherche de la taille optimale : quelques points répartis sur [min, max] encadrent le
+# maximum, puis une recherche par section dorée l'affine jusqu'à la tolérance demandée.
+SIZING_BRACKET_POINTS = 7
+
+def golden_section_maximize(function, low, high, tolerance):
+    """
+    Maximizes a unimodal function on [low, high] by golden-section search.
+    Returns (x, f(x), number of evaluations).
+    """
+    x1 = high - GOLDEN_RATIO_CONJUGATE * (high - low)
+    x2 = low + GOLDEN_RATIO_CONJUGATE * (high - low)
+    f1, f2 = function(x1), function(x2)
+    evaluations = 2
+    while high - low > tolerance:
+        if f1 >= f2:
+            high, x2, f2 = x2, x1, f1
+            x1 = high - GOLDEN_RATIO_CONJUGATE * (high - low)
+            f1 = function(x1)
+        else:
+            low, x1, f1 = x1, x2, f2
+            x2 = low + GOLDEN_RATIO_CONJUGATE * (high - low)
+            f2 = function(x2)
+        evaluations += 1
+    return (x1, f1, evaluations) if f1 >= f2 else (x2, f2, evaluations)
+
+def optimize_bet_size(scenario,
+                      player_name,
+                      opponent_range_string,
+                      min_size,
+                      max_size,
+                      response_curve=None,
+                      tolerance=0.01,
+                      num_simulations=2000,
+                      seed=None,
+                      call_amount=0.0):
+    """
+    Finds the raise size in [min_size, max_size] maximizing the chip EV against a single
+    opponent who folds part of their range (see FoldEquityModel).
+
+    response_curve(size, pot) -> fraction of the range that continues (pot_odds_response
+    by default). The per-combo equities are computed once; each size then costs one
+    interpolation. tolerance : précision de la taille, en jetons.
+    call_amount : le même vecteur d'équités donne aussi l'EV du call (BetSizingResult.call_ev),
+    contre toute la range, comme dans calculate_ev_profile.
+    Returns a BetSizingResult.
+    """
+    hero, opponents = _hero_and_opponents(scenario, player_name)
+    if len(opponents) != 1:
+        raise ValueError("Bet sizing with fold equity supports a single opponent.")
+    if not 0 < min_size <= max_size:
+        raise ValueError("Expected 0 < min_size <= max_size.")
+    opponent_range = _resolve_opponent_ranges(opponent_range_string, 1)[0]
+    _, weights, equities = hero_combo_equities(hero.hole_cards, opponent_range, scenario.community_cards,
+                                               num_simulations=num_simulations, seed=seed)
+    model = FoldEquityModel(equities, weights, scenario.pot, response_curve)
+
+    # Encadrement grossier du maximum, puis section dorée entre les voisins du meilleur point
+    grid = np.linspace(min_size, max_size, SIZING_BRACKET_POINTS)
+    grid_evs = [model.ev(size) for size in grid]
+    evaluations = len(grid)
+    best = int(np.argmax(grid_evs))
+    size, ev = float(grid[best]), grid_evs[best]
+    low, high = grid[max(best - 1, 0)], grid[min(best + 1, len(grid) - 1)]
+    if high - low > tolerance:
+        refined_size, refined_ev, refined_evaluations = golden_section_maximize(model.ev, low, high, tolerance)
+        evaluations += refined_evaluations
+        if refined_ev > ev:
+            size, ev = float(refined_size), refined_ev
+
+    fraction = model.continue_fraction(size)
+    equity = model.equity_when_called(1.0)
+    call_ev = equity * scenario.pot - (1 - equity) * call_amount
+    return BetSizingResult(size, ev, fraction, model.equity_when_called(fraction), evaluations,
+                           call_amount, call_ev)
+
+def _icm_ev(scenario, hero, equity, reward, risk, opponent_call, payouts):
+    """
+    Tournament $EV of the chip model of calculate_chip_ev: ICM value of the hero's stack after
+    winning (+reward, each opponent pays opponent_call) or losing (-risk, the opponents share
+    the pot and the risk), minus its ICM value after folding (the opponents share the pot,
+    the hero's stack is unchanged). Comme en jetons, le fold vaut donc 0.
+    """
+    stacks = np.array([p.stack for p in scenario.players], dtype=np.float64)
+    hero_index = scenario.players.index(hero)
+    opponent_mask = np.arange(len(stacks)) != hero_index
+    fold_stacks = stacks.copy()
+    fold_stacks[opponent_mask] += scenario.pot / opponent_mask.sum()
+    win_stacks = stacks.copy()
+    win_stacks[hero_index] += reward
+    win_stacks[opponent_mask] -= opponent_call
+    lose_stacks = stacks.copy()
+    lose_stacks[hero_index] -= risk
+    lose_stacks[opponent_mask] += (scenario.pot + risk) / opponent_mask.sum()
+    values = [calculate_icm(np.maximum(s, 0.0), payouts)[hero_index] for s in (fold_stacks, win_stacks, lose_stacks)]
+    return equity * values[1] + (1 - equity) * values[2] - values[0]
 
 def calculate_chip_ev(scenario,
                       player_name, 
                       opponent_range_string,
                       player_action, 
-                      bet_size=0.0):
+                      bet_size=0.0,
+                      output="chips",
+                      payouts=None):
     """
     Calculates the expected value (EV) of a poker action in chips.
-    This implementation assumes a 1-vs-1 scenario for the EV calculation.
+    opponent_range_string : range string or Range. With more than two players, the equity
+    comes from calculate_multiway_equity and it may be a list holding one range per opponent
+    (in seat order); a single range applies to every opponent.
+    output : "chips", or "$EV" to convert the outcomes into tournament money with the ICM
+    (payouts : prize of each place, first place first; the stacks are the players' stacks).
     """
-    hero = next((p for p in scenario.players if p.name == player_name), None)
-    if not hero or not hero.hole_cards:
-        raise ValueError("Hero or hero's hole cards not found.")
-
-    # For simplicity, this assumes one opponent.
-    opponent = next((p for p in scenario.players if p.name != player_name), None)
-    if not opponent:
-        raise ValueError("Opponent not found.")
+    if output not in ("chips", "$EV"):
+        raise ValueError(f"Unknown EV output: {output}")
+    if output == "$EV" and not payouts:
+        raise ValueError("A payout structure is required for $EV.")
+    hero, opponents = _hero_and_opponents(scenario, player_name)
 
     # The EV of folding is the baseline, which is 0. We don't lose any more chips.
+    # En $EV aussi : _icm_ev mesure call et raise par rapport aux tapis après le fold.
     if player_action == 'fold':
         return 0.0
 
-    # Parse the opponent's range from the string
-    opponent_range = parse_range_string(opponent_range_string)
-    
-    # Calculate equity against the opponent's range
-    equity = calculate_equity_fast(hero.hole_cards, opponent_range, scenario.community_cards)
+    # Calculate equity against the opponents' ranges
+    equity = _hero_equity(hero, opponents, opponent_range_string, scenario.community_cards)
 
     if player_action == 'call':
         risk = bet_size
 
         reward = scenario.pot
+        if output == "$EV":
+            return _icm_ev(scenario, hero, equity, reward, risk, 0.0, payouts)
         ev = (equity * reward) - ((1 - equity) * risk)
         return ev
     
@@ -175,9 +844,11 @@ def calculate_chip_ev(scenario,
         # Simplified model: Assumes opponent always calls the raise.
         # Your risk is the total size of your raise.
         risk = bet_size
-        # The reward is the pot before you raise, plus the opponent's implied call amount.
-        # The opponent must call your 'bet_size' to continue.
-        reward = scenario.pot + bet_size
+        # The reward is the pot before you raise, plus the opponents' implied call amounts.
+        # Each opponent must call your 'bet_size' to continue.
+        reward = scenario.pot + bet_size * len(opponents)
+        if output == "$EV":
+            return _icm_ev(scenario, hero, equity, reward, risk, bet_size, payouts)
         ev = (equity * reward) - ((1 - equity) * risk)
         return ev
 
@@ -0,0 +1,28 @@
+# --- Tables précalculées sur les 1326 combos de deux cartes ---
+#
+# Les combos sont indexés comme poker_logic.COMBOS (ordre colex, voir combo_index).
+
+import numpy as np
+from poker_logic import COMBOS
+
+NUM_COMBOS = len(COMBOS)
+
+# Cartes de chaque combo (1326 x 2)
+COMBO_CARDS = np.array(COMBOS)
+
+# CARD_COMBO_MASKS[c] : combos contenant la carte c (52 x 1326)
+CARD_COMBO_MASKS = np.zeros((52, NUM_COMBOS), dtype=bool)
+CARD_COMBO_MASKS[COMBO_CARDS[:, 0], np.arange(NUM_COMBOS)] = True
+CARD_COMBO_MASKS[COMBO_CARDS[:, 1], np.arange(NUM_COMBOS)] = True
+
+# COMBO_CONFLICTS[a, b] : les combos a et b partagent une carte (1326 x 1326)
+COMBO_CONFLICTS = CARD_COMBO_MASKS[COMBO_CARDS[:, 0]] | CARD_COMBO_MASKS[COMBO_CARDS[:, 1]]
+
+def combos_conflict(combo_ids1, combo_ids2):
+    """Boolean matrix telling which combos of combo_ids1 share a card with which of combo_ids2."""
+    return COMBO_CONFLICTS[np.ix_(np.asarray(combo_ids1), np.asarray(combo_ids2))]
+
+def dead_combo_mask(card_ids):
+    """Boolean mask of the combos that contain at least one of the given (dead) cards."""
+    card_ids = np.asarray(list(card_ids), dtype=np.int64)
+    return CARD_COMBO_MASKS[card_ids].any(axis=0)
@@ -0,0 +1,261 @@
+# --- Évaluateur vectorisé de mains (NumPy) ---
+#
+# Les cartes sont les identifiants entiers de poker_logic (rang * 4 + couleur).
+# Un score plus élevé correspond à une meilleure main : la catégorie occupe les
+# bits 20 et suivants, puis jusqu'à cinq rangs départageants de 4 bits chacun.
+# Les rangs passent par un automate (une consultation de table par carte, à la manière
+# des évaluateurs « two-plus-two »), les couleurs par deux petites tables dédiées.
+
+import os
+import numpy as np
+from poker_logic import RANKS
+
+HAND_CATEGORIES = (
+    "High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
+    "Flush", "Full House", "Four of a Kind", "Straight Flush",
+)
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+
+NUM_RANKS = len(RANKS)
+NUM_MASKS = 1 << NUM_RANKS
+CATEGORY_SHIFT = 20
+
+# Clé additive d'un multiensemble de rangs : chaque carte ajoute 5**rang
+# (au plus 4 cartes par rang, donc pas de retenue).
+RANK_POWERS = 5 ** np.arange(NUM_RANKS, dtype=np.int64)
+# Idem pour les couleurs : 3 bits par couleur (au plus 7 cartes).
+SUIT_POWERS = 8 ** np.arange(4, dtype=np.int32)
+
+def _encode(category, ranks):
+    """Packs a category and up to five tie-break ranks (highest first) into a score."""
+    score = category
+    for position in range(5):
+        score = (score << 4) | (ranks[position] if position < len(ranks) else 0)
+    return score
+
+def _straight_high(mask):
+    """Returns the high rank of the best straight in a rank bitmask, or -1."""
+    for high in range(NUM_RANKS - 1, 3, -1):
+        pattern = 0b11111 << (high - 4)
+        if mask & pattern == pattern:
+            return high
+    wheel = (1 << 12) | 0b1111  # A-2-3-4-5
+    if mask & wheel == wheel:
+        return 3
+    return -1
+
+def _top_ranks(mask, count):
+    """Returns the `count` highest ranks present in a rank bitmask."""
+    ranks = []
+    for rank in range(NUM_RANKS - 1, -1, -1):
+        if mask >> rank & 1:
+            ranks.append(rank)
+            if len(ranks) == count:
+                break
+    return ranks
+
+def _build_flush_table():
+    """Score of the best flush / straight flush for every 13-bit suit mask (0 if < 5 cards)."""
+    table = np.zeros(NUM_MASKS, dtype=np.int32)
+    for mask in range(NUM_MASKS):
+        if bin(mask).count("1") < 5:
+            continue
+        high = _straight_high(mask)
+        if high >= 0:
+            table[mask] = _encode(STRAIGHT_FLUSH, [high])
+        else:
+            table[mask] = _encode(FLUSH, _top_ranks(mask, 5))
+    return table
+
+def _score_rank_counts(counts):
+    """Best non-flush score for a multiset of ranks given as 13 counts."""
+    by_count = {4: [], 3: [], 2: [], 1: []}
+    for rank in range(NUM_RANKS - 1, -1, -1):
+        if counts[rank]:
+            by_count[counts[rank]].append(rank)
+    mask = sum(1 << rank for rank in range(NUM_RANKS) if counts[rank])
+
+    if by_count[4]:
+        quad = by_count[4][0]
+        kicker = max(rank for rank in range(NUM_RANKS) if counts[rank] and rank != quad)
+        return _encode(QUADS, [quad, kicker])
+    if by_count[3] and len(by_count[3]) + len(by_count[2]) >= 2:
+        trips = by_count[3][0]
+        pair = max(by_count[3][1:] + by_count[2])
+        return _encode(FULL_HOUSE, [trips, pair])
+    high = _straight_high(mask)
+    if high >= 0:
+        return _encode(STRAIGHT, [high])
+    if by_count[3]:
+        trips = by_count[3][0]
+        return _encode(TRIPS, [trips] + _top_ranks(mask & ~(1 << trips), 2))
+    if len(by_count[2]) >= 2:
+        pair1, pair2 = by_count[2][:2]
+        return _encode(TWO_PAIR, [pair1, pair2] + _top_ranks(mask & ~(1 << pair1) & ~(1 << pair2), 1))
+    if by_count[2]:
+        pair = by_count[2][0]
+        return _encode(PAIR, [pair] + _top_ranks(mask & ~(1 << pair), 3))
+    return _encode(HIGH_CARD, _top_ranks(mask, 5))
+
+def _iter_rank_counts(num_cards, rank=0, prefix=()):
+    """Yields every 13-tuple of rank counts (each <= 4) summing to num_cards."""
+    if rank == NUM_RANKS - 1:
+        if num_cards <= 4:
+            yield prefix + (num_cards,)
+        return
+    for count in range(min(4, num_cards) + 1):
+        yield from _iter_rank_counts(num_cards - count, rank + 1, prefix + (count,))
+
+def _build_rank_state_machine():
+    """
+    Builds the rank automaton: one state per multiset of at most 7 ranks (each rank at most
+    4 times), NEXT_STATE[state * 13 + rank] being the state reached by adding one card of
+    that rank (0 past 7 cards or 4 of a kind) and STATE_SCORES the non-flush score of the
+    5- to 7-card states. Les états sont pré-multipliés par 13 dans NEXT_STATE.
+    """
+    all_counts = [counts for num_cards in range(8) for counts in _iter_rank_counts(num_cards)]
+    counts = np.array(all_counts, dtype=np.int64)
+    keys = counts @ RANK_POWERS
+    order = np.argsort(keys)
+    counts, keys = counts[order], keys[order]
+
+    next_keys = keys[:, None] + RANK_POWERS[None, :]
+    valid = (counts < 4) & (counts.sum(axis=1) < 7)[:, None]
+    next_states = np.where(valid, np.searchsorted(keys, np.where(valid, next_keys, 0)), 0)
+    state_scores = np.zeros(len(keys), dtype=np.int32)
+    for state, state_counts in enumerate(counts):
+        if state_counts.sum() >= 5:
+            state_scores[state] = _score_rank_counts(state_counts)
+    return (next_states * NUM_RANKS).astype(np.int32).ravel(), state_scores
+
+def _build_flush_suit_table():
+    """Suit holding 5+ cards for every additive suit key, or -1 if there is no flush."""
+    table = np.full(8 ** 4, -1, dtype=np.int8)
+    for key in range(8 ** 4):
+        for suit in range(4):
+            if key >> (3 * suit) & 7 >= 5:
+                table[key] = suit
+    return table
+
+# --- Tables sur disque, projetées en mémoire (mmap) au premier usage ---
+#
+# Fichier brut : un en-tête de 4 int32 (version, nombre d'états, taille de FLUSH_TABLE,
+# taille de FLUSH_SUIT_TABLE) suivi de NEXT_STATE, STATE_SCORES, FLUSH_TABLE (int32)
+# et FLUSH_SUIT_TABLE (int8). Les processus d'un pool partagent ainsi les mêmes pages.
+
+EVALUATOR_TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evaluator_tables.bin")
+EVALUATOR_TABLES_VERSION = 1
+_HEADER_SIZE = 4
+
+def build_evaluator_tables():
+    """Builds the evaluator tables in memory: (next_state, state_scores, flush_table, flush_suit_table)."""
+    next_state, state_scores = _build_rank_state_machine()
+    return next_state, state_scores, _build_flush_table(), _build_flush_suit_table()
+
+def write_evaluator_tables(path=EVALUATOR_TABLES_PATH, tables=None):
+    """Writes the evaluator tables to path (atomically) and returns them."""
+    if tables is None:
+        tables = build_evaluator_tables()
+    next_state, state_scores, flush_table, flush_suit_table = tables
+    header = np.array([EVALUATOR_TABLES_VERSION, len(state_scores), len(flush_table), len(flush_suit_table)],
+                      dtype=np.int32)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as table_file:
+        for array in (header, next_state, state_scores, flush_table, flush_suit_table):
+            array.tofile(table_file)
+    os.replace(temporary_path, path)
+    return tables
+
+def _map_evaluator_tables(path):
+    """Memory-maps the tables written by write_evaluator_tables, or returns None if unusable."""
+    try:
+        header = np.fromfile(path, dtype=np.int32, count=_HEADER_SIZE)
+    except OSError:
+        return None
+    if len(header) < _HEADER_SIZE or header[0] != EVALUATOR_TABLES_VERSION:
+        return None
+    num_states, flush_size, suit_size = (int(value) for value in header[1:])
+    layout = ((np.int32, num_states * NUM_RANKS), (np.int32, num_states),
+              (np.int32, flush_size), (np.int8, suit_size))
+    expected_size = header.nbytes + sum(np.dtype(dtype).itemsize * size for dtype, size in layout)
+    if os.path.getsize(path) != expected_size:
+        return None
+    tables, offset = [], header.nbytes
+    for dtype, size in layout:
+        tables.append(np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(size,)))
+        offset += np.dtype(dtype).itemsize * size
+    return tuple(tables)
+
+_tables = None
+
+def load_evaluator_tables(path=EVALUATOR_TABLES_PATH):
+    """
+    Returns the evaluator tables, memory-mapped from path. Au premier appel, si le fichier
+    manque (ou date d'une autre version), les tables sont construites puis écrites ; si
+    l'écriture échoue, elles restent simplement en mémoire.
+    """
+    global _tables
+    if _tables is None:
+        tables = _map_evaluator_tables(path)
+        if tables is None:
+            tables = build_evaluator_tables()
+            try:
+                write_evaluator_tables(path, tables)
+                tables = _map_evaluator_tables(path) or tables
+            except OSError:
+                pass
+        _tables = tables
+    return _tables
+
+def evaluate_hands(cards):
+    """
+    Scores an array of hands in one vectorized call.
+
+    cards : array-like of shape (N, 5..7) holding integer card ids (0-51).
+    Returns an int32 array of N scores; a higher score is a better hand.
+    """
+    cards = np.asarray(cards, dtype=np.int32)
+    if cards.ndim != 2 or not 5 <= cards.shape[1] <= 7:
+        raise ValueError("Hands must be an array of shape (N, 5), (N, 6) or (N, 7).")
+    next_state, state_scores, flush_table, flush_suit_table = load_evaluator_tables()
+    ranks = cards >> 2
+    suits = cards & 3
+
+    # Automate des rangs : une consultation de table par carte
+    states = np.zeros(len(cards), dtype=np.int32)
+    for column in range(cards.shape[1]):
+        states = next_state[states + ranks[:, column]]
+    scores = state_scores[states // NUM_RANKS]
+
+    # Couleurs : seules les mains avec au moins 5 cartes d'une même couleur sont rescorées
+    flush_suits = flush_suit_table[SUIT_POWERS[suits].sum(axis=1)]
+    flush_rows = np.flatnonzero(flush_suits >= 0)
+    if flush_rows.size:
+        flush_suits = flush_suits[flush_rows]
+        in_suit = suits[flush_rows] == flush_suits[:, None]
+        flush_masks = np.where(in_suit, 1 << ranks[flush_rows], 0).sum(axis=1)
+        scores[flush_rows] = np.maximum(scores[flush_rows], flush_table[flush_masks])
+    return scores
+
+def evaluate_hand(cards):
+    """Scores a single hand given as a sequence of 5 to 7 integer card ids."""
+    return int(evaluate_hands([cards])[0])
+
+def hand_category(score):
+    """Returns the category name (e.g. 'Full House') of a score from evaluate_hands."""
+    return HAND_CATEGORIES[int(score) >> CATEGORY_SHIFT]
+
+def sample_cards(rng, deck, dead_mask, num_cards):
+    """
+    Draws num_cards cards per row without replacement (random keys + argpartition).
+
+    deck : int array of D candidate card ids.
+    dead_mask : bool array of shape (B, D) flagging cards that row cannot receive.
+    Returns an int array of shape (B, num_cards).
+    """
+    keys = rng.random(dead_mask.shape)
+    keys[dead_mask] = 2.0  # jamais parmi les num_cards plus petites clés
+    if num_cards == 0:
+        return np.empty((dead_mask.shape[0], 0), dtype=deck.dtype)
+    chosen = np.argpartition(keys, num_cards - 1, axis=1)[:, :num_cards]
+    return deck[chosen]
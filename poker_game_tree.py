@@ -0,0 +1,288 @@
+# --- Arbre de jeu multi-streets (héros contre une range) ---
+#
+# Les streets, les tailles de mise et les réponses adverses forment un arbre : nœuds du héros
+# (il choisit l'action d'EV maximale), nœuds du vilain (fréquences données par un
+# VillainModel) et nœuds de hasard (cartes des streets suivantes). Deux ordres d'actions qui
+# mènent au même pot, aux mêmes tapis, au même board et à la même range adverse donnent le
+# même sous-arbre : sa valeur est mémoïsée sous une clé canonique hachée (à permutation des
+# couleurs près, comme le cache d'équité). Les équités viennent de calculate_equity et de
+# son cache partagé.
+
+import numpy as np
+from poker_logic import card_from_id
+from poker_cache import equity_cache, equity_cache_key
+from poker_range import Range
+from poker_calculations import calculate_equity, hero_combo_equities, pot_odds_response
+
+STREET_NAMES = {0: "pre-flop", 3: "flop", 4: "turn", 5: "river"}
+
+class VillainModel:
+    """
+    Opponent responses in the game tree.
+
+    bet_frequency : probabilité de miser quand le vilain peut checker (taille bet_size, en
+    fraction du pot). Facing a bet, the villain continues with the top
+    response_curve(bet, pot) fraction of their range by equity (pot_odds_response by default),
+    raising with raise_frequency of the continuing range.
+    """
+    def __init__(self, bet_frequency=0.3, bet_size=0.5, response_curve=None, raise_frequency=0.0):
+        self.bet_frequency = bet_frequency
+        self.bet_size = bet_size
+        self.response_curve = pot_odds_response if response_curve is None else response_curve
+        self.raise_frequency = raise_frequency
+
+class GameState:
+    """
+    Immutable state of a heads-up hand between the hero and a villain range.
+    board : card ids ; pot / stacks in chips ; to_act : "hero" or "villain" ;
+    to_call : amount the player to act must call ; checks / raises : this street's actions.
+    """
+    __slots__ = ("board", "pot", "hero_stack", "villain_stack", "villain_range", "to_act",
+                 "to_call", "checks", "raises")
+
+    def __init__(self, board, pot, hero_stack, villain_stack, villain_range, to_act,
+                 to_call=0.0, checks=0, raises=0):
+        self.board = tuple(board)
+        self.pot = pot
+        self.hero_stack = hero_stack
+        self.villain_stack = villain_stack
+        self.villain_range = villain_range
+        self.to_act = to_act
+        self.to_call = to_call
+        self.checks = checks
+        self.raises = raises
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return GameState(**values)
+
+    @property
+    def street(self):
+        return STREET_NAMES.get(len(self.board), f"{len(self.board)} cards")
+
+    def __repr__(self):
+        return (f"GameState({self.street}, pot={self.pot:g}, stacks={self.hero_stack:g}/{self.villain_stack:g}, "
+                f"to_act={self.to_act}, to_call={self.to_call:g})")
+
+class GameTree:
+    """
+    Expectimax evaluator of the hero's chip EV over the remaining streets.
+
+    bet_sizes : tailles de mise du héros (fractions du pot) ; raise_size : une relance
+    porte la mise à raise_size fois la mise adverse ; max_raises : relances par street.
+    runouts_per_street : cartes tirées à chaque nœud de hasard (None : toutes).
+    The EV is the hero's final stack minus their stack at the root (0 for folding at once).
+    """
+    def __init__(self, hero_hand, villain_model=None, bet_sizes=(0.5, 1.0), raise_size=3.0, max_raises=1,
+                 hero_in_position=False, runouts_per_street=4, num_simulations=2000, seed=None,
+                 cache=equity_cache):
+        self.hero_hand = hero_hand
+        self.villain_model = VillainModel() if villain_model is None else villain_model
+        self.bet_sizes = tuple(bet_sizes)
+        self.raise_size = raise_size
+        self.max_raises = max_raises
+        self.first_to_act = "villain" if hero_in_position else "hero"
+        self.runouts_per_street = runouts_per_street
+        self.num_simulations = num_simulations
+        self.seed = seed
+        self.cache = cache
+        self._values = {}
+        self._continuing = {}
+        self.nodes = 0
+        self.memo_hits = 0
+
+    @classmethod
+    def from_scenario(cls, scenario, player_name, villain_range, **options):
+        """Builds the tree and its root state from a heads-up PokerScenario."""
+        hero = next((p for p in scenario.players if p.name == player_name), None)
+        if not hero or not hero.hole_cards:
+            raise ValueError("Hero or hero's hole cards not found.")
+        opponents = [p for p in scenario.players if p.name != player_name]
+        if len(opponents) != 1:
+            raise ValueError("The game tree supports a single opponent.")
+        if len(scenario.community_cards) < 3:
+            raise ValueError("The game tree starts on the flop, turn or river.")
+        board = [c.id for c in scenario.community_cards]
+        if set(board) & set(hero.hole_cards.ids):
+            raise ValueError("Overlap between hole cards and community cards.")
+        tree = cls(hero.hole_cards, **options)
+        villain_range = villain_range if isinstance(villain_range, Range) else Range.from_hands(villain_range)
+        root = GameState(board, scenario.pot, hero.stack, opponents[0].stack,
+                         villain_range.without_cards(list(hero.hole_cards.ids) + board), tree.first_to_act)
+        return tree, root
+
+    # --- Clés et services partagés ---
+
+    def state_key(self, state):
+        """Hashed canonical key of a state (suit permutations and action order do not matter)."""
+        combo_ids = state.villain_range.combo_ids
+        return equity_cache_key(self.hero_hand.ids, state.board, combo_ids, "game_tree",
+                                round(state.pot, 6), round(state.hero_stack, 6), round(state.villain_stack, 6),
+                                state.to_act, round(state.to_call, 6), state.checks, state.raises,
+                                weights=state.villain_range.weights[combo_ids])
+
+    def _cards(self, board):
+        return [card_from_id(card_id) for card_id in board]
+
+    def showdown_equity(self, state):
+        """Hero equity against the villain range on the state's board (shared equity cache)."""
+        result = calculate_equity(self.hero_hand, state.villain_range, self._cards(state.board),
+                                  num_simulations=self.num_simulations, seed=self.seed, cache=self.cache)
+        return result.equity
+
+    def continuing_range(self, state, fraction):
+        """The villain's top fraction (by weight) of their range against the hero on this board."""
+        if fraction >= 1:
+            return state.villain_range
+        key = (state.board, state.villain_range.weights.tobytes(), round(fraction, 9))
+        if key not in self._continuing:
+            combo_ids, weights, equities = hero_combo_equities(self.hero_hand, state.villain_range,
+                                                               self._cards(state.board),
+                                                               num_simulations=self.num_simulations, seed=self.seed)
+            # Combos du vilain du plus fort au plus faible ; la dernière est gardée en partie
+            order = np.argsort(equities, kind="stable")
+            kept_mass = np.clip(fraction * weights.sum() - np.concatenate([[0.0], np.cumsum(weights[order])[:-1]]),
+                                0.0, weights[order])
+            new_weights = np.zeros(len(state.villain_range.weights))
+            new_weights[combo_ids[order]] = kept_mass
+            self._continuing[key] = Range(new_weights)
+        return self._continuing[key]
+
+    # --- Évaluation ---
+
+    def value(self, state):
+        """Expected final stack of the hero in the subtree rooted at state (memoized by state_key)."""
+        if state.to_act == "won":
+            return state.hero_stack + state.pot
+        key = self.state_key(state)
+        if key in self._values:
+            self.memo_hits += 1
+            return self._values[key]
+        self.nodes += 1
+        if not state.villain_range:
+            # Plus aucune main adverse possible : le héros remporte le pot
+            value = state.hero_stack + state.pot
+        elif state.to_act == "showdown":
+            value = state.hero_stack + self.showdown_equity(state) * state.pot
+        elif state.to_act == "chance":
+            value = float(np.mean([self.value(child) for child in self._deal(state)]))
+        elif state.to_act == "hero":
+            value = state.hero_stack + max(self.action_values(state).values())
+        else:
+            value = sum(probability * self.value(child) for probability, child in self._villain_children(state))
+        self._values[key] = value
+        return value
+
+    def action_values(self, state):
+        """
+        {action label: hero chip EV} at a hero node, e.g. {'check': .., 'bet 50%': ..} or
+        {'fold': 0, 'call': .., 'raise': ..}, relative to the hero's stack at that node.
+        """
+        if state.to_act != "hero":
+            raise ValueError("action_values needs a state where the hero acts.")
+        return {label: 0.0 if child is None else self.value(child) - state.hero_stack
+                for label, child in self._hero_children(state)}
+
+    def line_value(self, state, hero_actions):
+        """
+        Hero chip EV of a line on the current street, e.g. ["check", "raise"] (check-raise) or
+        ["bet 50%"] (lead): the hero plays these actions at their next decisions of the street
+        (an action that is not available is replaced by the best one), then plays optimally.
+        """
+        return self._line_final_stack(state, list(hero_actions), len(state.board)) - state.hero_stack
+
+    def _line_final_stack(self, state, hero_actions, street_cards):
+        if not hero_actions or len(state.board) != street_cards or state.to_act not in ("hero", "villain"):
+            return self.value(state)
+        if state.to_act == "villain":
+            return sum(probability * self._line_final_stack(child, hero_actions, street_cards)
+                       for probability, child in self._villain_children(state))
+        children = dict(self._hero_children(state))
+        if hero_actions[0] not in children:
+            return self.value(state)
+        child = children[hero_actions[0]]
+        if child is None:
+            return state.hero_stack
+        return self._line_final_stack(child, hero_actions[1:], street_cards)
+
+    def _hero_children(self, state):
+        """(label, child state) of each hero action, None for folding."""
+        if state.to_call > 0:
+            yield "fold", None
+            yield "call", self._after_call(state, "hero")
+            if state.raises < self.max_raises and state.hero_stack > state.to_call:
+                yield "raise", self._after_bet(state, "hero", state.to_call * self.raise_size)
+            return
+        yield "check", self._after_check(state)
+        for fraction in self.bet_sizes:
+            if state.hero_stack > 0:
+                yield f"bet {fraction:.0%}", self._after_bet(state, "hero", fraction * state.pot)
+
+    def _villain_children(self, state):
+        """(probability, child state) of the villain's responses."""
+        model = self.villain_model
+        if state.to_call == 0:
+            children = []
+            if model.bet_frequency < 1:
+                children.append((1 - model.bet_frequency, self._after_check(state)))
+            if model.bet_frequency > 0 and state.villain_stack > 0:
+                children.append((model.bet_frequency, self._after_bet(state, "villain", model.bet_size * state.pot)))
+            return children
+        fraction = float(np.clip(model.response_curve(state.to_call, state.pot - state.to_call), 0.0, 1.0))
+        # Le héros remporte le pot (sa mise comprise) quand le vilain se couche
+        children = [(1 - fraction, state.replace(to_act="won", to_call=0.0))] if fraction < 1 else []
+        if fraction > 0:
+            continuing = state.replace(villain_range=self.continuing_range(state, fraction))
+            raise_frequency = model.raise_frequency if state.raises < self.max_raises and state.villain_stack > state.to_call else 0.0
+            children.append((fraction * (1 - raise_frequency), self._after_call(continuing, "villain")))
+            if raise_frequency > 0:
+                children.append((fraction * raise_frequency,
+                                 self._after_bet(continuing, "villain", state.to_call * self.raise_size)))
+        return children
+
+    def _stacks_after(self, state, player, amount):
+        if player == "hero":
+            return state.hero_stack - amount, state.villain_stack
+        return state.hero_stack, state.villain_stack - amount
+
+    def _after_check(self, state):
+        if state.checks or state.to_act != self.first_to_act:
+            return self._end_of_street(state)
+        return state.replace(to_act=_other(state.to_act), checks=1)
+
+    def _after_call(self, state, player):
+        hero_stack, villain_stack = self._stacks_after(state, player, state.to_call)
+        return self._end_of_street(state.replace(pot=state.pot + state.to_call, hero_stack=hero_stack,
+                                                 villain_stack=villain_stack, to_call=0.0))
+
+    def _after_bet(self, state, player, total):
+        """player puts total chips in (call included), capped by both stacks."""
+        own_stack = state.hero_stack if player == "hero" else state.villain_stack
+        other_stack = state.villain_stack if player == "hero" else state.hero_stack
+        total = min(total, own_stack, other_stack + state.to_call)
+        hero_stack, villain_stack = self._stacks_after(state, player, total)
+        raises = state.raises + (1 if state.to_call > 0 else 0)
+        return state.replace(pot=state.pot + total, hero_stack=hero_stack, villain_stack=villain_stack,
+                             to_act=_other(player), to_call=total - state.to_call, checks=0, raises=raises)
+
+    def _end_of_street(self, state):
+        """Showdown on the river or when a player is all-in, else a chance node dealing the next card."""
+        if len(state.board) == 5 or state.hero_stack == 0 or state.villain_stack == 0:
+            return state.replace(to_act="showdown", to_call=0.0, checks=0, raises=0)
+        return state.replace(to_act="chance", to_call=0.0, checks=0, raises=0)
+
+    def _deal(self, state):
+        """Next-street states for runouts_per_street cards (or every card)."""
+        dead = set(state.board) | set(self.hero_hand.ids)
+        deck = np.array([card_id for card_id in range(52) if card_id not in dead])
+        if self.runouts_per_street is not None and self.runouts_per_street < len(deck):
+            rng = np.random.default_rng([len(state.board)] + list(state.board) + ([self.seed] if self.seed is not None else []))
+            deck = rng.choice(deck, self.runouts_per_street, replace=False)
+        for card_id in deck.tolist():
+            villain_range = state.villain_range.without_cards([card_id])
+            yield GameState(state.board + (card_id,), state.pot, state.hero_stack, state.villain_stack,
+                            villain_range, self.first_to_act)
+
+def _other(player):
+    return "villain" if player == "hero" else "hero"
@@ -0,0 +1,103 @@
+# --- ICM (Independent Chip Model) : conversion des tapis en espérance de gains ($EV) ---
+#
+# Modèle de Malmuth-Harville : un joueur termine premier avec une probabilité égale à sa part
+# des jetons, puis les places suivantes sont attribuées de la même façon parmi les joueurs
+# restants. La récursion naïve sur les ordres d'arrivée est factorielle ; ici les probabilités
+# sont mémoïsées par sous-ensemble de joueurs déjà classés (bitmask), niveau par niveau, et
+# seuls les sous-ensembles plus petits que le nombre de places payées sont parcourus.
+
+from math import comb
+import numpy as np
+
+# Au-delà de ce nombre de sous-ensembles à parcourir, calculate_icm passe en Monte-Carlo
+ICM_EXACT_MAX_SUBSETS = 200000
+ICM_SIMULATIONS = 100000
+
+def _validate(stacks, payouts):
+    stacks = np.asarray(stacks, dtype=np.float64)
+    payouts = np.asarray(payouts, dtype=np.float64)
+    if stacks.ndim != 1 or not len(stacks):
+        raise ValueError("Expected a non-empty list of stacks.")
+    if (stacks < 0).any():
+        raise ValueError("Stacks cannot be negative.")
+    if payouts.ndim != 1:
+        raise ValueError("Expected a list of payouts (first place first).")
+    # Seuls les joueurs encore en jeu se partagent les places ; les places en trop sont ignorées
+    return stacks, payouts[:int(np.count_nonzero(stacks))]
+
+def icm_subset_count(num_players, num_paid):
+    """Number of bitmask subsets visited by icm_equities (places 1 to num_paid)."""
+    return sum(comb(num_players, size) for size in range(min(num_paid, num_players)))
+
+def icm_equities(stacks, payouts):
+    """
+    Exact Malmuth-Harville ICM equity of every player.
+
+    stacks : chip stacks (0 for a busted player, who gets nothing).
+    payouts : prize of each place, first place first.
+    Returns a NumPy array of $EV aligned with stacks.
+    """
+    stacks, payouts = _validate(stacks, payouts)
+    live = np.flatnonzero(stacks > 0)
+    equities = np.zeros(len(stacks))
+    if not len(payouts):
+        return equities
+    live_stacks = stacks[live]
+    total = live_stacks.sum()
+    bits = 1 << np.arange(len(live), dtype=np.int64)
+
+    # probabilities[mask] : probabilité que les joueurs de mask occupent (dans un ordre
+    # quelconque) les |mask| premières places
+    probabilities = {0: 1.0}
+    live_equities = np.zeros(len(live))
+    for place, payout in enumerate(payouts):
+        next_probabilities = {}
+        for mask, probability in probabilities.items():
+            remaining = np.flatnonzero((mask & bits) == 0)
+            finish = probability * live_stacks[remaining] / (total - live_stacks[(mask & bits) != 0].sum())
+            live_equities[remaining] += payout * finish
+            if place + 1 < len(payouts):
+                for player, player_probability in zip(remaining.tolist(), finish.tolist()):
+                    next_mask = mask | (1 << player)
+                    next_probabilities[next_mask] = next_probabilities.get(next_mask, 0.0) + player_probability
+        probabilities = next_probabilities
+    equities[live] = live_equities
+    return equities
+
+def icm_equities_monte_carlo(stacks, payouts, num_simulations=ICM_SIMULATIONS, seed=None):
+    """
+    Monte Carlo approximation of icm_equities for large fields.
+
+    Un ordre d'arrivée de Harville s'obtient en triant des durées exponentielles de taux
+    égal au tapis de chaque joueur (le plus petit temps prend la première place) : tous les
+    ordres d'un lot sont ainsi tirés d'un seul appel vectorisé.
+    """
+    stacks, payouts = _validate(stacks, payouts)
+    live = np.flatnonzero(stacks > 0)
+    equities = np.zeros(len(stacks))
+    if not len(payouts):
+        return equities
+    rng = np.random.default_rng(seed)
+    live_equities = np.zeros(len(live))
+    batch_size = max(1, 1000000 // len(live))
+    for start in range(0, num_simulations, batch_size):
+        size = min(batch_size, num_simulations - start)
+        arrival = rng.exponential(size=(size, len(live))) / stacks[live]
+        places = np.argsort(arrival, axis=1)[:, :len(payouts)]
+        live_equities += np.bincount(places.ravel(), weights=np.tile(payouts, size), minlength=len(live))
+    equities[live] = live_equities / num_simulations
+    return equities
+
+def calculate_icm(stacks, payouts, method="auto", num_simulations=ICM_SIMULATIONS, seed=None):
+    """
+    ICM $EV of every player. method : "exact", "monte_carlo" or "auto" (exact while the
+    number of subsets to visit stays below ICM_EXACT_MAX_SUBSETS).
+    """
+    if method == "auto":
+        num_live = int(np.count_nonzero(np.asarray(stacks, dtype=np.float64) > 0))
+        method = "exact" if icm_subset_count(num_live, len(payouts)) <= ICM_EXACT_MAX_SUBSETS else "monte_carlo"
+    if method == "exact":
+        return icm_equities(stacks, payouts)
+    if method == "monte_carlo":
+        return icm_equities_monte_carlo(stacks, payouts, num_simulations, seed)
+    raise ValueError(f"Unknown ICM method: {method}")
@@ -3,6 +3,19 @@
 RANKS = '23456789TJQKA'
 SUITS = 'cdhs'
 
+# Table précalculée des 52 cartes : l'identifiant entier d'une carte vaut
+# rang * 4 + couleur, ce qui permet aux calculs d'équité de ne manipuler que des ints.
+CARD_STRINGS = tuple(rank + suit for rank in RANKS for suit in SUITS)
+CARD_IDS = {card_string: card_id for card_id, card_string in enumerate(CARD_STRINGS)}
+
+# Les 1326 combinaisons de deux cartes, en ordre colex : le combo (c1 < c2) a l'id c1 + c2 * (c2 - 1) / 2
+COMBOS = tuple((card1, card2) for card2 in range(52) for card1 in range(card2))
+
+def combo_index(card_id1, card_id2):
+    """Returns the combo id (0-1325) of two distinct integer card ids, in any order."""
+    low, high = min(card_id1, card_id2), max(card_id1, card_id2)
+    return low + high * (high - 1) // 2
+
 class Card:
     def __init__(self, rank, suit):
         # Reference the module-level constants
@@ -12,6 +25,7 @@ class Card:
             raise ValueError(f"Invalid suit: {suit}")
         self.rank = rank.upper()
         self.suit = suit.lower()
+        self.id = CARD_IDS[self.rank + self.suit]
 
     def get_rank_value(self):
         # Reference the module-level constant
@@ -25,11 +39,11 @@ class Card:
 
     def __eq__(self, other):
         if isinstance(other, Card):
-            return self.rank == other.rank and self.suit == other.suit
+            return self.id == other.id
         return False
 
     def __hash__(self):
-        return hash((self.rank, self.suit))
+        return hash(self.id)
 
 class Hand:
     # ... (code complet de la classe Hand) ...
@@ -39,6 +53,8 @@ class Hand:
         if card1 == card2:
              raise ValueError("A hand cannot contain duplicate cards.")
         self.cards = tuple(sorted([card1, card2], key=lambda c: c.get_rank_value(), reverse=True))
+        self.ids = (self.cards[0].id, self.cards[1].id)
+        self.combo_id = combo_index(*self.ids)
 
     def __str__(self):
         return f"{self.cards[0]}{self.cards[1]}"
@@ -48,11 +64,11 @@ class Hand:
 
     def __eq__(self, other):
         if isinstance(other, Hand):
-            return set(self.cards) == set(other.cards)
+            return set(self.ids) == set(other.ids)
         return False
 
     def __hash__(self):
-        return hash(frozenset(self.cards))
+        return hash(frozenset(self.ids))
 
 class Player:
     # ... (code complet de la classe Player) ...
@@ -92,11 +108,16 @@ class PokerScenario:
         self.current_player_index = 0
 
 def create_deck():
-    """Creates a standard 52-card deck."""
+    """Creates a standard 52-card deck (each Card carries its integer id)."""
     return {Card(rank, suit) for rank in RANKS for suit in SUITS}
 
+def card_from_id(card_id):
+    """Builds the Card object matching an integer card id (0-51)."""
+    card_string = CARD_STRINGS[card_id]
+    return Card(card_string[0], card_string[1])
+
 def parse_hand_string(hand_string):
-    """Parses a two-character hand string (e.g., 'AhKd') into a Hand object."""
+    """Parses a two-character hand string (e.g., 'AhKd') into a Hand object (see Hand.ids)."""
     if len(hand_string) != 4:
         raise ValueError("Hole cards string must be exactly 4 characters (e.g., 'AhKd').")
     card1_str = hand_string[:2]
@@ -122,3 +143,37 @@ def parse_community_cards_string(community_cards_string):
     return cards
 
 
+
+# Positions des joueurs, dans l'ordre de saisie des tapis
+POSITIONS = {2: ('SB', 'BB'), 3: ('BTN', 'SB', 'BB')}
+
+def build_scenario(stacks, position, small_blind, big_blind, ante=0.0, hole_cards="", community_cards=""):
+    """
+    Builds a PokerScenario from plain values (no GUI needed).
+
+    stacks : stacks in seat order (see POSITIONS) ; position : the hero's position ;
+    hole_cards / community_cards : strings such as 'AhKd' and 'Th9d2c'.
+    Returns (scenario, hero name). Le héros est placé en premier, suivi des autres joueurs
+    dans l'ordre des sièges.
+    """
+    stacks = [float(stack) for stack in stacks]
+    if len(stacks) not in POSITIONS:
+        raise ValueError("Only 2 or 3 players supported.")
+    positions = POSITIONS[len(stacks)]
+    if position not in positions:
+        raise ValueError(f"Invalid position '{position}' for {len(stacks)} players (expected one of {', '.join(positions)}).")
+
+    hero_pos_index = positions.index(position)
+    player_stacks = [stacks[hero_pos_index]] + [s for i, s in enumerate(stacks) if i != hero_pos_index]
+    player_names = [f"Player {i+1}" for i in range(len(stacks))]
+    players = [Player(name, stack) for name, stack in zip(player_names, player_stacks)]
+
+    hero_hand = parse_hand_string(hole_cards.strip())
+    board = parse_community_cards_string(community_cards.strip())
+    if any(card in board for card in hero_hand.cards):
+        raise ValueError("Overlap between hole cards and community cards.")
+    players[0].hole_cards = hero_hand
+
+    scenario = PokerScenario(players, float(small_blind), float(big_blind), float(ante))
+    scenario.community_cards = board
+    return scenario, player_names[0]
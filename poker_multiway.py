@@ -0,0 +1,90 @@
+# --- Équité multiway (3 joueurs et plus, une range par adversaire) ---
+#
+# Les mains adverses sont tirées l'une après l'autre parmi les combos encore compatibles
+# (masques de conflits précalculés de poker_combos), sans rejet. Ce tirage séquentiel
+# favorise les combos qui laissent peu de choix aux adversaires suivants ; chaque
+# échantillon est donc pondéré par le produit des poids disponibles à chaque étape
+# (échantillonnage préférentiel), ce qui redonne exactement la loi jointe des mains.
+
+import numpy as np
+from poker_combos import COMBO_CARDS, combos_conflict
+from poker_evaluator import evaluate_hands, sample_cards
+from poker_range import range_combos
+
+# Nombre d'échantillons traités par lot vectorisé
+MULTIWAY_BATCH_SIZE = 4096
+
+def sample_opponent_holdings(rng, combo_lists, weight_lists, batch_size):
+    """
+    Draws one card-removal-consistent holding per opponent for batch_size samples.
+
+    combo_lists : list of combo id arrays (one per opponent, dead cards already removed).
+    weight_lists : list of weight arrays aligned with combo_lists.
+    Returns (holdings, weights): a batch_size x n_opponents array of combo ids and the
+    importance weight of each sample (0 when no compatible holding was left).
+    """
+    n_opponents = len(combo_lists)
+    blocked = [np.zeros((batch_size, len(combos)), dtype=bool) for combos in combo_lists]
+    conflicts = {(i, j): combos_conflict(combo_lists[i], combo_lists[j])
+                 for i in range(n_opponents) for j in range(i + 1, n_opponents)}
+    holdings = np.empty((batch_size, n_opponents), dtype=np.int64)
+    weights = np.ones(batch_size)
+    for i, (combos, combo_weights) in enumerate(zip(combo_lists, weight_lists)):
+        available = np.where(blocked[i], 0.0, combo_weights)
+        cumulative = np.cumsum(available, axis=1)
+        totals = cumulative[:, -1]
+        weights *= totals
+        targets = rng.random(batch_size) * totals
+        choices = np.minimum((cumulative <= targets[:, None]).sum(axis=1), len(combos) - 1)
+        holdings[:, i] = combos[choices]
+        for j in range(i + 1, n_opponents):
+            blocked[j] |= conflicts[(i, j)][choices]
+    return holdings, weights
+
+def calculate_multiway_equity(hero_hand,
+                              opponent_ranges,
+                              community_cards,
+                              num_simulations=10000,
+                              seed=None):
+    """
+    Equity of every player in a multiway all-in, each opponent having their own range
+    (Range, whose weights are honoured, or set of Hand objects). Returns a NumPy array: hero first, then each opponent in order.
+    Les pots partagés sont répartis à parts égales entre les gagnants.
+    """
+    if not opponent_ranges:
+        raise ValueError("At least one opponent range is required.")
+    board_ids = np.array([c.id for c in community_cards], dtype=np.int64)
+    dead_ids = set(hero_hand.ids) | set(board_ids.tolist())
+    live_ranges = [range_combos(opponent_range, dead_ids) for opponent_range in opponent_ranges]
+    if any(not len(combos) for combos, _ in live_ranges):
+        raise ValueError("An opponent range has no combo left once the known cards are removed.")
+    combo_lists = [combos for combos, _ in live_ranges]
+    weight_lists = [np.ones(len(combos)) if weights is None else weights for combos, weights in live_ranges]
+
+    rng = np.random.default_rng(seed)
+    deck = np.array([card_id for card_id in range(52) if card_id not in dead_ids])
+    num_cards_to_draw = 5 - len(board_ids)
+    n_players = len(combo_lists) + 1
+    share_totals = np.zeros(n_players)
+    weight_total = 0.0
+
+    for batch_start in range(0, num_simulations, MULTIWAY_BATCH_SIZE):
+        batch_size = min(MULTIWAY_BATCH_SIZE, num_simulations - batch_start)
+        holdings, weights = sample_opponent_holdings(rng, combo_lists, weight_lists, batch_size)
+        hole_cards = COMBO_CARDS[holdings]  # batch x adversaires x 2
+        dead = (deck[None, :, None] == hole_cards.reshape(batch_size, 1, -1)).any(axis=2)
+        board = np.concatenate([np.broadcast_to(board_ids, (batch_size, len(board_ids))),
+                                sample_cards(rng, deck, dead, num_cards_to_draw)], axis=1)
+
+        scores = np.empty((batch_size, n_players), dtype=np.int64)
+        scores[:, 0] = evaluate_hands(np.concatenate([np.broadcast_to(hero_hand.ids, (batch_size, 2)), board], axis=1))
+        for i in range(n_players - 1):
+            scores[:, i + 1] = evaluate_hands(np.concatenate([hole_cards[:, i], board], axis=1))
+        winners = scores == scores.max(axis=1, keepdims=True)
+        shares = winners / winners.sum(axis=1, keepdims=True)
+        share_totals += weights @ shares
+        weight_total += weights.sum()
+
+    if weight_total == 0:
+        raise ValueError("No card-removal-consistent set of opponent holdings exists.")
+    return share_totals / weight_total
@@ -0,0 +1,85 @@
+# --- Table d'équité préflop précalculée ---
+#
+# La table contient l'équité all-in préflop de chaque combo (1326) contre chaque autre combo,
+# stockée en uint16 dans un fichier binaire brut chargé via numpy.memmap. Elle est produite
+# une fois pour toutes par generate_preflop_table.py.
+
+import os
+from itertools import permutations
+import numpy as np
+from poker_logic import RANKS, COMBOS, combo_index
+from poker_combos import combos_conflict
+
+PREFLOP_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.bin")
+PREFLOP_TABLE_SHAPE = (len(COMBOS), len(COMBOS))
+EQUITY_SCALE = 65534
+MISSING_EQUITY = 65535  # combos qui partagent une carte
+
+def hand_class_name(card_id1, card_id2):
+    """Returns the hand class ('AA', 'AKs', 'T9o', ...) of two integer card ids."""
+    (rank1, suit1), (rank2, suit2) = sorted([divmod(card_id1, 4), divmod(card_id2, 4)], reverse=True)
+    if rank1 == rank2:
+        return RANKS[rank1] * 2
+    return RANKS[rank1] + RANKS[rank2] + ("s" if suit1 == suit2 else "o")
+
+def _hand_class_grid():
+    """The 169 hand classes in matrix order (A -> 2): pairs on the diagonal, suited above, offsuit below."""
+    ranks = RANKS[::-1]
+    classes = []
+    for row, first in enumerate(ranks):
+        for column, second in enumerate(ranks):
+            if row == column:
+                classes.append(first * 2)
+            elif row < column:
+                classes.append(first + second + "s")
+            else:
+                classes.append(second + first + "o")
+    return tuple(classes)
+
+HAND_CLASSES = _hand_class_grid()
+HAND_CLASS_INDEX = {name: index for index, name in enumerate(HAND_CLASSES)}
+COMBO_CLASSES = np.array([HAND_CLASS_INDEX[hand_class_name(*combo)] for combo in COMBOS])
+
+# Image de chaque carte / combo par les 24 permutations de couleurs
+SUIT_PERMUTATIONS = tuple(permutations(range(4)))
+CARD_PERMUTATIONS = np.array([[card_id - card_id % 4 + perm[card_id % 4] for card_id in range(52)]
+                              for perm in SUIT_PERMUTATIONS])
+COMBO_PERMUTATIONS = np.array([[combo_index(perm[card1], perm[card2]) for card1, card2 in COMBOS]
+                               for perm in CARD_PERMUTATIONS])
+
+def canonical_matchup_keys():
+    """
+    Returns a 1326 x 1326 int64 array holding, for each (hero combo, villain combo), the key
+    hero * 1326 + villain of the canonical matchup under suit permutation (-1 if they conflict).
+    Deux matchups de même clé ont exactement la même équité.
+    """
+    keys = np.empty(PREFLOP_TABLE_SHAPE, dtype=np.int64)
+    all_combos = np.arange(len(COMBOS))
+    for hero_combo in all_combos:
+        candidate_keys = COMBO_PERMUTATIONS[:, hero_combo, None] * len(COMBOS) + COMBO_PERMUTATIONS
+        keys[hero_combo] = candidate_keys.min(axis=0)
+    keys[combos_conflict(all_combos, all_combos)] = -1
+    return keys
+
+_preflop_tables = {}
+
+def load_preflop_table(path=PREFLOP_TABLE_PATH):
+    """Memory-maps the preflop equity table (loaded once per path), or returns None if it is missing."""
+    if path not in _preflop_tables:
+        if not os.path.exists(path):
+            return None
+        _preflop_tables[path] = np.memmap(path, dtype=np.uint16, mode='r', shape=PREFLOP_TABLE_SHAPE)
+    return _preflop_tables[path]
+
+def preflop_range_equity(table, hero_combo, combo_ids, weights=None):
+    """
+    Equity of the hero combo against a range of combos, as a weighted lookup in the table.
+    Les combos en conflit avec la main du héros sont ignorés (1.0 s'il n'en reste aucun).
+    """
+    row = table[hero_combo, np.asarray(combo_ids, dtype=np.int64)]
+    valid = row != MISSING_EQUITY
+    if not valid.any():
+        return 1.0
+    weights = np.ones(len(row)) if weights is None else np.asarray(weights, dtype=np.float64)
+    equities = row[valid] / EQUITY_SCALE
+    return float((equities * weights[valid]).sum() / weights[valid].sum())
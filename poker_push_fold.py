@@ -0,0 +1,301 @@
+# --- Équilibre push/fold à 3 joueurs (Expresso) ---
+#
+# Chaque joueur ne peut que jouer tapis ou se coucher (BTN, puis SB, puis BB), avec six
+# décisions : BTN push ; SB push (BTN couché) ; SB call (BTN push) ; BB call contre le push
+# de la SB ; BB call contre le push du BTN (SB couchée) ; BB overcall (BTN push, SB call).
+# Les stratégies (probabilité de push / call par classe de main, 169 classes) sont obtenues
+# par fictitious play : à chaque itération, chaque décision joue sa meilleure réponse aux
+# stratégies moyennes des autres, puis les moyennes sont mises à jour.
+#
+# Tout est vectorisé sur les triplets de classes (BTN, SB, BB) : tenseurs 169 x 169 x 169 de
+# probabilités (avec le retrait des cartes par paire de joueurs) et de tapis finaux. L'EV est
+# en jetons (tapis final espéré), ce qui convient aux Expresso winner-take-all.
+
+import os
+import numpy as np
+from poker_logic import Player, PokerScenario
+from poker_combos import COMBO_CARDS, combos_conflict
+from poker_evaluator import evaluate_hands, sample_cards
+from poker_preflop import (HAND_CLASSES, COMBO_CLASSES, EQUITY_SCALE, MISSING_EQUITY,
+                           load_preflop_table)
+from poker_range import Range, CLASS_COMBO_MASKS, CLASS_COMBO_COUNTS
+
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLASS_EQUITY_PATH = os.path.join(_MODULE_DIR, "preflop_class_equity.bin")
+PUSH_FOLD_CHARTS_DIR = os.path.join(_MODULE_DIR, "push_fold_charts")
+
+NUM_CLASSES = len(HAND_CLASSES)
+PUSH_FOLD_DECISIONS = ("btn_push", "sb_push", "sb_call", "bb_call_sb", "bb_call_btn", "bb_overcall")
+# Tirages par paire de classes quand la table préflop combo contre combo est absente
+CLASS_EQUITY_SAMPLES = 1000
+PUSH_FOLD_ITERATIONS = 300
+
+def class_pair_counts():
+    """169 x 169 matrix of the number of card-compatible combo pairs between two hand classes."""
+    all_combos = np.arange(len(COMBO_CLASSES))
+    one_hot = CLASS_COMBO_MASKS.astype(np.float64)
+    return one_hot @ (~combos_conflict(all_combos, all_combos)).astype(np.float64) @ one_hot.T
+
+def _class_equity_from_preflop_table(table):
+    """Class-vs-class equity as the average of the combo-vs-combo preflop table."""
+    valid = table != MISSING_EQUITY
+    equities = np.where(valid, table / EQUITY_SCALE, 0.0)
+    one_hot = CLASS_COMBO_MASKS.astype(np.float64)
+    return (one_hot @ equities @ one_hot.T) / (one_hot @ valid.astype(np.float64) @ one_hot.T)
+
+def _class_equity_monte_carlo(samples, seed):
+    """Class-vs-class equity by drawing samples compatible combo pairs and boards per class pair."""
+    rng = np.random.default_rng(seed)
+    class_combos = [np.flatnonzero(mask) for mask in CLASS_COMBO_MASKS]
+    # Combos de chaque classe, complétés par des -1 jusqu'aux 12 combos d'une main offsuit
+    combo_table = np.full((NUM_CLASSES, CLASS_COMBO_COUNTS.max()), -1, dtype=np.int64)
+    for hand_class, combos in enumerate(class_combos):
+        combo_table[hand_class, :len(combos)] = combos
+    deck = np.arange(52)
+    equities = np.full((NUM_CLASSES, NUM_CLASSES), 0.5)
+    for hero_class in range(NUM_CLASSES):
+        # Toutes les classes adverses d'un coup : villain_class >= hero_class
+        villain_classes = np.repeat(np.arange(hero_class, NUM_CLASSES), samples)
+        hero_combos = rng.choice(class_combos[hero_class], len(villain_classes))
+        villain_combos = np.empty_like(hero_combos)
+        pending = np.arange(len(villain_classes))
+        while len(pending):
+            classes = villain_classes[pending]
+            picks = (rng.random(len(pending)) * CLASS_COMBO_COUNTS[classes]).astype(np.int64)
+            villain_combos[pending] = combo_table[classes, picks]
+            conflict = (COMBO_CARDS[hero_combos[pending]][:, :, None]
+                        == COMBO_CARDS[villain_combos[pending]][:, None, :]).any(axis=(1, 2))
+            # Combo adverse en conflit : nouveau tirage (et nouveau combo héros, pour rester uniforme)
+            hero_combos[pending[conflict]] = rng.choice(class_combos[hero_class], int(conflict.sum()))
+            pending = pending[conflict]
+        hole_cards = np.concatenate([COMBO_CARDS[hero_combos], COMBO_CARDS[villain_combos]], axis=1)
+        dead = (deck[None, :, None] == hole_cards[:, None, :]).any(axis=2)
+        board = sample_cards(rng, deck, dead, 5)
+        hero_scores = evaluate_hands(np.concatenate([hole_cards[:, :2], board], axis=1))
+        villain_scores = evaluate_hands(np.concatenate([hole_cards[:, 2:], board], axis=1))
+        results = (hero_scores > villain_scores) + 0.5 * (hero_scores == villain_scores)
+        row = results.reshape(-1, samples).mean(axis=1)
+        equities[hero_class, hero_class:] = row
+        equities[hero_class:, hero_class] = 1.0 - row
+    np.fill_diagonal(equities, 0.5)
+    return equities
+
+def build_class_equity_table(samples=CLASS_EQUITY_SAMPLES, seed=None):
+    """
+    169 x 169 all-in preflop equity of each hand class against each other (row vs column),
+    exact from the preflop table when it exists, by Monte Carlo otherwise.
+    """
+    table = load_preflop_table()
+    if table is not None:
+        return _class_equity_from_preflop_table(table)
+    return _class_equity_monte_carlo(samples, seed)
+
+_class_equity = None
+
+def load_class_equity_table(path=CLASS_EQUITY_PATH):
+    """
+    Returns the class equity table, read from path. Au premier appel, si le fichier manque,
+    la table est construite puis écrite (atomiquement) ; si l'écriture échoue, elle reste en mémoire.
+    """
+    global _class_equity
+    if _class_equity is None:
+        table = None
+        if os.path.exists(path):
+            table = np.fromfile(path, dtype=np.float64)
+            table = table.reshape(NUM_CLASSES, NUM_CLASSES) if table.size == NUM_CLASSES ** 2 else None
+        if table is None:
+            table = build_class_equity_table()
+            try:
+                temporary_path = f"{path}.{os.getpid()}.tmp"
+                table.tofile(temporary_path)
+                os.replace(temporary_path, path)
+            except OSError:
+                pass
+        _class_equity = table
+    return _class_equity
+
+class PushFoldChart:
+    """
+    Solved push/fold strategies: strategies[decision] is the probability of pushing / calling
+    with each of the 169 hand classes (HAND_CLASSES order).
+    """
+    def __init__(self, strategies, stacks_bb, small_blind_bb, ante_bb, iterations):
+        self.strategies = {decision: np.asarray(strategy, dtype=np.float64)
+                           for decision, strategy in zip(PUSH_FOLD_DECISIONS, strategies)}
+        self.stacks_bb = tuple(stacks_bb)
+        self.small_blind_bb = small_blind_bb
+        self.ante_bb = ante_bb
+        self.iterations = iterations
+
+    def hand_range(self, decision, threshold=0.5):
+        """Range of the combos whose class pushes / calls with a frequency of at least threshold."""
+        return Range(CLASS_COMBO_MASKS[self.strategies[decision] >= threshold].any(axis=0))
+
+    def table_values(self, decision):
+        """{class: 'xx%'} of the classes that push / call, for show_double_entry_table."""
+        return {name: f"{frequency:.0%}" for name, frequency in zip(HAND_CLASSES, self.strategies[decision])
+                if frequency >= 0.005}
+
+    def range_percentage(self, decision):
+        """Share of the 1326 combos that push / call."""
+        return float((self.strategies[decision] * CLASS_COMBO_COUNTS).sum() / CLASS_COMBO_COUNTS.sum())
+
+    def __repr__(self):
+        stacks = "/".join(f"{stack:g}" for stack in self.stacks_bb)
+        return f"PushFoldChart({stacks} BB, btn_push={self.range_percentage('btn_push'):.1%})"
+
+def _heads_up_stack(equity, stack, other_stack, dead_money):
+    """Expected final stack of a player all-in against one opponent (equity: row player)."""
+    contested = min(stack, other_stack)
+    return stack - contested + equity * (2 * contested + dead_money)
+
+def _three_way_stacks(equity, stacks, antes):
+    """
+    Expected final stack tensors of the three players all-in (main pot + side pot).
+
+    L'équité à trois d'une main est approchée à partir des équités deux à deux :
+    e_x proportionnel à E[x, y] * E[x, z] (les trois parts somment à 1).
+    """
+    e_xy = equity[:, :, None]
+    e_xz = equity[:, None, :]
+    e_yz = equity[None, :, :]
+    weights = [e_xy * e_xz, (1 - e_xy) * e_yz, (1 - e_xz) * (1 - e_yz)]
+    total = weights[0] + weights[1] + weights[2]
+    shares = [weight / total for weight in weights]
+
+    order = np.argsort(stacks, kind="stable")
+    contributions = np.minimum(stacks, stacks[order[1]])
+    main_level = stacks[order[0]]
+    main_pot = 3 * main_level + antes
+    side_pot = contributions.sum() - 3 * main_level
+    side_players = [p for p in range(3) if contributions[p] > main_level]
+    final = []
+    for player in range(3):
+        stack = stacks[player] - contributions[player] + shares[player] * main_pot
+        if player in side_players:
+            # Le pot annexe se joue entre les deux plus gros tapis
+            other = side_players[1] if side_players[0] == player else side_players[0]
+            stack = stack + _pair_equity(equity, player, other) * side_pot
+        final.append(stack)
+    return final
+
+def _pair_equity(equity, player, other):
+    """Heads-up equity of player against other broadcast on the (BTN, SB, BB) class axes."""
+    shape = [1, 1, 1]
+    shape[player] = shape[other] = NUM_CLASSES
+    matrix = equity if player < other else equity.T
+    return matrix.reshape(shape)
+
+def _scenario_stacks(scenario):
+    players = scenario.players
+    if len(players) != 3:
+        raise ValueError("Push/fold solving needs exactly 3 players (BTN, SB, BB).")
+    stacks = np.array([player.stack for player in players], dtype=np.float64)
+    antes = np.minimum(stacks, scenario.ante)
+    blinds = np.array([0.0, scenario.small_blind, scenario.big_blind])
+    behind = stacks - antes
+    if (behind <= blinds).any():
+        raise ValueError("Every stack must cover its ante and blind.")
+    return behind, blinds, float(antes.sum())
+
+def solve_push_fold(scenario, iterations=PUSH_FOLD_ITERATIONS, equity=None, cache_dir=PUSH_FOLD_CHARTS_DIR):
+    """
+    Push/fold equilibrium of a 3-handed PokerScenario (players in BTN, SB, BB order, stacks
+    including antes and blinds). equity : 169 x 169 class equity table (load_class_equity_table
+    by default). The chart is cached on disk in cache_dir (None to disable).
+    Returns a PushFoldChart.
+    """
+    behind, blinds, antes = _scenario_stacks(scenario)
+    big_blind = scenario.big_blind
+    stacks_bb = [player.stack / big_blind for player in scenario.players]
+    small_blind_bb, ante_bb = scenario.small_blind / big_blind, scenario.ante / big_blind
+    cache_path = None
+    if cache_dir is not None and equity is None:
+        key = "_".join(f"{value:.4g}" for value in stacks_bb + [small_blind_bb, ante_bb, iterations])
+        cache_path = os.path.join(cache_dir, f"push_fold_{key}.npy")
+        if os.path.exists(cache_path):
+            return PushFoldChart(np.load(cache_path), stacks_bb, small_blind_bb, ante_bb, iterations)
+    if equity is None:
+        equity = load_class_equity_table()
+    strategies = _fictitious_play(equity, behind, blinds, antes, iterations)
+    if cache_path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary_path = f"{cache_path}.{os.getpid()}.tmp.npy"
+            np.save(temporary_path, strategies)
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            pass
+    return PushFoldChart(strategies, stacks_bb, small_blind_bb, ante_bb, iterations)
+
+def push_fold_chart(stack_bb, small_blind_bb=0.5, ante_bb=0.0, iterations=PUSH_FOLD_ITERATIONS,
+                    cache_dir=PUSH_FOLD_CHARTS_DIR):
+    """Push/fold chart of a 3-handed spot where every player starts with stack_bb big blinds."""
+    players = [Player(name, float(stack_bb)) for name in ("BTN", "SB", "BB")]
+    return solve_push_fold(PokerScenario(players, small_blind_bb, 1.0, ante_bb), iterations, cache_dir=cache_dir)
+
+def _fictitious_play(equity, behind, blinds, antes, iterations):
+    """Runs fictitious play and returns the 6 x 169 average strategies."""
+    btn, sb, bb = behind
+    sb_blind, bb_blind = blinds[1], blinds[2]
+    counts = class_pair_counts()
+    # Probabilité (non normalisée) de chaque triplet de classes, retrait des cartes par paire
+    sizes = CLASS_COMBO_COUNTS.astype(np.float64)
+    triples = (counts[:, :, None] * counts[:, None, :] * counts[None, :, :]
+               / (sizes[:, None, None] * sizes[None, :, None] * sizes[None, None, :]))
+    triples /= triples.sum()
+
+    # Tapis finaux des showdowns à deux (lignes : premier joueur nommé)
+    btn_vs_bb = _heads_up_stack(equity, btn, bb, antes + sb_blind)
+    bb_vs_btn = _heads_up_stack(equity, bb, btn, antes + sb_blind)  # indexé [bb, btn]
+    btn_vs_sb = _heads_up_stack(equity, btn, sb, antes + bb_blind)
+    sb_vs_btn = _heads_up_stack(equity, sb, btn, antes + bb_blind)  # indexé [sb, btn]
+    sb_vs_bb = _heads_up_stack(equity, sb, bb, antes)
+    bb_vs_sb = _heads_up_stack(equity, bb, sb, antes)  # indexé [bb, sb]
+    three_way = [(triples * stack).astype(np.float32) for stack in _three_way_stacks(equity, behind, antes)]
+    # Les contractions des tenseurs 169^3 dominent le coût : float32 suffit et divise la mémoire lue par deux
+    triples = triples.astype(np.float32)
+
+    strategies = np.full((len(PUSH_FOLD_DECISIONS), NUM_CLASSES), 0.5, dtype=np.float32)
+    for iteration in range(iterations):
+        btn_push, sb_push, sb_call, bb_call_sb, bb_call_btn, bb_overcall = strategies
+        # La symétrie de triples permet de contracter n'importe quel axe comme le dernier
+        without_sb_call = triples @ (1 - sb_call)
+        without_overcall = triples @ (1 - bb_overcall)
+        without_btn_push = triples @ (1 - btn_push)
+        with_btn_push = btn_push @ triples.reshape(NUM_CLASSES, -1)
+
+        # BTN : push contre fold (tapis restant)
+        push = ((btn + antes + sb_blind + bb_blind) * (without_sb_call @ (1 - bb_call_btn))
+                + (without_sb_call * btn_vs_bb * bb_call_btn).sum(axis=1)
+                + (without_overcall * btn_vs_sb * sb_call).sum(axis=1)
+                + (three_way[0] @ bb_overcall) @ sb_call)
+        best_btn = push > btn * triples.sum(axis=(1, 2))
+
+        # SB, BTN couché : push contre fold
+        push = ((sb + antes + bb_blind) * (without_btn_push @ (1 - bb_call_sb))
+                + (without_btn_push * sb_vs_bb * bb_call_sb).sum(axis=1))
+        best_sb_push = push > (sb - sb_blind) * without_btn_push.sum(axis=1)
+
+        # SB contre le push du BTN : call contre fold
+        call = (btn_push @ (without_overcall * sb_vs_btn.T)
+                + btn_push @ (three_way[1] @ bb_overcall))
+        best_sb_call = call > (sb - sb_blind) * (with_btn_push.reshape(NUM_CLASSES, NUM_CLASSES).sum(axis=1))
+
+        # BB contre le push de la SB (BTN couché)
+        call = sb_push @ (without_btn_push * bb_vs_sb.T)
+        best_bb_call_sb = call > (bb - bb_blind) * (sb_push @ without_btn_push)
+
+        # BB contre le push du BTN, SB couchée
+        call = btn_push @ (without_sb_call * bb_vs_btn.T)
+        best_bb_call_btn = call > (bb - bb_blind) * (btn_push @ without_sb_call)
+
+        # BB contre le push du BTN et le call de la SB
+        overcall = sb_call @ (btn_push @ three_way[2].reshape(NUM_CLASSES, -1)).reshape(NUM_CLASSES, NUM_CLASSES)
+        best_bb_overcall = overcall > (bb - bb_blind) * (sb_call @ with_btn_push.reshape(NUM_CLASSES, NUM_CLASSES))
+
+        best = np.array([best_btn, best_sb_push, best_sb_call, best_bb_call_sb, best_bb_call_btn,
+                         best_bb_overcall], dtype=np.float64)
+        # Moyenne des meilleures réponses (la stratégie initiale ne sert qu'au premier tour)
+        strategies += (best - strategies) / (iteration + 1)
+    return strategies
@@ -0,0 +1,227 @@
+# --- Ranges sous forme de vecteur de poids sur les 1326 combos ---
+#
+# Une Range est un vecteur float32 indexé par combo id (voir poker_combos) : 0 pour un combo
+# absent, son poids (fréquence) sinon. Les opérations ensemblistes et le retrait des cartes
+# mortes sont des opérations vectorisées sur ce vecteur.
+
+import re
+from functools import lru_cache
+import numpy as np
+from poker_logic import RANKS, CARD_IDS, Hand, card_from_id, combo_index
+from poker_combos import NUM_COMBOS, COMBO_CARDS, dead_combo_mask
+from poker_preflop import HAND_CLASSES, HAND_CLASS_INDEX, COMBO_CLASSES
+
+class Range:
+    """
+    Weighted set of two-card combos backed by a read-only 1326 float32 weight vector.
+    Les opérateurs |, & et - renvoient de nouvelles ranges (poids max, min, et retrait).
+    Iterating yields the combo ids of the range in increasing order.
+    """
+    def __init__(self, weights=None):
+        if weights is None:
+            weights = np.zeros(NUM_COMBOS, dtype=np.float32)
+        else:
+            weights = np.array(weights, dtype=np.float32)
+        if weights.shape != (NUM_COMBOS,):
+            raise ValueError(f"Range weights must be a vector of {NUM_COMBOS} values.")
+        if (weights < 0).any():
+            raise ValueError("Range weights cannot be negative.")
+        weights.flags.writeable = False
+        self.weights = weights
+
+    @classmethod
+    def from_combo_ids(cls, combo_ids, weight=1.0):
+        """Range holding the given combo ids, all with the same weight."""
+        weights = np.zeros(NUM_COMBOS, dtype=np.float32)
+        weights[np.asarray(list(combo_ids), dtype=np.int64)] = weight
+        return cls(weights)
+
+    @classmethod
+    def from_hands(cls, hands, weight=1.0):
+        """Range holding the given Hand objects."""
+        return cls.from_combo_ids([hand.combo_id for hand in hands], weight)
+
+    @property
+    def combo_ids(self):
+        """Sorted int64 array of the combo ids with a positive weight."""
+        return np.flatnonzero(self.weights > 0)
+
+    def hands(self):
+        """The combos of the range as Hand objects (slow path, for display)."""
+        return [Hand(*(card_from_id(int(card_id)) for card_id in COMBO_CARDS[combo_id][::-1]))
+                for combo_id in self.combo_ids]
+
+    def without_cards(self, card_ids):
+        """Range without the combos holding one of the given (dead) cards."""
+        card_ids = list(card_ids)
+        if not card_ids:
+            return self
+        return Range(np.where(dead_combo_mask(card_ids), 0.0, self.weights))
+
+    def __len__(self):
+        return int(np.count_nonzero(self.weights))
+
+    def __bool__(self):
+        return bool(self.weights.any())
+
+    def __iter__(self):
+        return iter(self.combo_ids.tolist())
+
+    def __contains__(self, item):
+        combo_id = item.combo_id if isinstance(item, Hand) else int(item)
+        return bool(self.weights[combo_id] > 0)
+
+    def __or__(self, other):
+        return Range(np.maximum(self.weights, other.weights))
+
+    def __and__(self, other):
+        return Range(np.minimum(self.weights, other.weights))
+
+    def __sub__(self, other):
+        return Range(np.where(other.weights > 0, 0.0, self.weights))
+
+    def __eq__(self, other):
+        return isinstance(other, Range) and np.array_equal(self.weights, other.weights)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Range({len(self)} combos)"
+
+def range_combos(opponent_range, dead_ids=()):
+    """
+    Sorted combo ids and float64 weights of a Range or an iterable of Hand objects, without
+    the combos holding a dead card. Les poids valent None quand ils sont tous égaux.
+    """
+    if isinstance(opponent_range, Range):
+        live_range = opponent_range.without_cards(dead_ids)
+        combo_ids = live_range.combo_ids
+        weights = live_range.weights[combo_ids].astype(np.float64)
+        if len(weights) and (weights == weights[0]).all():
+            weights = None
+        return combo_ids, weights
+    dead_ids = set(dead_ids)
+    combo_ids = np.array(sorted({hand.combo_id for hand in opponent_range if dead_ids.isdisjoint(hand.ids)}),
+                         dtype=np.int64)
+    return combo_ids, None
+
+# --- Compilation des chaînes de range ---
+#
+# Syntaxe acceptée (jetons séparés par des virgules, espaces ignorés) :
+#   AA, AKs, AKo, AK (suited + offsuit), JJ+, ATs+, KT+, 22-66, A2s-A5s, KTo-KQo,
+#   AsKd (combo précis), 15% ou top 15% (meilleures mains selon HAND_STRENGTH_ORDER),
+#   et un poids optionnel sur n'importe quel jeton : AKo:0.5. Un jeton répété plus loin
+#   dans la chaîne remplace le poids des combos déjà couverts.
+
+# Les 169 classes de mains, de la plus forte à la plus faible (équité préflop contre une
+# main aléatoire, calculée une fois pour toutes avec calculate_equity)
+HAND_STRENGTH_ORDER = (
+    'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', 'AKs', 'AQs', '77', 'AKo', 'AJs', 'ATs', 'AQo',
+    'KQs', 'AJo', '66', 'A9s', 'ATo', 'KJs', 'A8s', 'KTs', 'KQo', 'A7s', 'A9o', 'KJo', 'QJs', '55',
+    'K9s', 'A8o', 'KTo', 'A6s', 'A5s', 'QTs', 'A7o', 'A4s', 'K8s', 'A3s', 'QJo', 'Q9s', 'K9o',
+    'A6o', 'A5o', 'K7s', 'JTs', 'A2s', 'QTo', '44', 'A4o', 'K6s', 'Q8s', 'K8o', 'K5s', 'A3o',
+    'J9s', 'Q9o', 'JTo', 'A2o', 'K7o', 'K4s', 'Q7s', 'K6o', 'K3s', 'T9s', 'J8s', '33', 'Q8o',
+    'Q6s', 'J9o', 'K2s', 'K5o', 'Q5s', 'J7s', 'T8s', 'K4o', 'Q4s', 'Q7o', 'T9o', 'K3o', 'J8o',
+    'Q6o', 'Q3s', 'J6s', 'T7s', 'K2o', '98s', '22', 'Q5o', 'J5s', 'Q2s', 'J7o', 'T8o', 'Q4o',
+    'T6s', '97s', 'J4s', 'J3s', 'Q3o', 'T7o', '98o', '87s', 'J6o', 'J2s', '96s', 'Q2o', 'J5o',
+    'T5s', 'T4s', '86s', '97o', 'J4o', 'T6o', '95s', 'T3s', 'J3o', '76s', '87o', 'T2s', '96o',
+    '85s', 'T5o', 'J2o', '94s', '75s', 'T4o', '86o', '93s', '65s', '84s', '95o', 'T3o', '92s',
+    '76o', '74s', '54s', 'T2o', '64s', '85o', '83s', '94o', '75o', '82s', '93o', '73s', '53s',
+    '65o', '63s', '84o', '92o', '43s', '74o', '72s', '54o', '52s', '64o', '62s', '83o', '42s',
+    '82o', '73o', '53o', '63o', '32s', '43o', '72o', '52o', '62o', '42o', '32o',
+)
+
+CLASS_COMBO_MASKS = np.arange(len(HAND_CLASSES))[:, None] == COMBO_CLASSES[None, :]
+CLASS_COMBO_COUNTS = CLASS_COMBO_MASKS.sum(axis=1)
+STRENGTH_RANKED_CLASSES = np.array([HAND_CLASS_INDEX[name] for name in HAND_STRENGTH_ORDER], dtype=np.int64)
+
+_RANK = "[2-9TJQKA]"
+_CLASS_TOKEN = re.compile(rf"({_RANK})({_RANK})([SO]?)(\+?)")
+_SPAN_TOKEN = re.compile(rf"({_RANK})({_RANK})([SO]?)-({_RANK})({_RANK})([SO]?)")
+_COMBO_TOKEN = re.compile(rf"({_RANK}[cdhs])({_RANK}[cdhs])")
+_PERCENT_TOKEN = re.compile(r"(?:TOP)?(\d+(?:\.\d+)?)%")
+
+def _class_name(high, low, suffix):
+    """Hand class name from two rank indexes (high >= low) and 's', 'o' or ''."""
+    if high == low:
+        return RANKS[high] * 2
+    return RANKS[high] + RANKS[low] + suffix.lower()
+
+def _non_pair_classes(high, lows, suffix):
+    """Class indexes of high + each kicker in lows, suited / offsuit / both ('')."""
+    suffixes = [suffix] if suffix else ["s", "o"]
+    return [HAND_CLASS_INDEX[_class_name(high, low, s)] for low in lows for s in suffixes]
+
+def _top_classes(percent):
+    """The strongest classes covering at least percent % of the 1326 combos."""
+    if not 0 <= percent <= 100:
+        raise ValueError(f"Invalid range percentage: {percent}%")
+    cumulative = np.cumsum(CLASS_COMBO_COUNTS[STRENGTH_RANKED_CLASSES])
+    count = int(np.searchsorted(cumulative, percent / 100 * NUM_COMBOS - 1e-9)) + 1 if percent > 0 else 0
+    return STRENGTH_RANKED_CLASSES[:count].tolist()
+
+def _compile_token(token):
+    """Returns (class indexes, combo ids) selected by one range token, or raises ValueError."""
+    match = _COMBO_TOKEN.fullmatch(token[0].upper() + token[1:2].lower() + token[2:3].upper() + token[3:].lower())
+    if match and len(token) == 4:
+        first, second = (CARD_IDS[card] for card in match.groups())
+        if first != second:
+            return [], [combo_index(first, second)]
+    upper = token.upper()
+    match = _PERCENT_TOKEN.fullmatch(upper)
+    if match:
+        return _top_classes(float(match.group(1))), []
+    match = _CLASS_TOKEN.fullmatch(upper)
+    if match:
+        rank1, rank2, suffix, plus = match.groups()
+        high, low = sorted((RANKS.index(rank1), RANKS.index(rank2)), reverse=True)
+        if high == low:
+            if suffix:
+                raise ValueError(f"Invalid range token: {token}")
+            pairs = range(high, len(RANKS)) if plus else [high]
+            return [HAND_CLASS_INDEX[RANKS[rank] * 2] for rank in pairs], []
+        return _non_pair_classes(high, range(low, high) if plus else [low], suffix), []
+    match = _SPAN_TOKEN.fullmatch(upper)
+    if match:
+        rank1, rank2, suffix1, rank3, rank4, suffix2 = match.groups()
+        ends = [sorted((RANKS.index(a), RANKS.index(b)), reverse=True) for a, b in ((rank1, rank2), (rank3, rank4))]
+        (high1, low1), (high2, low2) = ends
+        if suffix1 != suffix2:
+            raise ValueError(f"Invalid range token: {token}")
+        if high1 == low1 and high2 == low2 and not suffix1:
+            pairs = range(min(high1, high2), max(high1, high2) + 1)
+            return [HAND_CLASS_INDEX[RANKS[rank] * 2] for rank in pairs], []
+        if high1 == high2 and low1 != high1 and low2 != high2:
+            return _non_pair_classes(high1, range(min(low1, low2), max(low1, low2) + 1), suffix1), []
+    raise ValueError(f"Invalid range token: {token}")
+
+def normalize_range_string(range_string):
+    """Canonical spelling of a range string used as cache key: no whitespace, no empty tokens."""
+    return ",".join(token for token in "".join(range_string.split()).split(",") if token)
+
+@lru_cache(maxsize=1024)
+def _compile_range(normalized_string, strict):
+    weights = np.zeros(NUM_COMBOS, dtype=np.float32)
+    for token in normalized_string.split(","):
+        if not token:
+            continue
+        hand_token, _, weight = token.partition(":")
+        try:
+            weight = float(weight) if weight else 1.0
+            if weight < 0:
+                raise ValueError(f"Invalid range weight: {token}")
+            class_ids, combo_ids = _compile_token(hand_token)
+        except ValueError:
+            if strict:
+                raise ValueError(f"Invalid range token: {token}") from None
+            continue
+        weights[CLASS_COMBO_MASKS[class_ids].any(axis=0)] = weight
+        weights[combo_ids] = weight
+    return Range(weights)
+
+def parse_range(range_string, strict=False):
+    """
+    Compiles a range string into a Range (see the syntax above). Le résultat, immuable, est
+    mémoïsé par chaîne normalisée. Invalid tokens are skipped, or raise ValueError if strict.
+    """
+    return _compile_range(normalize_range_string(range_string), strict)
@@ -0,0 +1,98 @@
+"""
+Test suite for batch_ev.py
+
+Tests build_scenario, the row parsing, the ordered batch run and the resume checkpoint
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import build_scenario
+from batch_ev import scenario_from_row, evaluate_spot, read_spots, iter_results, completed_rows, run_batch
+
+CSV_SPOTS = """id,stacks,position,small_blind,big_blind,ante,hole_cards,board,range,action,size,payouts
+a,"1000,1000",SB,10,20,0,AhAd,,"KK+",fold,0,
+b,"1000,1000",SB,10,20,0,AhAd,Th9d2c,"KK+",call,0,
+c,"1000,1000,1000",BTN,10,20,0,AhAd,,"QQ+",fold,0,"50,30,20"
+d,"1000,1000",UTG,10,20,0,AhAd,,"KK+",fold,0,
+e,"1000,1000",BB,10,20,0,AhAd,,"KK+",jam,0,
+"""
+
+
+class TestBatchEV(unittest.TestCase):
+    """Test cases for the headless batch evaluator"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.spots_path = os.path.join(self.directory.name, 'spots.csv')
+        self.output_path = os.path.join(self.directory.name, 'results.jsonl')
+        with open(self.spots_path, 'w', newline='') as spot_file:
+            spot_file.write(CSV_SPOTS)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_results(self):
+        with open(self.output_path) as output_file:
+            return [json.loads(line) for line in output_file]
+
+    def test_build_scenario(self):
+        """Test the hero is seated first with the stack of their position"""
+        scenario, hero = build_scenario([500, 800, 1200], 'SB', 10, 20, 2, 'AhKd', 'Th9d2c')
+        self.assertEqual(hero, 'Player 1')
+        self.assertEqual([p.stack for p in scenario.players], [800, 500, 1200])
+        self.assertEqual(len(scenario.community_cards), 3)
+        with self.assertRaises(ValueError):
+            build_scenario([500, 800], 'BTN', 10, 20)
+        with self.assertRaises(ValueError):
+            build_scenario([500, 800], 'SB', 10, 20, 0, 'AhKd', 'Ah9d2c')
+
+    def test_row_parsing(self):
+        """Test CSV rows and JSON rows give the same scenario"""
+        csv_row = next(read_spots(self.spots_path))
+        json_row = {'stacks': [1000, 1000], 'position': 'SB', 'small_blind': 10, 'big_blind': 20,
+                    'hole_cards': 'AhAd', 'range': 'KK+', 'action': 'fold'}
+        csv_scenario, _ = scenario_from_row(csv_row)
+        json_scenario, _ = scenario_from_row(json_row)
+        self.assertEqual([p.stack for p in csv_scenario.players], [p.stack for p in json_scenario.players])
+        self.assertEqual(evaluate_spot(csv_row)['ev'], evaluate_spot(json_row)['ev'])
+
+    def test_errors_do_not_abort(self):
+        """Test invalid rows give an error result and the batch goes on"""
+        results = list(iter_results(read_spots(self.spots_path), workers=1))
+        self.assertEqual([r['id'] for r in results], ['a', 'b', 'c', 'd', 'e'])
+        self.assertIn('ev', results[0])
+        self.assertIn('ev', results[1])
+        self.assertEqual(results[2]['unit'], '$EV')
+        self.assertIn('error', results[3])
+        self.assertIn('error', results[4])
+
+    def test_pool_keeps_input_order(self):
+        """Test the process pool returns the same results in input order"""
+        serial = list(iter_results(read_spots(self.spots_path), workers=1))
+        pooled = list(iter_results(read_spots(self.spots_path), workers=2, chunksize=2))
+        self.assertEqual(serial, pooled)
+
+    def test_resume(self):
+        """Test resuming skips the complete lines and drops a partial last line"""
+        self.assertEqual(run_batch(self.spots_path, self.output_path, workers=1), 5)
+        full = self.read_results()
+        with open(self.output_path, 'rb') as output_file:
+            lines = output_file.readlines()
+        with open(self.output_path, 'wb') as output_file:
+            output_file.writelines(lines[:2])
+            output_file.write(lines[2][:10])
+        self.assertEqual(completed_rows(self.output_path), 2)
+        self.assertEqual(run_batch(self.spots_path, self.output_path, workers=1, resume=True), 3)
+        self.assertEqual(self.read_results(), full)
+        self.assertEqual([r['index'] for r in full], list(range(5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
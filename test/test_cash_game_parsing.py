@@ -0,0 +1,190 @@
+"""
+Test suite for fonction_cash_game.py
+
+Tests the single-pass parsing of Winamax cash game hands in process_hand
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fonction_cash_game
+from fonction_cash_game import process_hand, get_hero_position, iter_hands, iter_hand_range, file_byte_ranges, analyser_resultats_cash_game
+from fonction_tournament import analyser_resultats_générique
+
+SAMPLE_HAND = """Winamax Poker - CashGame - HandId: #1234567-89-1700000000 - Holdem no limit (0.01€/0.02€) - 2024-03-05 21:14:07 UTC
+Table: 'Nice 05' 6-max (real money) Seat #3 is the button
+Seat 1: Villain (2€)
+Seat 2: Hero (2€)
+Seat 3: Bob (2€)
+Seat 4: Carol (2€)
+Seat 5: Dave (2€)
+Seat 6: Eve (2€)
+*** ANTE/BLINDS ***
+Carol posts small blind 0.01€
+Dave posts big blind 0.02€
+Dealt to Hero [Ah Kd]
+*** PRE-FLOP ***
+Eve folds
+Villain raises 0.04€ to 0.06€
+Hero raises 0.12€ to 0.18€
+Bob folds
+Carol folds
+Dave folds
+Villain calls 0.12€
+*** FLOP *** [Ks 7d 2c]
+Villain checks
+Hero bets 0.20€
+Villain calls 0.20€
+*** TURN *** [Ks 7d 2c][9h]
+Villain checks
+Hero checks
+*** RIVER *** [Ks 7d 2c 9h][3s]
+Villain checks
+Hero checks
+*** SHOW DOWN ***
+Villain shows [Qd Qc] (One pair : Queens)
+Hero shows [Ah Kd] (One pair : Kings)
+Hero collected 0.77€ from pot
+*** SUMMARY ***
+Total pot 0.79€ | Rake 0.02€
+Board: [Ks 7d 2c 9h 3s]
+Seat 2: Hero showed [Ah Kd] and won 0.77€ with One pair : Kings
+Seat 1: Villain showed [Qd Qc] and lost with One pair : Queens"""
+
+
+class TestProcessHand(unittest.TestCase):
+    """Test cases for process_hand"""
+
+    def test_hero_hand(self):
+        """Test every field of a 3-bet, c-bet and showdown hand"""
+        details = process_hand(SAMPLE_HAND, "Hero")
+        self.assertEqual(details["hand"], "AhKd")
+        self.assertEqual(details["normalized_hand"], "AKo")
+        self.assertEqual(details["table"], "Nice 05")
+        self.assertEqual(details["date"], "2024-03-05 21:14:07")
+        self.assertEqual(details["position"], "CO")
+        self.assertAlmostEqual(details["bet_amount"], 0.38)
+        self.assertAlmostEqual(details["gains"], 0.77)
+        self.assertAlmostEqual(details["net"], 0.39)
+        self.assertAlmostEqual(details["net_showdown"], 0.39)
+        self.assertEqual(details["net_non_showdown"], 0)
+        self.assertAlmostEqual(details["rake"], 0.02)
+        self.assertTrue(details["vpip"])
+        self.assertTrue(details["pfr"])
+        self.assertTrue(details["three_bet"])
+        self.assertTrue(details["cbet_opportunity"])
+        self.assertTrue(details["cbet"])
+        self.assertEqual(details["aggression_actions"], 2)
+        self.assertTrue(details["saw_flop"])
+        self.assertTrue(details["went_to_showdown"])
+
+    def test_folded_player(self):
+        """Test a player who folds preflop neither sees the flop nor the showdown"""
+        details = process_hand(SAMPLE_HAND, "Eve")
+        self.assertEqual(details["hand"], "N/A")
+        self.assertEqual(details["position"], "UTG")
+        self.assertFalse(details["vpip"])
+        self.assertFalse(details["saw_flop"])
+        self.assertFalse(details["went_to_showdown"])
+        self.assertEqual(details["rake"], 0.0)
+
+    def test_opener_is_not_three_bet(self):
+        """Test the first preflop raiser is not counted as a 3-bet"""
+        details = process_hand(SAMPLE_HAND, "Villain")
+        self.assertTrue(details["pfr"])
+        self.assertFalse(details["three_bet"])
+        self.assertFalse(details["cbet"])
+        self.assertEqual(details["position"], "MP")
+
+    def test_position_matches_seat_scan(self):
+        """Test the single pass gives the same position as get_hero_position"""
+        for name in ("Villain", "Hero", "Bob", "Carol", "Dave", "Eve"):
+            self.assertEqual(process_hand(SAMPLE_HAND, name)["position"], get_hero_position(SAMPLE_HAND, name))
+
+
+class TestIterHands(unittest.TestCase):
+    """Test cases for the streaming hand iterator"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, '20240305_Nice 05_real_holdem_no-limit.txt')
+        second_hand = SAMPLE_HAND.replace("#1234567-89", "#1234567-90").replace("21:14:07", "21:15:30")
+        self.content = "\n\n".join([SAMPLE_HAND, second_hand]) + "\n"
+        with open(self.path, 'w', encoding='utf-8') as history_file:
+            history_file.write(self.content)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_matches_split(self):
+        """Test iter_hands yields the same hands as splitting the whole file"""
+        expected = ['Winamax Poker -' + part for part in self.content.split('Winamax Poker -')[1:]]
+        self.assertEqual(list(iter_hands(self.path)), expected)
+        self.assertEqual(len(expected), 2)
+
+    def test_analysis_reads_every_hand(self):
+        """Test analyser_resultats_cash_game parses the hands of the file"""
+        results = analyser_resultats_cash_game(self.directory.name, "Hero")
+        self.assertEqual(results["total_hands"], 2)
+        self.assertAlmostEqual(results["resultat_net_total"], 0.78)
+        self.assertEqual(results["three_bet_pct"], 100)
+
+
+class TestParallelAnalysis(unittest.TestCase):
+    """Test cases for the process-pool analysis"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for day in range(1, 4):
+            hands = []
+            for number in range(40):
+                hand = SAMPLE_HAND.replace("#1234567-89", f"#1234567-{day}{number:02d}")
+                hand = hand.replace("2024-03-05 21:14:07", f"2024-03-0{day} {23 - number % 20:02d}:{number:02d}:07")
+                if number % 3 == 0:
+                    hand = hand.replace("Hero raises 0.12€ to 0.18€", "Hero folds").replace("Hero bets", "Villain bets")
+                hands.append(hand)
+            path = os.path.join(self.directory.name, f"2024030{day}_Nice 05_real_holdem_no-limit.txt")
+            with open(path, 'w', encoding='utf-8') as history_file:
+                history_file.write("\n\n".join(hands) + "\n")
+        for day in range(1, 4):
+            path = os.path.join(self.directory.name, f"2024030{day}_Expresso(1)_real_holdem_no-limit_summary.txt")
+            with open(path, 'w', encoding='utf-8') as summary_file:
+                summary_file.write(f"Buy-In : 0.92€ + 0.08€\nYou won {day * 1.5}€\n")
+        self.chunk_bytes = fonction_cash_game.PARALLEL_CHUNK_BYTES
+        fonction_cash_game.PARALLEL_CHUNK_BYTES = 4096
+
+    def tearDown(self):
+        fonction_cash_game.PARALLEL_CHUNK_BYTES = self.chunk_bytes
+        self.directory.cleanup()
+
+    def test_byte_ranges_cover_every_hand_once(self):
+        """Test contiguous byte ranges yield the hands of iter_hands exactly once"""
+        path = os.path.join(self.directory.name, "20240301_Nice 05_real_holdem_no-limit.txt")
+        ranges = file_byte_ranges(path)
+        self.assertGreater(len(ranges), 1)
+        hands = [hand for start, end in ranges for hand in iter_hand_range(path, start, end, block_size=256)]
+        self.assertEqual(hands, list(iter_hands(path)))
+
+    def test_cash_game_identical_to_serial(self):
+        """Test the parallel cash game analysis gives the serial output, in the same order"""
+        for filters in ({}, {"date_filter": ("2024-03-02", None)}, {"position_filter": ["CO"]}):
+            serial = analyser_resultats_cash_game(self.directory.name, "Hero", **filters)
+            parallel = analyser_resultats_cash_game(self.directory.name, "Hero", workers=2, **filters)
+            self.assertEqual(serial, parallel)
+        self.assertEqual(serial["total_hands"], 120)
+
+    def test_summaries_identical_to_serial(self):
+        """Test the parallel summary analysis gives the serial output"""
+        serial = analyser_resultats_générique(self.directory.name)
+        parallel = analyser_resultats_générique(self.directory.name, workers=2)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(serial["details"]), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+"""
+Test suite for history_index.py
+
+Tests the incremental per-file parse index against a full serial analysis
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fonction_cash_game import analyser_resultats_cash_game
+import history_index
+from history_index import HandIndex
+from test_cash_game_parsing import SAMPLE_HAND
+
+
+def make_hand(number):
+    """Sample hand with its own id and time, every third one folded preflop by Hero"""
+    hand = SAMPLE_HAND.replace("#1234567-89", f"#1234567-{number:03d}")
+    hand = hand.replace("21:14:07", f"21:{number % 60:02d}:07")
+    if number % 3 == 0:
+        hand = hand.replace("Hero raises 0.12€ to 0.18€", "Hero folds").replace("Hero bets", "Villain bets")
+    return hand + "\n\n"
+
+
+class HistoryDirectoryTestCase(unittest.TestCase):
+    """History directory with one file and a hand index on disk, compared with the serial analysis"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.history = os.path.join(self.directory.name, "historique")
+        os.mkdir(self.history)
+        self.db_path = os.path.join(self.directory.name, "index.sqlite")
+        self.path = os.path.join(self.history, "20240305_Nice 05_real_holdem_no-limit.txt")
+        self.write(self.path, "".join(make_hand(n) for n in range(10)))
+        self.index = HandIndex(self.db_path)
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def write(self, path, text, mode='w'):
+        with open(path, mode, encoding='utf-8') as history_file:
+            history_file.write(text)
+
+    def assert_same_results(self, results, expected):
+        # Les sommes SQL peuvent différer des sommes Python au dernier bit près
+        self.assertEqual(results.keys(), expected.keys())
+        for key, value in expected.items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(results[key], value, places=9, msg=key)
+            elif key == "hand_type_results":
+                self.assertEqual(results[key].keys(), value.keys())
+                for hand_type, net in value.items():
+                    self.assertAlmostEqual(results[key][hand_type], net, places=9)
+            else:
+                self.assertEqual(results[key], value, msg=key)
+
+    def assert_matches_serial(self, **filters):
+        expected = analyser_resultats_cash_game(self.history, "Hero", **filters)
+        self.assert_same_results(analyser_resultats_cash_game(self.history, "Hero", index=self.index, **filters), expected)
+        return expected
+
+
+class TestHandIndex(HistoryDirectoryTestCase):
+    """Test cases for the incremental re-analysis"""
+
+    def test_unchanged_files_are_reused(self):
+        """Test a second analysis reads every hand from the index"""
+        self.assertEqual(self.assert_matches_serial()["total_hands"], 10)
+        self.assert_matches_serial(position_filter=["CO"])
+        self.assertEqual(self.index.stats()["parsed"], 1)
+        self.assertEqual(self.index.stats()["reused"], 1)
+
+    def test_appended_hands_parse_only_the_tail(self):
+        """Test a file that grew, even from a half-written hand, is completed from its last hand"""
+        self.assert_matches_serial()
+        full_hand = make_hand(10)
+        self.write(self.path, full_hand[:len(full_hand) // 2], 'a')
+        self.assertEqual(self.assert_matches_serial()["total_hands"], 11)
+        self.write(self.path, full_hand[len(full_hand) // 2:] + make_hand(11), 'a')
+        self.assertEqual(self.assert_matches_serial()["total_hands"], 12)
+        self.assertEqual(self.index.stats()["extended"], 2)
+        self.assertEqual(self.index.stats()["parsed"], 1)
+
+    def test_growth_hashes_the_prefix_once(self):
+        """Test that completing a file reads its already parsed prefix only once for the fingerprint"""
+        self.assert_matches_serial()
+        old_size = os.path.getsize(self.path)
+        self.write(self.path, make_hand(10) + make_hand(11), 'a')
+        hashed = []
+        original = history_index.extend_fingerprint
+        def recording_extend(digest, file_path, start, stop):
+            hashed.append(stop - start)
+            return original(digest, file_path, start, stop)
+        with mock.patch.object(history_index, "extend_fingerprint", recording_extend):
+            self.assertEqual(self.assert_matches_serial()["total_hands"], 12)
+        self.assertEqual(self.index.stats()["extended"], 1)
+        self.assertLessEqual(sum(hashed), os.path.getsize(self.path))
+        self.assertGreater(sum(hashed), old_size // 2)
+
+    def test_changed_content_is_reparsed(self):
+        """Test a rewritten or truncated file is parsed again"""
+        self.assert_matches_serial()
+        with open(self.path, encoding='utf-8') as history_file:
+            content = history_file.read()
+        self.write(self.path, content.replace("Nice 05", "Nice 06") + make_hand(10))
+        self.assertEqual(self.assert_matches_serial()["details"][0]["table"], "Nice 06")
+        self.write(self.path, "".join(make_hand(n) for n in range(5)))
+        self.assertEqual(self.assert_matches_serial()["total_hands"], 5)
+        self.assertEqual(self.index.stats()["parsed"], 3)
+        self.assertEqual(self.index.stats()["extended"], 0)
+
+    def test_change_in_the_middle_is_reparsed(self):
+        """Test a grown file whose already parsed middle changed is parsed again"""
+        hands = [make_hand(n) for n in range(30)]
+        self.write(self.path, "".join(hands))
+        self.assert_matches_serial()
+        # Même longueur, loin du début comme de la dernière main
+        hands[15] = hands[15].replace("Nice 05", "Nice 07")
+        self.write(self.path, "".join(hands) + make_hand(30))
+        self.assertIn("Nice 07", [hand["table"] for hand in self.assert_matches_serial()["details"]])
+        self.assertEqual(self.index.stats()["parsed"], 2)
+        self.assertEqual(self.index.stats()["extended"], 0)
+
+    def test_disk_tier_survives_restart(self):
+        """Test a new index on the same database reuses the stored hands"""
+        self.assert_matches_serial()
+        self.index.close()
+        self.index = HandIndex(self.db_path)
+        self.assert_matches_serial()
+        self.assertEqual(self.index.stats(), {"files": 1, "reused": 1, "extended": 0, "parsed": 0})
+
+    def test_deleted_files_are_pruned(self):
+        """Test the entries of deleted files are forgotten"""
+        other = os.path.join(self.history, "20240306_Nice 05_real_holdem_no-limit.txt")
+        self.write(other, make_hand(20))
+        self.assertEqual(self.assert_matches_serial()["total_hands"], 11)
+        os.remove(other)
+        self.assertEqual(self.assert_matches_serial()["total_hands"], 10)
+        self.assertEqual(self.index.stats()["files"], 1)
+        self.assertEqual(self.index._db().execute("SELECT COUNT(*) FROM files").fetchone()[0], 1)
+
+
+class TestHandDatabase(HistoryDirectoryTestCase):
+    """Test cases for the SQL queries of the hand database"""
+
+    def setUp(self):
+        super().setUp()
+        other = os.path.join(self.history, "20240306_Nice 06_real_holdem_no-limit.txt")
+        self.write(other, "".join(make_hand(n).replace("2024-03-05", "2024-03-06").replace("Nice 05", "Nice 06")
+                                  for n in range(30, 45)))
+
+    def test_filters_match_serial(self):
+        """Test the SQL filters and aggregates give the Python results"""
+        for filters in ({"date_filter": ("2024-03-06", None)}, {"date_filter": (None, "2024-03-05")},
+                        {"date_filter": (None, None)}, {"position_filter": ["CO", "BTN"]},
+                        {"date_filter": ("2024-03-06", "2024-03-06"), "position_filter": ["MP"]}):
+            self.assert_matches_serial(**filters)
+        self.assertEqual(self.index.stats()["parsed"], 2)
+
+    def test_database_layout(self):
+        """Test the database is in WAL mode with the filter indexes"""
+        analyser_resultats_cash_game(self.history, "Hero", index=self.index)
+        db = self.index._db()
+        self.assertEqual(db.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = {row[1] for row in db.execute("PRAGMA index_list(hands)")}
+        self.assertTrue({"hands_date", "hands_position", "hands_normalized_hand", "hands_table"} <= indexes)
+        self.assertEqual(db.execute("SELECT COUNT(*) FROM hands").fetchone()[0], 25)
+
+    def test_memory_index_matches_serial(self):
+        """Test the in-memory index gives exactly the serial results"""
+        index = HandIndex()
+        expected = analyser_resultats_cash_game(self.history, "Hero")
+        self.assertEqual(analyser_resultats_cash_game(self.history, "Hero", index=index), expected)
+        self.assertEqual(analyser_resultats_cash_game(self.history, "Hero", index=index), expected)
+        self.assertEqual(index.stats()["reused"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
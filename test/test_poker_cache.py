@@ -0,0 +1,85 @@
+"""
+Test suite for poker_cache.py
+
+Tests suit-isomorphic canonicalization and the LRU / SQLite equity cache
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import CARD_IDS, parse_hand_string, parse_community_cards_string
+from poker_cache import EquityCache, canonical_spot, equity_cache_key
+from poker_calculations import calculate_equity_fast, parse_range_string
+
+
+def ids(cards_string):
+    """Converts 'AsKd7c...' into a list of integer card ids"""
+    return [CARD_IDS[cards_string[i:i + 2]] for i in range(0, len(cards_string), 2)]
+
+
+class TestCanonicalization(unittest.TestCase):
+    """Test cases for the canonical form of a spot"""
+    
+    def test_suit_isomorphic_spots(self):
+        """Test that AsKd on Th9d2c and AhKc on Ts9c2d share a key"""
+        key1 = equity_cache_key(ids("AsKd"), ids("Th9d2c"), [], "auto")
+        key2 = equity_cache_key(ids("AhKc"), ids("Ts9c2d"), [], "auto")
+        key3 = equity_cache_key(ids("AsKs"), ids("Th9d2c"), [], "auto")
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+    
+    def test_board_order_and_parameters(self):
+        """Test that board order is ignored and parameters are part of the key"""
+        self.assertEqual(canonical_spot(ids("AsKd"), ids("Th9d2c"), [5, 9]),
+                         canonical_spot(ids("AsKd"), ids("2c9dTh"), [9, 5]))
+        self.assertNotEqual(equity_cache_key(ids("AsKd"), [], [], "exact"),
+                            equity_cache_key(ids("AsKd"), [], [], "monte_carlo"))
+
+
+class TestEquityCache(unittest.TestCase):
+    """Test cases for the EquityCache tiers and counters"""
+    
+    def test_lru_eviction(self):
+        """Test LRU ordering and the hit / miss / eviction counters"""
+        cache = EquityCache(maxsize=2)
+        cache.put("a", 0.1)
+        cache.put("b", 0.2)
+        self.assertEqual(cache.get("a"), 0.1)
+        cache.put("c", 0.3)  # évince "b", le moins récemment utilisé
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["size"]), (1, 1, 1, 2))
+    
+    def test_disk_tier_survives_restart(self):
+        """Test that values written to SQLite are found by a new cache instance"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache.sqlite")
+            cache = EquityCache(path=path)
+            cache.put("spot", 0.42)
+            cache.close()
+            
+            restarted = EquityCache(path=path)
+            self.assertEqual(restarted.get("spot"), 0.42)
+            self.assertEqual(restarted.stats()["disk_hits"], 1)
+            restarted.close()
+    
+    def test_equity_uses_cache(self):
+        """Test that calculate_equity_fast answers isomorphic spots from the cache"""
+        cache = EquityCache()
+        opponent_range = parse_range_string("QQ+")
+        first = calculate_equity_fast(parse_hand_string("AsKd"), opponent_range,
+                                      parse_community_cards_string("Th9d2c"), cache=cache)
+        second = calculate_equity_fast(parse_hand_string("AhKc"), opponent_range,
+                                       parse_community_cards_string("Ts9c2d"), cache=cache)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,12 +7,13 @@ Tests the poker calculation functions: equity calculations, range parsing, EV ca
 import unittest
 import sys
 import os
+import numpy as np
 
 # Add the current directory to the path to import the modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from poker_logic import Card, Hand, create_deck, RANKS, SUITS, Player
-from poker_calculations import calculate_equity_fast, parse_range_string, calculate_chip_ev
+from poker_calculations import calculate_equity_fast, calculate_equity, iter_equity_estimates, EquityResult, parse_range_string, calculate_chip_ev, calculate_ev_profile, FoldEquityModel, golden_section_maximize, optimize_bet_size, rank_combination, unrank_combination, combination_array, calculate_range_equity_matrix, aggregate_range_equity, design_ranks, SAMPLING_STRATEGIES, shutdown_executors
 
 
 class TestEquityCalculations(unittest.TestCase):
@@ -58,6 +59,118 @@ class TestEquityCalculations(unittest.TestCase):
         self.assertGreater(equity, 0.9)
 
 
+    def test_calculate_equity_river(self):
+        """Test equity on a complete board (no runout to draw)"""
+        hero_hand = Hand(Card('A', 's'), Card('K', 's'))
+        opponent_range = {Hand(Card('Q', 'h'), Card('Q', 'd'))}
+        community_cards = [Card('2', 's'), Card('7', 's'), Card('9', 's'), Card('J', 'd'), Card('3', 'c')]
+        
+        equity = calculate_equity_fast(hero_hand, opponent_range, community_cards, num_simulations=100)
+        self.assertEqual(equity, 1.0)
+
+
+    def test_calculate_equity_exact_turn(self):
+        """Test exact enumeration on the turn (44 rivers per combo)"""
+        hero_hand = Hand(Card('A', 's'), Card('K', 'd'))
+        opponent_range = {Hand(Card('T', 's'), Card('T', 'c'))}
+        community_cards = [Card('T', 'h'), Card('9', 'd'), Card('2', 'c'), Card('4', 's')]
+        
+        equity = calculate_equity_fast(hero_hand, opponent_range, community_cards, mode="exact")
+        # Le héros est mort : aucune river ne le fait gagner contre un brelan
+        self.assertEqual(equity, 0.0)
+        
+        # En mode auto, l'énumération (44 runouts) est moins chère que l'échantillonnage
+        self.assertEqual(calculate_equity_fast(hero_hand, {Hand(Card('Q', 's'), Card('Q', 'c'))}, community_cards),
+                         calculate_equity_fast(hero_hand, {Hand(Card('Q', 's'), Card('Q', 'c'))}, community_cards, mode="exact"))
+    
+    def test_calculate_equity_seed_reproducible(self):
+        """Test that a master seed reproduces the same result with any number of workers"""
+        hero_hand = Hand(Card('A', 's'), Card('K', 'd'))
+        opponent_range = parse_range_string("JJ+, AKs")
+        
+        single = calculate_equity_fast(hero_hand, opponent_range, [], num_simulations=40000, seed=123)
+        again = calculate_equity_fast(hero_hand, opponent_range, [], num_simulations=40000, seed=123)
+        parallel = calculate_equity_fast(hero_hand, opponent_range, [], num_simulations=40000, seed=123, workers=2)
+        self.assertEqual(single, again)
+        self.assertEqual(single, parallel)
+        # Les pools arrêtés sont recréés au besoin
+        shutdown_executors()
+        self.assertEqual(single, calculate_equity_fast(hero_hand, opponent_range, [], num_simulations=40000,
+                                                       seed=123, workers=2))
+        shutdown_executors()
+    
+    def test_calculate_equity_invalid_mode(self):
+        """Test that an unknown equity mode is rejected"""
+        hero_hand = Hand(Card('A', 's'), Card('A', 'h'))
+        with self.assertRaises(ValueError):
+            calculate_equity_fast(hero_hand, {Hand(Card('K', 's'), Card('K', 'h'))}, [], mode="magic")
+    
+    def test_combination_ranking(self):
+        """Test colex rank/unrank round trip and chunked enumeration"""
+        combos = [tuple(c) for c in combination_array(8, 3, 0, 56)]
+        self.assertEqual(len(set(combos)), 56)
+        for rank, combo in enumerate(combos):
+            self.assertEqual(rank_combination(combo), rank)
+            self.assertEqual(tuple(unrank_combination(rank, 3)), combo)
+        chunked = [tuple(c) for start in range(0, 56, 10) for c in combination_array(8, 3, start, start + 10)]
+        self.assertEqual(chunked, combos)
+
+
+class TestAdaptiveEquity(unittest.TestCase):
+    """Test cases for target-precision Monte Carlo and EquityResult"""
+    
+    def test_equity_result_stderr(self):
+        """Test the equity and standard error of win / tie / loss counts"""
+        result = EquityResult(wins=50, ties=20, losses=30)
+        self.assertEqual(result.samples, 100)
+        self.assertAlmostEqual(result.equity, 0.6)
+        self.assertAlmostEqual(result.stderr, ((0.55 - 0.36) / 99) ** 0.5)
+        self.assertEqual(EquityResult(wins=3, losses=1, method="exact").stderr, 0.0)
+        self.assertEqual(EquityResult.from_dict(result.to_dict()).equity, result.equity)
+    
+    def test_target_stderr_stops_early(self):
+        """Test that sampling stops once the target standard error is reached"""
+        hero_hand = Hand(Card('A', 's'), Card('K', 'd'))
+        opponent_range = parse_range_string("JJ+, AKs")
+        
+        result = calculate_equity(hero_hand, opponent_range, [], mode="monte_carlo",
+                                  target_stderr=0.01, max_simulations=20000, seed=5, cache=None)
+        self.assertEqual(result.method, "monte_carlo")
+        self.assertLessEqual(result.stderr, 0.01)
+        # Chaque runout compte une paire par combo vivant : arrêt bien avant le budget
+        self.assertLess(result.samples, 20000 * len(opponent_range))
+        # Les lots sont répartis entre les workers sans changer le résultat
+        parallel = calculate_equity(hero_hand, opponent_range, [], mode="monte_carlo", target_stderr=0.01,
+                                    max_simulations=20000, seed=5, cache=None, workers=2)
+        shutdown_executors()
+        self.assertEqual(parallel.to_dict(), result.to_dict())
+        self.assertEqual(result.wins + result.ties + result.losses, result.samples)
+    
+    def test_monte_carlo_scores_every_combo(self):
+        """Test that each sampled runout is compared with every live combo of the range"""
+        hero_hand = Hand(Card('A', 's'), Card('A', 'h'))
+        opponent_range = parse_range_string("KK")
+        result = calculate_equity(hero_hand, opponent_range, [], num_simulations=300, mode="monte_carlo",
+                                  seed=4, cache=None)
+        # 300 runouts, 6 combos chacun, moins ceux qui touchent le runout
+        self.assertGreater(result.samples, 4 * 300)
+        self.assertLessEqual(result.samples, 6 * 300)
+    
+    def test_iter_equity_estimates(self):
+        """Test that the generator yields cumulative estimates batch after batch"""
+        hero_hand = Hand(Card('A', 's'), Card('A', 'h'))
+        opponent_range = {Hand(Card('K', 's'), Card('K', 'h'))}
+        
+        estimates = list(iter_equity_estimates(hero_hand, opponent_range, [], batch_size=500,
+                                               max_simulations=2000, seed=1))
+        # 500 runouts par lot ; ceux qui touchent KsKh ne comptent pas
+        self.assertEqual(len(estimates), 4)
+        samples = [0] + [e.samples for e in estimates]
+        self.assertTrue(all(0 < b - a <= 500 for a, b in zip(samples, samples[1:])))
+        self.assertGreater(estimates[0].stderr, estimates[-1].stderr)
+        self.assertGreater(estimates[-1].equity, 0.7)
+
+
 class TestRangeParsing(unittest.TestCase):
     """Test cases for range parsing functions"""
     
@@ -151,6 +264,111 @@ class TestRangeParsing(unittest.TestCase):
         self.assertTrue(has_aa)
 
 
+class TestSamplingStrategies(unittest.TestCase):
+    """Test cases for variance-reduced runout sampling"""
+    
+    def test_design_ranks(self):
+        """Test that stratified and systematic designs put one rank in each stratum"""
+        rng = np.random.default_rng(0)
+        rows = np.arange(20)
+        offsets = np.array([0.25, 0.75])
+        for sampling in ("stratified", "systematic"):
+            ranks = design_ranks(rows, sampling, 10, offsets, 1000, rng)
+            np.testing.assert_array_equal(ranks // 100, np.tile(np.arange(10), 2))
+        np.testing.assert_array_equal(design_ranks(rows[:3], "systematic", 10, offsets, 1000, rng), [25, 125, 225])
+        quasi = design_ranks(np.arange(100), "quasi_random", 100, offsets[:1], 1000, rng)
+        # Faible discrépance : aucun trou de plus de 3 / N dans l'espace des rangs
+        self.assertLess(np.diff(np.sort(quasi)).max(), 30)
+        with self.assertRaises(ValueError):
+            design_ranks(rows, "antithetic", 10, offsets, 1000, rng)
+    
+    def test_strategies_match_exact_equity(self):
+        """Test that every strategy agrees with enumeration and reports its effective sample size"""
+        from poker_logic import parse_community_cards_string
+        hero_hand = Hand(Card('A', 's'), Card('K', 'd'))
+        opponent_range = parse_range_string("22+, A2s+")
+        board = parse_community_cards_string("9h8h2c5d")
+        exact = calculate_equity(hero_hand, opponent_range, board, mode="exact", cache=None).equity
+        for sampling in SAMPLING_STRATEGIES:
+            result = calculate_equity(hero_hand, opponent_range, board, num_simulations=20000, mode="monte_carlo",
+                                      seed=11, cache=None, sampling=sampling)
+            self.assertAlmostEqual(result.equity, exact, delta=4 * result.stderr + 1e-3)
+            self.assertGreater(result.effective_samples, 0)
+            if sampling != "random":
+                # Sur la river, stratifier par carte réduit fortement la variance
+                self.assertGreater(result.effective_samples, 5 * result.samples)
+        with self.assertRaises(ValueError):
+            calculate_equity(hero_hand, opponent_range, board, sampling="antithetic", cache=None)
+    
+    def test_effective_samples_of_independent_draws(self):
+        """Test that independent samples count as themselves"""
+        result = EquityResult(wins=50, ties=20, losses=30)
+        self.assertAlmostEqual(result.effective_samples, 99)
+        self.assertEqual(EquityResult(wins=3, losses=1, method="exact").effective_samples, 4)
+    
+    def test_iter_with_sampling_design(self):
+        """Test that each batch is a full replicate of the design"""
+        hero_hand = Hand(Card('A', 's'), Card('A', 'h'))
+        opponent_range = {Hand(Card('K', 's'), Card('K', 'h'))}
+        estimates = list(iter_equity_estimates(hero_hand, opponent_range, [], batch_size=500,
+                                               max_simulations=2200, seed=1, sampling="systematic"))
+        self.assertEqual(len(estimates), 4)
+        self.assertEqual(estimates[0].stderr, float('inf'))
+        self.assertLess(estimates[-1].stderr, 0.05)
+        self.assertAlmostEqual(estimates[-1].equity, 0.82, delta=0.05)
+
+
+class TestRangeEquityMatrix(unittest.TestCase):
+    """Test cases for the range-vs-range equity matrix"""
+    
+    def test_exact_matrix_matches_matchups(self):
+        """Test that every exact matrix entry equals the single-matchup equity"""
+        from poker_logic import parse_community_cards_string
+        board = parse_community_cards_string("Qh7h2c")
+        range_a = parse_range_string("AKs, JJ")
+        range_b = parse_range_string("QQ, T9s")
+        matrix = calculate_range_equity_matrix(range_a, range_b, board, mode="exact")
+        self.assertEqual(matrix.shape, (1326, 1326))
+        for hand_a in range_a:
+            for hand_b in range_b:
+                expected = calculate_equity_fast(hand_a, {hand_b}, board, mode="exact", cache=None)
+                if set(hand_a.ids) & set(hand_b.ids) or set(hand_a.ids + hand_b.ids) & {c.id for c in board}:
+                    self.assertTrue(np.isnan(matrix[hand_a.combo_id, hand_b.combo_id]))
+                else:
+                    self.assertAlmostEqual(matrix[hand_a.combo_id, hand_b.combo_id], expected)
+        # Hors des ranges : NaN (AKs + JJ contre les 3 QQ restants + T9s)
+        self.assertEqual(np.isfinite(matrix).sum(), (4 + 6) * (3 + 4))
+    
+    def test_aggregate_equity(self):
+        """Test the weighted reduction against calculate_equity on a single hero combo"""
+        from poker_logic import parse_community_cards_string
+        board = parse_community_cards_string("Qh7h2c9d")
+        hero = Hand(Card('A', 'h'), Card('K', 'h'))
+        range_b = parse_range_string("QQ, 99, AQs, T8s")
+        matrix = calculate_range_equity_matrix({hero}, range_b, board)
+        expected = calculate_equity_fast(hero, range_b, board, mode="exact", cache=None)
+        self.assertAlmostEqual(aggregate_range_equity(matrix), expected)
+        
+        weights_b = np.zeros(1326)
+        queens = parse_range_string("QQ")
+        for hand in queens:
+            weights_b[hand.combo_id] = 1.0
+        self.assertAlmostEqual(aggregate_range_equity(matrix, weights_b=weights_b),
+                               calculate_equity_fast(hero, queens, board, mode="exact", cache=None))
+        with self.assertRaises(ValueError):
+            aggregate_range_equity(np.full((1326, 1326), np.nan))
+    
+    def test_monte_carlo_matrix(self):
+        """Test the sampled preflop matrix against known equities"""
+        range_a = parse_range_string("AA")
+        range_b = parse_range_string("KK")
+        matrix = calculate_range_equity_matrix(range_a, range_b, [], num_simulations=4000, seed=2)
+        self.assertAlmostEqual(aggregate_range_equity(matrix), 0.82, delta=0.03)
+        again = calculate_range_equity_matrix(range_a, range_b, [], num_simulations=4000, seed=2)
+        np.testing.assert_array_equal(np.isnan(matrix), np.isnan(again))
+        np.testing.assert_array_equal(matrix[~np.isnan(matrix)], again[~np.isnan(again)])
+
+
 class TestChipEVCalculations(unittest.TestCase):
     """Test cases for chip EV calculation functions"""
     
@@ -172,6 +390,95 @@ class TestChipEVCalculations(unittest.TestCase):
             # The function may require more complex setup
             # This test mainly ensures the function signature is correct
             self.assertIn("calculate_chip_ev", str(e).__class__.__name__ + str(e))
+    
+    def test_ev_profile_matches_chip_ev(self):
+        """Test that one EV profile gives the same EVs as separate calculate_chip_ev calls"""
+        from poker_logic import PokerScenario, parse_community_cards_string
+        
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = Hand(Card('A', 's'), Card('K', 's'))
+        scenario = PokerScenario([hero, Player("Villain", 1000.0)], 5, 10, 0)
+        # Board complet : l'équité est exacte, les deux API sont comparables
+        scenario.community_cards = parse_community_cards_string("As7c2h9s3d")
+        sizes = np.linspace(20, 100, 50)
+        profile = calculate_ev_profile(scenario, "Hero", "QQ, 77", sizes, call_amount=5.0)
+        self.assertEqual(profile.fold, 0.0)
+        self.assertAlmostEqual(profile.call, calculate_chip_ev(scenario, "Hero", "QQ, 77", "call", 5.0))
+        self.assertEqual(profile.raises.shape, (50,))
+        for size, ev in zip(sizes[::10], profile.raises[::10]):
+            self.assertAlmostEqual(ev, calculate_chip_ev(scenario, "Hero", "QQ, 77", "raise", size))
+        action, size, ev = profile.best_action()
+        self.assertEqual(action, "raise")
+        self.assertEqual(size, 100)
+        self.assertAlmostEqual(ev, profile.raises.max())
+    
+    def test_ev_profile_without_raise_sizes(self):
+        """Test that fold wins when calling loses and no raise size is given"""
+        from poker_logic import PokerScenario, parse_community_cards_string
+        
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = Hand(Card('7', 's'), Card('2', 'h'))
+        scenario = PokerScenario([hero, Player("Villain", 1000.0)], 5, 10, 0)
+        scenario.community_cards = parse_community_cards_string("AsKcQhJs9d")
+        profile = calculate_ev_profile(scenario, "Hero", "AA", [], call_amount=50.0)
+        self.assertEqual(profile.best_action(), ("fold", 0.0, 0.0))
+
+
+
+class TestBetSizing(unittest.TestCase):
+    """Test cases for the fold-equity-aware bet-size optimizer"""
+    
+    def test_fold_equity_model(self):
+        """Test the continuing range and the EV of a raise"""
+        # Trois combos de même poids : le vilain garde d'abord celle où le héros est le plus faible
+        model = FoldEquityModel([0.9, 0.2, 0.5], [1.0, 1.0, 1.0], pot=10.0, response_curve=lambda size, pot: 2 / 3)
+        self.assertAlmostEqual(model.equity_when_called(1 / 3), 0.2)
+        self.assertAlmostEqual(model.equity_when_called(2 / 3), 0.35)
+        self.assertAlmostEqual(model.equity_when_called(0.5), (0.2 + 0.5 * 0.5) / 1.5)
+        self.assertAlmostEqual(model.ev(10.0), 10 / 3 + 2 / 3 * (0.35 * 20 - 0.65 * 10))
+        always_calls = FoldEquityModel([0.9, 0.2, 0.5], [1.0, 1.0, 1.0], pot=10.0, response_curve=lambda size, pot: 1.0)
+        self.assertAlmostEqual(always_calls.ev(10.0), 0.8 / 1.5 * 20 - 0.7 / 1.5 * 10)
+    
+    def test_golden_section_maximize(self):
+        """Test golden-section search on a concave function"""
+        size, value, evaluations = golden_section_maximize(lambda x: -(x - 3.7) ** 2, 0.0, 10.0, 1e-4)
+        self.assertAlmostEqual(size, 3.7, places=3)
+        self.assertAlmostEqual(value, 0.0, places=6)
+        self.assertLess(evaluations, 30)
+    
+    def test_optimize_bet_size(self):
+        """Test that the optimizer beats the sizes of a brute-force grid"""
+        from poker_logic import PokerScenario, parse_community_cards_string
+        
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = Hand(Card('A', 's'), Card('K', 's'))
+        scenario = PokerScenario([hero, Player("Villain", 1000.0)], 5, 10, 0)
+        scenario.community_cards = parse_community_cards_string("Qs7s2h")
+        result = optimize_bet_size(scenario, "Hero", "22+, A2s+, KTs+, QJs, ATo+", 20, 500, seed=1)
+        self.assertGreaterEqual(result.size, 20)
+        self.assertLessEqual(result.size, 500)
+        self.assertAlmostEqual(result.continue_fraction, scenario.pot / (scenario.pot + result.size))
+        self.assertLess(result.evaluations, 40)
+        # Même vecteur d'équités (même graine) : aucune taille de la grille ne fait mieux
+        for size in np.linspace(20, 500, 13):
+            grid_result = optimize_bet_size(scenario, "Hero", "22+, A2s+, KTs+, QJs, ATo+", size, size, seed=1)
+            self.assertLessEqual(grid_result.ev, result.ev + 1e-6)
+        with self.assertRaises(ValueError):
+            optimize_bet_size(scenario, "Hero", "AA", 50, 20)
+    
+    def test_optimize_bet_size_call_ev(self):
+        """Test that the sizing result also gives the call EV from the same equities"""
+        from poker_logic import PokerScenario
+        
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = Hand(Card('A', 's'), Card('A', 'h'))
+        scenario = PokerScenario([hero, Player("Villain", 1000.0)], 5, 10, 0)
+        result = optimize_bet_size(scenario, "Hero", "KK", 20, 20, call_amount=5, seed=1)
+        equity = calculate_equity_fast(hero.hole_cards, parse_range_string("KK"), [], cache=None)
+        self.assertAlmostEqual(result.call_ev, equity * scenario.pot - (1 - equity) * 5, delta=0.5)
+        action, size, ev = result.best_action()
+        self.assertEqual(action, "raise" if result.ev > result.call_ev else "call")
+        self.assertEqual(ev, max(result.ev, result.call_ev))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,126 @@
+"""
+Test suite for poker_evaluator.py
+
+Tests the vectorized NumPy hand evaluator against known hands and the deuces library
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import CARD_IDS, CARD_STRINGS
+from poker_evaluator import (evaluate_hands, evaluate_hand, hand_category, sample_cards,
+                             build_evaluator_tables, write_evaluator_tables, load_evaluator_tables,
+                             _map_evaluator_tables)
+
+
+def ids(cards_string):
+    """Converts 'AsKd7c...' into a list of integer card ids"""
+    return [CARD_IDS[cards_string[i:i + 2]] for i in range(0, len(cards_string), 2)]
+
+
+class TestHandEvaluator(unittest.TestCase):
+    """Test cases for the batch hand evaluator"""
+    
+    def test_hand_categories(self):
+        """Test that each category is recognized"""
+        expected = {
+            "AsKd9c7h5s3d2c": "High Card",
+            "AsAd9c7h5s3d2c": "Pair",
+            "AsAd9c9h5s3d2c": "Two Pair",
+            "AsAdAc7h5s3d2c": "Three of a Kind",
+            "As2d3c4h5s9dKc": "Straight",
+            "As9s7s4s2sKdQc": "Flush",
+            "AsAdAc7h7s3d2c": "Full House",
+            "AsAdAcAh7s3d2c": "Four of a Kind",
+            "9s8s7s6s5sAdAc": "Straight Flush",
+        }
+        scores = evaluate_hands([ids(hand) for hand in expected])
+        for score, category in zip(scores, expected.values()):
+            self.assertEqual(hand_category(score), category)
+    
+    def test_kickers_and_wheel(self):
+        """Test tie-breaks between hands of the same category"""
+        self.assertGreater(evaluate_hand(ids("AsAdKc7h5s3d2c")), evaluate_hand(ids("AhAcQc7h5s3d2c")))
+        self.assertEqual(evaluate_hand(ids("AsAdKc7h5s")), evaluate_hand(ids("AhAcKd7c5d")))
+        # La roue (A-5) est la plus petite quinte
+        self.assertGreater(evaluate_hand(ids("2s3d4c5h6sKdQc")), evaluate_hand(ids("As2d3c4h5sKdQc")))
+    
+    def test_matches_deuces(self):
+        """Test that the ordering of random 7-card hands matches deuces"""
+        try:
+            from deuces import Card as DeucesCard, Evaluator
+        except ImportError:
+            self.skipTest("deuces is not installed")
+        evaluator = Evaluator()
+        rng = np.random.default_rng(7)
+        hands = np.argsort(rng.random((2000, 52)), axis=1)[:, :7]
+        scores = evaluate_hands(hands)
+        deuces_scores = np.array([
+            evaluator.evaluate([DeucesCard.new(CARD_STRINGS[c]) for c in hand[:5]],
+                               [DeucesCard.new(CARD_STRINGS[c]) for c in hand[5:]])
+            for hand in hands
+        ])
+        i, j = rng.integers(0, 2000, (2, 20000))
+        # deuces : plus petit = meilleur
+        np.testing.assert_array_equal(np.sign(scores[i] - scores[j]), np.sign(deuces_scores[j] - deuces_scores[i]))
+    
+    def test_invalid_shape(self):
+        """Test that hands of the wrong size are rejected"""
+        with self.assertRaises(ValueError):
+            evaluate_hands([[0, 1, 2, 3]])
+    
+    def test_sample_cards_excludes_dead_cards(self):
+        """Test that sampled cards are distinct and never dead"""
+        rng = np.random.default_rng(0)
+        deck = np.arange(10)
+        dead = np.zeros((500, 10), dtype=bool)
+        dead[:, :3] = True
+        drawn = sample_cards(rng, deck, dead, 4)
+        self.assertEqual(drawn.shape, (500, 4))
+        self.assertTrue((drawn >= 3).all())
+        self.assertTrue(all(len(set(row)) == 4 for row in drawn.tolist()))
+
+
+class TestEvaluatorTables(unittest.TestCase):
+    """Test cases for the memory-mapped evaluator tables"""
+    
+    def test_write_and_map(self):
+        """Test that written tables are memory-mapped back unchanged"""
+        tables = build_evaluator_tables()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tables.bin")
+            write_evaluator_tables(path, tables)
+            mapped = _map_evaluator_tables(path)
+            self.assertIsNotNone(mapped)
+            for array, mapped_array in zip(tables, mapped):
+                self.assertIsInstance(mapped_array, np.memmap)
+                np.testing.assert_array_equal(array, mapped_array)
+            del mapped, mapped_array
+    
+    def test_rejects_stale_file(self):
+        """Test that a file from another version or truncated is not used"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tables.bin")
+            self.assertIsNone(_map_evaluator_tables(path))
+            np.array([0, 1, 2, 3], dtype=np.int32).tofile(path)
+            self.assertIsNone(_map_evaluator_tables(path))
+    
+    def test_rank_state_machine(self):
+        """Test that the rank automaton ignores card order"""
+        next_state = load_evaluator_tables()[0]
+        states = [0, 0]
+        for rank1, rank2 in zip([12, 3, 3, 7, 0], [0, 7, 3, 12, 3]):
+            states = [next_state[states[0] + rank1], next_state[states[1] + rank2]]
+        self.assertEqual(states[0], states[1])
+        hands = np.array([ids("AsKd9c7h5s3d2c"), ids("2c3d5s7h9cKdAs")])
+        self.assertEqual(evaluate_hands(hands)[0], evaluate_hands(hands)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Test suite for poker_game_tree.py
+
+Tests the multi-street game tree: terminal values, memoized subtrees and line comparison
+"""
+
+import unittest
+import sys
+import os
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import Player, PokerScenario, parse_hand_string, parse_community_cards_string
+from poker_cache import EquityCache
+from poker_calculations import calculate_equity, parse_range
+from poker_game_tree import GameTree, GameState, VillainModel
+
+
+def heads_up(hero_cards, board, stack=100.0):
+    hero = Player("Hero", stack)
+    hero.hole_cards = parse_hand_string(hero_cards)
+    scenario = PokerScenario([hero, Player("Villain", stack)], 5, 10, 0)
+    scenario.community_cards = parse_community_cards_string(board)
+    return scenario
+
+
+class TestGameTree(unittest.TestCase):
+    """Test cases for the game tree evaluator"""
+    
+    def test_river_values(self):
+        """Test check-down and bet values on the river against a passive villain"""
+        scenario = heads_up("AhKh", "Kd7c2h9s3d")
+        villain_range = parse_range("QQ, 77, KQs, A9s")
+        tree, root = GameTree.from_scenario(scenario, "Hero", villain_range,
+                                            villain_model=VillainModel(bet_frequency=0.0), cache=EquityCache())
+        equity = calculate_equity(scenario.players[0].hole_cards, root.villain_range,
+                                  scenario.community_cards, cache=None).equity
+        values = tree.action_values(root)
+        self.assertAlmostEqual(values["check"], equity * scenario.pot)
+        # Mise de 15 : le vilain continue avec 15 / 30 de sa range, la plus forte
+        continuing = tree.continuing_range(root.replace(pot=30.0, to_act="villain", to_call=15.0), 0.5)
+        self.assertAlmostEqual(float(continuing.weights.sum()), 0.5 * len(root.villain_range))
+        called_equity = calculate_equity(scenario.players[0].hole_cards, continuing,
+                                         scenario.community_cards, cache=None).equity
+        self.assertAlmostEqual(values["bet 100%"], 0.5 * 15 + 0.5 * (called_equity * 45 - 15))
+    
+    def test_fold_and_all_in(self):
+        """Test that folding is worth 0 and that an all-in goes to showdown"""
+        scenario = heads_up("AhKh", "Kd7c2h", stack=10.0)
+        # Assez de simulations pour que l'équité du flop soit énumérée exactement
+        tree, root = GameTree.from_scenario(scenario, "Hero", parse_range("QQ"), num_simulations=10000,
+                                            cache=EquityCache())
+        facing = root.replace(pot=25.0, to_call=10.0, villain_stack=0.0)
+        values = tree.action_values(facing)
+        self.assertEqual(values["fold"], 0.0)
+        self.assertNotIn("raise", values)
+        equity = calculate_equity(scenario.players[0].hole_cards, root.villain_range,
+                                  scenario.community_cards, cache=None).equity
+        self.assertAlmostEqual(values["call"], equity * 35 - 10)
+    
+    def test_memoized_subtrees(self):
+        """Test that identical subtrees are evaluated once and that keys ignore suit relabelling"""
+        scenario = heads_up("AhKh", "Kd7c2s9d")
+        tree, root = GameTree.from_scenario(scenario, "Hero", parse_range("QQ+, KQs, 99"), runouts_per_street=3,
+                                            cache=EquityCache())
+        first = tree.action_values(root)
+        nodes = tree.nodes
+        self.assertGreater(tree.memo_hits, 0)
+        self.assertEqual(tree.action_values(root), first)
+        self.assertEqual(tree.nodes, nodes)
+        # Même spot à permutation des couleurs près (coeur <-> pique)
+        mirrored, mirrored_root = GameTree.from_scenario(heads_up("AsKs", "Kd7c2h9d"), "Hero",
+                                                         parse_range("QQ+, KQs, 99"), cache=EquityCache())
+        self.assertEqual(tree.state_key(root), mirrored.state_key(mirrored_root))
+        self.assertNotEqual(tree.state_key(root), tree.state_key(root.replace(pot=20.0)))
+    
+    def test_lines(self):
+        """Test comparing check-raise and lead lines"""
+        scenario = heads_up("7h7c", "Kd7d2s")
+        tree, root = GameTree.from_scenario(scenario, "Hero", parse_range("KQs, KJs, QQ, A2s+"),
+                                            villain_model=VillainModel(bet_frequency=0.6), runouts_per_street=2,
+                                            seed=3, cache=EquityCache())
+        values = tree.action_values(root)
+        check_raise = tree.line_value(root, ["check", "raise"])
+        check_call = tree.line_value(root, ["check", "call"])
+        self.assertAlmostEqual(tree.line_value(root, ["bet 50%"]), values["bet 50%"])
+        self.assertLessEqual(max(check_raise, check_call), values["check"] + 1e-9)
+        self.assertAlmostEqual(tree.line_value(root, []), max(values.values()))
+    
+    def test_invalid_scenarios(self):
+        """Test the scenario checks"""
+        with self.assertRaises(ValueError):
+            GameTree.from_scenario(heads_up("AhKh", "Kh7c2s"), "Hero", parse_range("QQ"))
+        scenario = heads_up("AhKh", "Kd7c2s")
+        scenario.players.append(Player("Third", 100.0))
+        with self.assertRaises(ValueError):
+            GameTree.from_scenario(scenario, "Hero", parse_range("QQ"))
+        with self.assertRaises(ValueError):
+            GameTree(parse_hand_string("AhKh")).action_values(
+                GameState([], 10.0, 100.0, 100.0, parse_range("QQ"), "villain"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Test suite for poker_icm.py
+
+Tests the memoized Malmuth-Harville ICM, its Monte Carlo approximation and $EV in calculate_chip_ev
+"""
+
+import unittest
+import sys
+import os
+import time
+from itertools import permutations
+import numpy as np
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import Player, PokerScenario, parse_hand_string, parse_community_cards_string
+from poker_icm import icm_equities, icm_equities_monte_carlo, calculate_icm, icm_subset_count
+from poker_calculations import calculate_chip_ev
+
+
+def harville_by_permutations(stacks, payouts):
+    """Naive Malmuth-Harville over every finishing order (reference)"""
+    equities = np.zeros(len(stacks))
+    for order in permutations(range(len(stacks))):
+        probability, remaining = 1.0, float(sum(stacks))
+        for player in order:
+            probability *= stacks[player] / remaining
+            remaining -= stacks[player]
+        for place, player in enumerate(order[:len(payouts)]):
+            equities[player] += probability * payouts[place]
+    return equities
+
+
+class TestICM(unittest.TestCase):
+    """Test cases for the ICM engine"""
+    
+    def test_matches_naive_recursion(self):
+        """Test the memoized recursion against the factorial enumeration"""
+        stacks = [1000, 2500, 4000, 500, 3000, 1200]
+        for payouts in ([50, 30, 20], [100], [40, 25, 15, 10, 6, 4]):
+            np.testing.assert_allclose(icm_equities(stacks, payouts), harville_by_permutations(stacks, payouts))
+    
+    def test_simple_cases(self):
+        """Test chip-proportional winner-take-all and equal stacks"""
+        np.testing.assert_allclose(icm_equities([100, 300], [80]), [20, 60])
+        np.testing.assert_allclose(icm_equities([500] * 4, [50, 30, 20]), [25] * 4)
+        # Un joueur éliminé ne gagne rien, les places en trop ne sont pas distribuées
+        np.testing.assert_allclose(icm_equities([0, 100, 100], [60, 40, 10]), [0, 50, 50])
+        with self.assertRaises(ValueError):
+            icm_equities([-1, 100], [10])
+    
+    def test_final_table_speed(self):
+        """Test that a 9-handed final table with 9 paid places evaluates in milliseconds"""
+        stacks = np.random.default_rng(0).integers(500, 5000, 9)
+        start = time.perf_counter()
+        equities = icm_equities(stacks, [40, 25, 15, 10, 5, 3, 1, 1, 0])
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertAlmostEqual(equities.sum(), 100.0)
+    
+    def test_monte_carlo(self):
+        """Test the Monte Carlo approximation and the automatic method choice"""
+        stacks = [1000, 2500, 4000, 500, 3000, 1200]
+        payouts = [50, 30, 20]
+        np.testing.assert_allclose(icm_equities_monte_carlo(stacks, payouts, 200000, seed=1),
+                                   icm_equities(stacks, payouts), atol=0.3)
+        large_field = np.random.default_rng(0).integers(500, 5000, 100)
+        self.assertGreater(icm_subset_count(100, 10), 200000)
+        equities = calculate_icm(large_field, [30, 20, 15, 10, 8, 6, 5, 3, 2, 1], num_simulations=20000, seed=2)
+        self.assertAlmostEqual(equities.sum(), 100.0)
+        self.assertGreater(equities[np.argmax(large_field)], equities[np.argmin(large_field)])
+
+
+class TestDollarEV(unittest.TestCase):
+    """Test cases for the $EV output of calculate_chip_ev"""
+    
+    def setUp(self):
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = parse_hand_string("AsAh")
+        self.scenario = PokerScenario([hero, Player("Villain", 1000.0)], 50, 100, 0)
+        self.scenario.community_cards = parse_community_cards_string("Ad7c2h9s3d")
+    
+    def test_winner_take_all_is_chip_proportional(self):
+        """Test that a single prize gives the chip EV scaled by prize per chip"""
+        chip_ev = calculate_chip_ev(self.scenario, "Hero", "KK", "call", 100.0)
+        dollar_ev = calculate_chip_ev(self.scenario, "Hero", "KK", "call", 100.0, output="$EV", payouts=[100])
+        self.assertAlmostEqual(chip_ev, self.scenario.pot)
+        # Victoire certaine : le pot (argent mort) que le fold aurait laissé au vilain, au prix par jeton
+        self.assertAlmostEqual(dollar_ev, 100 * 1150 / 2150 - 100 * 1000 / 2150)
+        self.assertEqual(calculate_chip_ev(self.scenario, "Hero", "KK", "fold", output="$EV", payouts=[100]), 0.0)
+    
+    def test_fold_is_the_baseline(self):
+        """Test that a free call the chip EV favours also beats folding in $EV"""
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = parse_hand_string("7h2c")
+        scenario = PokerScenario([hero, Player("Villain", 1000.0)], 50, 100, 0)
+        payouts = [70, 30]
+        self.assertGreater(calculate_chip_ev(scenario, "Hero", "AA", "call", 0.0), 0.0)
+        call_ev = calculate_chip_ev(scenario, "Hero", "AA", "call", 0.0, output="$EV", payouts=payouts)
+        fold_ev = calculate_chip_ev(scenario, "Hero", "AA", "fold", 0.0, output="$EV", payouts=payouts)
+        self.assertGreater(call_ev, fold_ev)
+    
+    def test_icm_pressure(self):
+        """Test that a flat payout makes chips won worth less than chips lost"""
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = parse_hand_string("AsKs")
+        scenario = PokerScenario([hero, Player("Villain", 1000.0), Player("Short", 1000.0)], 50, 100, 0)
+        payouts = [50, 50, 0]
+        dollar_ev = calculate_chip_ev(scenario, "Hero", "QQ", "raise", 1000.0, output="$EV", payouts=payouts)
+        self.assertLess(dollar_ev, 0.0)
+        with self.assertRaises(ValueError):
+            calculate_chip_ev(scenario, "Hero", "QQ", "raise", 1000.0, output="$EV")
+        with self.assertRaises(ValueError):
+            calculate_chip_ev(scenario, "Hero", "QQ", "raise", 1000.0, output="bb")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,7 @@ import os
 # Add the current directory to the path to import the modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from poker_logic import Card, Hand, Player, PokerScenario, RANKS, SUITS, create_deck, parse_hand_string, parse_community_cards_string
+from poker_logic import Card, Hand, Player, PokerScenario, RANKS, SUITS, CARD_STRINGS, CARD_IDS, create_deck, card_from_id, parse_hand_string, parse_community_cards_string
 
 
 class TestCard(unittest.TestCase):
@@ -53,6 +53,14 @@ class TestCard(unittest.TestCase):
         self.assertEqual(card1, card2)
         self.assertNotEqual(card1, card3)
     
+    def test_card_id(self):
+        """Test the integer card id (rank * 4 + suit)"""
+        self.assertEqual(Card('2', 'c').id, 0)
+        self.assertEqual(Card('A', 's').id, 51)
+        self.assertEqual(Card('k', 'H').id, CARD_IDS['Kh'])
+        for card_id, card_string in enumerate(CARD_STRINGS):
+            self.assertEqual(str(card_from_id(card_id)), card_string)
+    
     def test_card_string_representation(self):
         """Test card string representation"""
         card = Card('A', 's')
@@ -138,6 +146,12 @@ class TestPokerHelperFunctions(unittest.TestCase):
         self.assertEqual(hand.cards[1].rank, 'K')
         self.assertEqual(hand.cards[1].suit, 'h')
     
+    def test_parse_hand_string_ids(self):
+        """Test that parsed hands carry the integer ids of their cards"""
+        hand = parse_hand_string("KdAs")
+        self.assertEqual(hand.ids, (CARD_IDS['As'], CARD_IDS['Kd']))
+        self.assertEqual({card.id for card in create_deck()}, set(range(52)))
+    
     def test_parse_hand_string_invalid(self):
         """Test parsing invalid hand string"""
         with self.assertRaises(ValueError):
@@ -0,0 +1,106 @@
+"""
+Test suite for poker_multiway.py
+
+Tests multiway equity with one range per opponent and card-removal-consistent sampling
+"""
+
+import unittest
+import sys
+import os
+import numpy as np
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import Card, Hand, Player, PokerScenario, parse_hand_string, parse_community_cards_string
+from poker_combos import COMBO_CARDS, combos_conflict, dead_combo_mask
+from poker_multiway import calculate_multiway_equity, sample_opponent_holdings
+from poker_calculations import calculate_equity_fast, calculate_chip_ev, parse_range_string
+
+
+class TestComboTables(unittest.TestCase):
+    """Test cases for the precomputed combo masks"""
+    
+    def test_conflicts(self):
+        """Test that each combo conflicts with itself and the 100 combos sharing a card"""
+        conflicts = combos_conflict(np.arange(1326), np.arange(1326))
+        self.assertTrue((conflicts.sum(axis=1) == 101).all())
+        self.assertTrue((conflicts == conflicts.T).all())
+    
+    def test_dead_combo_mask(self):
+        """Test that one dead card removes the 51 combos holding it"""
+        self.assertEqual(dead_combo_mask([0]).sum(), 51)
+        self.assertEqual(dead_combo_mask([0, 1]).sum(), 101)
+
+
+class TestMultiwayEquity(unittest.TestCase):
+    """Test cases for calculate_multiway_equity"""
+    
+    def test_river_is_deterministic(self):
+        """Test a three-way river showdown with a split between two opponents"""
+        hero = parse_hand_string("AsAh")
+        board = parse_community_cards_string("Kd7c2h9s3d")
+        ranges = [{parse_hand_string("KsQs")}, {parse_hand_string("KcQc")}]
+        equities = calculate_multiway_equity(hero, ranges, board, num_simulations=500, seed=1)
+        np.testing.assert_allclose(equities, [1.0, 0.0, 0.0])
+        
+        hero = parse_hand_string("4c5c")
+        equities = calculate_multiway_equity(hero, ranges, board, num_simulations=500, seed=1)
+        np.testing.assert_allclose(equities, [0.0, 0.5, 0.5])
+    
+    def test_heads_up_matches_two_player_equity(self):
+        """Test that one opponent gives the usual heads-up equity"""
+        hero = parse_hand_string("AhKh")
+        board = parse_community_cards_string("Qh7h2c")
+        opponent_range = parse_range_string("QQ, 77, AQs")
+        exact = calculate_equity_fast(hero, opponent_range, board, mode="exact", cache=None)
+        equities = calculate_multiway_equity(hero, [opponent_range], board, num_simulations=40000, seed=3)
+        self.assertAlmostEqual(equities[0], exact, delta=0.015)
+        self.assertAlmostEqual(equities.sum(), 1.0)
+    
+    def test_three_way_preflop(self):
+        """Test AA vs KK vs QQ preflop ordering"""
+        equities = calculate_multiway_equity(parse_hand_string("AsAh"),
+                                             [parse_range_string("KK"), parse_range_string("QQ")],
+                                             [], num_simulations=20000, seed=5)
+        self.assertAlmostEqual(equities.sum(), 1.0)
+        self.assertGreater(equities[0], 0.6)
+        self.assertGreater(equities[1], equities[2])
+    
+    def test_sampled_holdings_never_share_cards(self):
+        """Test that sampled opponent holdings respect card removal and are reweighted"""
+        ranges = [np.arange(0, 1326, 3), np.arange(1, 1326, 5), np.arange(2, 1326, 7)]
+        holdings, weights = sample_opponent_holdings(np.random.default_rng(0), ranges,
+                                                     [np.ones(len(r)) for r in ranges], 2000)
+        cards = COMBO_CARDS[holdings].reshape(2000, -1)
+        self.assertTrue(all(len(set(row)) == 6 for row in cards.tolist()))
+        self.assertTrue((weights > 0).all())
+    
+    def test_card_removal_conflict(self):
+        """Test that impossible opponent ranges raise an error"""
+        hero = parse_hand_string("AsAh")
+        # Il ne reste que AcAd : les deux adversaires ne peuvent pas l'avoir tous les deux
+        with self.assertRaises(ValueError):
+            calculate_multiway_equity(hero, [parse_range_string("AA"), parse_range_string("AA")], [],
+                                      num_simulations=100, seed=0)
+        with self.assertRaises(ValueError):
+            calculate_multiway_equity(hero, [], [])
+
+
+class TestMultiwayChipEV(unittest.TestCase):
+    """Test cases for calculate_chip_ev with three players"""
+    
+    def test_three_player_ev(self):
+        """Test that the raise reward includes every opponent's call"""
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = Hand(Card('A', 's'), Card('A', 'h'))
+        scenario = PokerScenario([hero, Player("SB", 1000.0), Player("BB", 1000.0)], 5, 10, 0)
+        scenario.community_cards = parse_community_cards_string("Ad7c2h9s3d")
+        ev = calculate_chip_ev(scenario, "Hero", ["KK", "QQ"], "raise", 100.0)
+        self.assertAlmostEqual(ev, scenario.pot + 200.0)
+        with self.assertRaises(ValueError):
+            calculate_chip_ev(scenario, "Hero", ["KK"], "call", 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
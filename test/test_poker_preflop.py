@@ -0,0 +1,76 @@
+"""
+Test suite for poker_preflop.py
+
+Tests hand classes, suit canonicalization and lookups in the preflop equity table
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import CARD_IDS, combo_index
+from poker_preflop import (HAND_CLASSES, COMBO_CLASSES, PREFLOP_TABLE_SHAPE, EQUITY_SCALE, MISSING_EQUITY,
+                           hand_class_name, canonical_matchup_keys, load_preflop_table, preflop_range_equity)
+
+
+def combo(cards_string):
+    """Combo id of a 4-character string such as 'AsKd'"""
+    return combo_index(CARD_IDS[cards_string[:2]], CARD_IDS[cards_string[2:]])
+
+
+class TestHandClasses(unittest.TestCase):
+    """Test cases for the 169 hand classes"""
+    
+    def test_class_counts(self):
+        """Test that pairs, suited and offsuit classes have 6, 4 and 12 combos"""
+        self.assertEqual(len(HAND_CLASSES), 169)
+        counts = np.bincount(COMBO_CLASSES, minlength=169)
+        for name, count in zip(HAND_CLASSES, counts):
+            expected = 6 if len(name) == 2 else 4 if name.endswith('s') else 12
+            self.assertEqual(count, expected, name)
+    
+    def test_hand_class_name(self):
+        """Test class names of integer card pairs"""
+        self.assertEqual(hand_class_name(CARD_IDS['Kd'], CARD_IDS['As']), 'AKo')
+        self.assertEqual(hand_class_name(CARD_IDS['9h'], CARD_IDS['Th']), 'T9s')
+        self.assertEqual(hand_class_name(CARD_IDS['7c'], CARD_IDS['7d']), '77')
+
+
+class TestPreflopTable(unittest.TestCase):
+    """Test cases for the canonical matchups and the table lookup"""
+    
+    def test_canonical_keys(self):
+        """Test that suit-isomorphic matchups share a key and conflicts are flagged"""
+        keys = canonical_matchup_keys()
+        self.assertEqual(keys[combo('AsKd'), combo('QhQc')], keys[combo('AhKc'), combo('QsQd')])
+        self.assertNotEqual(keys[combo('AsKs'), combo('QhQc')], keys[combo('AsKd'), combo('QhQc')])
+        self.assertEqual(keys[combo('AsKd'), combo('AsQd')], -1)
+    
+    def test_range_lookup(self):
+        """Test the weighted lookup in a memory-mapped table"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'preflop.bin')
+            table = np.full(PREFLOP_TABLE_SHAPE, EQUITY_SCALE // 2, dtype=np.uint16)
+            table[combo('AsAh'), combo('KsKh')] = int(EQUITY_SCALE * 0.8)
+            table[combo('AsAh'), combo('AsKd')] = MISSING_EQUITY
+            table.tofile(path)
+            
+            loaded = load_preflop_table(path)
+            self.assertIsInstance(loaded, np.memmap)
+            equity = preflop_range_equity(loaded, combo('AsAh'), [combo('KsKh'), combo('QsQh'), combo('AsKd')])
+            self.assertAlmostEqual(equity, 0.65, places=3)
+            weighted = preflop_range_equity(loaded, combo('AsAh'), [combo('KsKh'), combo('QsQh')], weights=[3, 1])
+            self.assertAlmostEqual(weighted, 0.725, places=3)
+    
+    def test_missing_table(self):
+        """Test that a missing table file is reported as None"""
+        self.assertIsNone(load_preflop_table('/nonexistent/preflop.bin'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Test suite for poker_push_fold.py
+
+Tests the class equity table and the 3-handed push/fold fictitious-play solver
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import Player, PokerScenario
+from poker_preflop import HAND_CLASS_INDEX
+from poker_push_fold import (PUSH_FOLD_DECISIONS, PushFoldChart, class_pair_counts, build_class_equity_table,
+                             solve_push_fold, _heads_up_stack, _three_way_stacks)
+
+# Table approximative (peu de tirages) partagée par les tests du solveur
+EQUITY = build_class_equity_table(samples=40, seed=0)
+
+
+def three_handed(stack_bb, ante=0.0):
+    players = [Player(name, float(stack_bb)) for name in ("BTN", "SB", "BB")]
+    return PokerScenario(players, 0.5, 1.0, ante)
+
+
+class TestClassEquity(unittest.TestCase):
+    """Test cases for the 169 x 169 class tables"""
+    
+    def test_class_pair_counts(self):
+        """Test the number of compatible combo pairs between classes"""
+        counts = class_pair_counts()
+        self.assertEqual(counts[HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["AA"]], 6)
+        self.assertEqual(counts[HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["KK"]], 36)
+        self.assertEqual(counts[HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["AKs"]], 12)
+        self.assertEqual(counts.sum(), 1326 * 1225)
+    
+    def test_class_equity_table(self):
+        """Test the Monte Carlo class equity table"""
+        np.testing.assert_allclose(EQUITY + EQUITY.T, 1.0)
+        self.assertGreater(EQUITY[HAND_CLASS_INDEX["AA"], HAND_CLASS_INDEX["KK"]], 0.7)
+        self.assertLess(EQUITY[HAND_CLASS_INDEX["72o"], HAND_CLASS_INDEX["AA"]], 0.25)
+
+
+class TestPushFoldSolver(unittest.TestCase):
+    """Test cases for the fictitious-play solver"""
+    
+    def test_showdown_stacks(self):
+        """Test heads-up and three-way final stacks (chips are conserved)"""
+        equity = np.full((169, 169), 0.5)
+        self.assertAlmostEqual(_heads_up_stack(equity, 10.0, 4.0, 1.5)[0, 0], 6.0 + 0.5 * 9.5)
+        stacks = np.array([10.0, 4.0, 7.0])
+        finals = _three_way_stacks(EQUITY, stacks, 0.3)
+        total = finals[0] + finals[1] + finals[2]
+        np.testing.assert_allclose(total, stacks.sum() + 0.3, rtol=1e-9)
+        # Le plus court ne joue que le pot principal : 3 x 4 jetons + antes
+        self.assertLessEqual(finals[1].max(), 3 * 4.0 + 0.3 + 1e-9)
+    
+    def test_charts(self):
+        """Test that the equilibrium ranges are sensible and tighten with depth"""
+        shallow = solve_push_fold(three_handed(5), iterations=60, equity=EQUITY, cache_dir=None)
+        deep = solve_push_fold(three_handed(20), iterations=60, equity=EQUITY, cache_dir=None)
+        for chart in (shallow, deep):
+            self.assertEqual(chart.strategies["btn_push"][HAND_CLASS_INDEX["AA"]], 1.0)
+            self.assertEqual(chart.strategies["bb_overcall"][HAND_CLASS_INDEX["72o"]], 0.0)
+            self.assertLess(chart.range_percentage("btn_push"), chart.range_percentage("sb_push"))
+        for decision in PUSH_FOLD_DECISIONS:
+            self.assertGreater(shallow.range_percentage(decision), deep.range_percentage(decision))
+        self.assertIn("AA", deep.table_values("bb_call_btn"))
+        self.assertNotIn("72o", deep.table_values("btn_push"))
+        self.assertEqual(len(deep.hand_range("btn_push", 1.0)) % 2, 0)
+        with self.assertRaises(ValueError):
+            solve_push_fold(PokerScenario([Player("BTN", 10.0), Player("BB", 10.0)], 0.5, 1.0), equity=EQUITY)
+    
+    def test_disk_cache(self):
+        """Test that a solved chart is written once and read back"""
+        import poker_push_fold
+        with tempfile.TemporaryDirectory() as directory:
+            original = poker_push_fold.load_class_equity_table
+            poker_push_fold.load_class_equity_table = lambda: EQUITY
+            try:
+                chart = solve_push_fold(three_handed(8, ante=0.1), iterations=20, cache_dir=directory)
+            finally:
+                poker_push_fold.load_class_equity_table = original
+            self.assertEqual(len(os.listdir(directory)), 1)
+            cached = solve_push_fold(three_handed(8, ante=0.1), iterations=20, cache_dir=directory)
+            self.assertIsInstance(cached, PushFoldChart)
+            for decision in PUSH_FOLD_DECISIONS:
+                np.testing.assert_array_equal(cached.strategies[decision], chart.strategies[decision])
+            self.assertEqual(cached.stacks_bb, (8.0, 8.0, 8.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Test suite for poker_range.py
+
+Tests the Range type (1326 weight vector) and its use by the equity functions
+"""
+
+import unittest
+import sys
+import os
+import numpy as np
+
+# Add the current directory to the path to import the modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from poker_logic import CARD_IDS, Card, Hand, Player, PokerScenario, parse_hand_string, parse_community_cards_string
+from poker_range import Range, range_combos, HAND_STRENGTH_ORDER
+from poker_cache import equity_cache_key
+from poker_calculations import calculate_equity_fast, calculate_chip_ev, parse_range, parse_range_string
+
+
+class TestRange(unittest.TestCase):
+    """Test cases for the Range class"""
+    
+    def test_from_hands(self):
+        """Test that a range built from hands holds their combo ids"""
+        hands = parse_range_string("AA, KQs")
+        weighted_range = Range.from_hands(hands)
+        self.assertEqual(len(weighted_range), 10)
+        self.assertEqual(sorted(weighted_range), sorted(hand.combo_id for hand in hands))
+        self.assertIn(parse_hand_string("AsAh"), weighted_range)
+        self.assertNotIn(parse_hand_string("KsQd"), weighted_range)
+        self.assertEqual(set(Range.from_hands(weighted_range.hands())), set(weighted_range))
+        self.assertFalse(Range())
+    
+    def test_set_operations(self):
+        """Test union, intersection and difference"""
+        premiums = parse_range("QQ+, AK")
+        pairs = parse_range("TT+")
+        self.assertEqual(len(premiums | pairs), len(premiums) + 12)
+        self.assertEqual(premiums & pairs, parse_range("QQ+"))
+        self.assertEqual(premiums - pairs, parse_range("AK"))
+    
+    def test_without_cards(self):
+        """Test dead-card removal with the per-card combo masks"""
+        full_range = Range(np.ones(1326))
+        self.assertEqual(len(full_range.without_cards([CARD_IDS["As"]])), 1326 - 51)
+        self.assertEqual(len(parse_range("AA").without_cards([CARD_IDS["As"], CARD_IDS["Ah"]])), 1)
+    
+    def test_weights_are_read_only(self):
+        """Test that a Range cannot be modified in place and rejects bad weights"""
+        weighted_range = parse_range("AA")
+        with self.assertRaises(ValueError):
+            weighted_range.weights[0] = 1.0
+        with self.assertRaises(ValueError):
+            Range(np.ones(10))
+        with self.assertRaises(ValueError):
+            Range(-np.ones(1326))
+    
+    def test_parse_range_is_memoized(self):
+        """Test that equivalent range strings share one parsed Range"""
+        self.assertIs(parse_range("JJ+, AKs"), parse_range("JJ+,AKs"))
+        self.assertEqual(len(parse_range("JJ+, AKs")), 28)
+    
+    def test_range_combos(self):
+        """Test combo ids and weights of ranges and sets of hands"""
+        weights = np.zeros(1326)
+        weights[[3, 7, 9]] = [1.0, 0.5, 1.0]
+        combo_ids, combo_weights = range_combos(Range(weights))
+        np.testing.assert_array_equal(combo_ids, [3, 7, 9])
+        np.testing.assert_array_equal(combo_weights, [1.0, 0.5, 1.0])
+        combo_ids, combo_weights = range_combos(parse_range_string("AA"), [CARD_IDS["As"]])
+        self.assertEqual(len(combo_ids), 3)
+        self.assertIsNone(combo_weights)
+
+
+class TestRangeSyntax(unittest.TestCase):
+    """Test cases for the extended range syntax compiled by parse_range"""
+    
+    def test_spans(self):
+        """Test pair, suited and offsuit spans"""
+        self.assertEqual(parse_range("22-66"), parse_range("22, 33, 44, 55, 66"))
+        self.assertEqual(parse_range("66-22"), parse_range("22-66"))
+        self.assertEqual(parse_range("A2s-A5s"), parse_range("A2s, A3s, A4s, A5s"))
+        self.assertEqual(parse_range("KTo-KQo"), parse_range("KTo, KJo, KQo"))
+        self.assertEqual(len(parse_range("KTo-KQo")), 36)
+    
+    def test_plus_and_unsuffixed_hands(self):
+        """Test plus notation without suit and hands naming both shapes"""
+        self.assertEqual(parse_range("AK"), parse_range("AKs, AKo"))
+        self.assertEqual(parse_range("KT+"), parse_range("KTs+, KTo+"))
+        self.assertEqual(parse_range("kq"), parse_range("KQ"))
+        self.assertEqual(len(parse_range("AsKd")), 1)
+        self.assertIn(parse_hand_string("AsKd"), parse_range("AsKd"))
+    
+    def test_weights(self):
+        """Test per-token weights and later tokens overriding earlier ones"""
+        weighted_range = parse_range("QQ+, AKo:0.5")
+        self.assertEqual(len(weighted_range), 30)
+        self.assertAlmostEqual(float(weighted_range.weights[parse_hand_string("AsKd").combo_id]), 0.5)
+        self.assertAlmostEqual(float(weighted_range.weights[parse_hand_string("AsAd").combo_id]), 1.0)
+        overridden = parse_range("JJ+, AA:0.25")
+        self.assertAlmostEqual(float(overridden.weights[parse_hand_string("AsAd").combo_id]), 0.25)
+        self.assertEqual(len(parse_range("AA, AA:0")), 0)
+    
+    def test_percentages(self):
+        """Test top X% ranges built from the precomputed strength order"""
+        self.assertEqual(len(HAND_STRENGTH_ORDER), 169)
+        self.assertEqual(HAND_STRENGTH_ORDER[0], "AA")
+        self.assertEqual(len(parse_range("100%")), 1326)
+        self.assertEqual(len(parse_range("0%")), 0)
+        top = parse_range("top 15%")
+        self.assertIs(top, parse_range("top15%"))
+        self.assertGreaterEqual(len(top), 0.15 * 1326)
+        self.assertLess(len(top), 0.15 * 1326 + 12)
+        self.assertEqual(top & parse_range("5%"), parse_range("5%"))
+        self.assertIn(parse_hand_string("AsKs"), top)
+        self.assertNotIn(parse_hand_string("7s2d"), top)
+    
+    def test_invalid_tokens(self):
+        """Test that invalid tokens are skipped, or rejected in strict mode"""
+        self.assertEqual(parse_range("XX, AA, AKx, A2s-K5s"), parse_range("AA"))
+        for range_string in ["XX", "AAs", "A2s-A5o", "AK:-1", "150%", "AsAs"]:
+            with self.assertRaises(ValueError):
+                parse_range(range_string, strict=True)
+
+
+class TestRangeEquity(unittest.TestCase):
+    """Test cases for equity functions taking a Range"""
+    
+    def test_equity_accepts_range(self):
+        """Test that a Range gives the same exact equity as the set of hands"""
+        hero = parse_hand_string("AhKh")
+        board = parse_community_cards_string("Qh7h2c")
+        hands = parse_range_string("QQ, 77, AQs")
+        self.assertAlmostEqual(calculate_equity_fast(hero, Range.from_hands(hands), board, mode="exact", cache=None),
+                               calculate_equity_fast(hero, hands, board, mode="exact", cache=None))
+    
+    def test_weighted_range_equity(self):
+        """Test that combo weights are honoured"""
+        hero = parse_hand_string("AhKh")
+        board = parse_community_cards_string("Qh7h2c5d")
+        sets = parse_range("QQ")
+        draws = parse_range("AQs")
+        weighted_range = Range(sets.weights + 0.25 * draws.weights)
+        equity_sets = calculate_equity_fast(hero, sets, board, mode="exact", cache=None)
+        equity_draws = calculate_equity_fast(hero, draws, board, mode="exact", cache=None)
+        live_sets = len(sets.without_cards(hero.ids + tuple(c.id for c in board)))
+        live_draws = len(draws.without_cards(hero.ids + tuple(c.id for c in board)))
+        expected = (live_sets * equity_sets + 0.25 * live_draws * equity_draws) / (live_sets + 0.25 * live_draws)
+        self.assertAlmostEqual(calculate_equity_fast(hero, weighted_range, board, mode="exact", cache=None), expected)
+        sampled = calculate_equity_fast(hero, weighted_range, board, num_simulations=20000,
+                                        mode="monte_carlo", seed=4, cache=None)
+        self.assertAlmostEqual(sampled, expected, delta=0.02)
+    
+    def test_cache_key_includes_weights(self):
+        """Test that two weightings of the same combos do not share a cache entry"""
+        hero_ids = parse_hand_string("AhKh").ids
+        key1 = equity_cache_key(hero_ids, [], [5, 9], "auto", weights=[1.0, 1.0])
+        key2 = equity_cache_key(hero_ids, [], [5, 9], "auto", weights=[1.0, 0.5])
+        self.assertNotEqual(key1, key2)
+    
+    def test_chip_ev_accepts_range(self):
+        """Test calculate_chip_ev with a Range instead of a string"""
+        hero = Player("Hero", 1000.0)
+        hero.hole_cards = Hand(Card('A', 's'), Card('A', 'h'))
+        scenario = PokerScenario([hero, Player("Villain", 1000.0)], 5, 10, 0)
+        scenario.community_cards = parse_community_cards_string("Ad7c2h9s3d")
+        self.assertAlmostEqual(calculate_chip_ev(scenario, "Hero", parse_range("KK"), "call", 10.0), scenario.pot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -67,6 +67,17 @@ class TestRunnerAgent:
         self.test_modules = [
             'test_poker_logic',
             'test_poker_calculations', 
+            'test_poker_evaluator',
+            'test_poker_preflop',
+            'test_poker_cache',
+            'test_poker_multiway',
+            'test_poker_range',
+            'test_poker_icm',
+            'test_poker_push_fold',
+            'test_poker_game_tree',
+            'test_batch_ev',
+            'test_cash_game_parsing',
+            'test_history_index',
             'test_history_parsing'
         ]
         self.start_time = None